@@ -3,46 +3,36 @@
 Comprehensive audit of data types across all schemas to assess diversity.
 """
 
-import sqlite3
 import os
 import json
 from pathlib import Path
 from collections import defaultdict, Counter
 
-def get_schema_info(db_path):
+from common.schema_catalog import SchemaCatalog
+
+def get_schema_info(db_path, schemas=None):
     """Extract schema information from a database."""
     try:
         if not os.path.exists(db_path) or os.path.getsize(db_path) < 1000:
             return None
             
-        conn = sqlite3.connect(db_path)
-        
-        # Get all tables
-        tables = conn.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name NOT LIKE 'sqlite_%' AND name != 'evidence_kv'
-        """).fetchall()
-        
+        schemas = schemas or SchemaCatalog()
         schema_info = {}
         
-        for (table_name,) in tables:
-            # Get column information
-            columns = conn.execute(f"PRAGMA table_info({table_name})").fetchall()
-            
-            column_info = []
-            for col in columns:
-                cid, name, data_type, notnull, default_value, pk = col
-                column_info.append({
-                    'name': name,
-                    'type': data_type,
-                    'not_null': bool(notnull),
-                    'primary_key': bool(pk),
-                    'default': default_value
-                })
-            
-            schema_info[table_name] = column_info
+        for table in schemas.describe(db_path)['tables']:
+            if table['kind'] != 'table' or table['name'] == 'evidence_kv':
+                continue
+            schema_info[table['name']] = [
+                {
+                    'name': col['name'],
+                    'type': col['type'],
+                    'not_null': col['not_null'],
+                    'primary_key': bool(col['primary_key']),
+                    'default': col['default']
+                }
+                for col in table['columns']
+            ]
         
-        conn.close()
         return schema_info
         
     except Exception as e:
@@ -61,6 +51,7 @@ def analyze_data_types():
     constraint_stats = defaultdict(int)
     
     domains = ['customer_service', 'finance', 'retail_cpg', 'healthcare', 'energy_manufacturing']
+    schemas = SchemaCatalog()
     
     for domain in domains:
         if not os.path.exists(domain):
@@ -81,7 +72,7 @@ def analyze_data_types():
                 continue
                 
             db_path = os.path.join(subdomain_path, db_files[0])
-            schema_info = get_schema_info(db_path)
+            schema_info = get_schema_info(db_path, schemas)
             
             if not schema_info:
                 continue
@@ -0,0 +1,193 @@
+"""asyncio front-end for ``common.executor`` serving many concurrent rollouts.
+
+Coroutines ``await`` queries that run on a fixed set of worker threads::
+
+    async with AsyncExecutor(workers=8, timeout=2.0) as ex:
+        result = await ex.execute("finance/retail_banking/retail_banking_normalized.db", sql)
+
+Results are the dicts of ``Executor.execute``. Scheduling:
+
+backpressure  at most ``max_pending`` queries are queued or running; further
+              ``execute`` calls wait for a slot instead of growing the queue.
+affinity      every worker thread keeps its own read-only connection per
+              database, so a connection (and its page cache and prepared
+              statement cache) only ever runs on one thread.
+fairness      pending queries are queued per database and workers take them
+              round-robin across databases, at most ``per_db`` at a time for
+              any one database, so a burst against one db cannot starve the
+              others.
+cancellation  cancelling the awaiting task drops a query that has not
+              started, or calls ``interrupt()`` on the connection running it.
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import os
+import sqlite3
+import threading
+from typing import Sequence
+
+from common.executor import Executor, _error, open_error
+
+
+class _Job:
+    __slots__ = ("key", "sql", "params", "limits", "loop", "future", "conn", "cancelled")
+
+    def __init__(self, key, sql, params, limits, loop, future) -> None:
+        self.key = key
+        self.sql = sql
+        self.params = params
+        self.limits = limits
+        self.loop = loop
+        self.future = future
+        self.conn: sqlite3.Connection | None = None
+        self.cancelled = False
+
+
+def _resolve(future: asyncio.Future, result: dict) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+class AsyncExecutor:
+    """Bounded, fair, cancellable thread pool behind ``await execute(db, sql)``."""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_pending: int = 1024,
+        per_db: int = 2,
+        executor: Executor | None = None,
+        **limits,
+    ) -> None:
+        self.executor = executor or Executor(**limits)
+        self.per_db = per_db
+        self._slots = asyncio.Semaphore(max_pending)
+        self._queues: dict[str, collections.deque[_Job]] = {}
+        self._ready: collections.deque[str] = collections.deque()  # dbs with queued jobs
+        self._running: collections.Counter[str] = collections.Counter()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.stats = {"submitted": 0, "completed": 0, "cancelled": 0, "interrupted": 0}
+        self._threads = [
+            threading.Thread(target=self._work, name=f"sqlgym-exec-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    async def execute(
+        self,
+        db: str | os.PathLike,
+        sql: str,
+        params: Sequence = (),
+        **limits,
+    ) -> dict:
+        """Run ``sql`` on a worker thread; ``limits`` as for ``Executor.execute``."""
+        if self._closed:
+            raise RuntimeError("AsyncExecutor is closed")
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            job = _Job(os.path.abspath(db), sql, params, limits, loop, loop.create_future())
+            self._submit(job)
+            try:
+                return await job.future
+            except asyncio.CancelledError:
+                self._cancel(job)
+                raise
+
+    def _submit(self, job: _Job) -> None:
+        with self._cond:
+            queue = self._queues.setdefault(job.key, collections.deque())
+            if not queue:
+                self._ready.append(job.key)
+            queue.append(job)
+            self.stats["submitted"] += 1
+            self._cond.notify()
+
+    def _cancel(self, job: _Job) -> None:
+        with self._cond:
+            job.cancelled = True
+            self.stats["cancelled"] += 1
+            if job.conn is not None:
+                try:
+                    job.conn.interrupt()
+                except sqlite3.ProgrammingError:  # closed by its worker meanwhile
+                    return
+                self.stats["interrupted"] += 1
+
+    def _next(self) -> _Job | None:
+        """Pop the next job round-robin across databases (caller holds the lock)."""
+        capped = 0  # ready dbs already at per_db, moved to the back
+        while capped < len(self._ready):
+            key = self._ready.popleft()
+            queue = self._queues[key]
+            while queue and queue[0].cancelled:
+                queue.popleft()  # dropping cancelled jobs does not use up the db's turn
+            if not queue:
+                continue
+            if self._running[key] >= self.per_db:
+                self._ready.append(key)
+                capped += 1
+                continue
+            job = queue.popleft()
+            if queue:
+                self._ready.append(key)
+            self._running[key] += 1
+            return job
+        return None
+
+    def _work(self) -> None:
+        conns: dict[str, sqlite3.Connection] = {}
+        try:
+            while True:
+                with self._cond:
+                    job = self._next()
+                    while job is None and not self._closed:
+                        self._cond.wait()
+                        job = self._next()
+                    if job is None:
+                        return
+                try:
+                    result = self._run(job, conns)
+                except Exception as e:  # e.g. a bad limits kwarg; the awaiting task must not hang
+                    result = _error("internal", f"{type(e).__name__}: {e}")
+                finally:
+                    with self._cond:
+                        job.conn = None
+                        self._running[job.key] -= 1
+                        self.stats["completed"] += 1
+                        if self._queues[job.key]:
+                            self._cond.notify()  # a per_db-capped db may be runnable now
+                if not job.cancelled:
+                    job.loop.call_soon_threadsafe(_resolve, job.future, result)
+        finally:
+            for conn in conns.values():
+                conn.close()
+
+    def _run(self, job: _Job, conns: dict[str, sqlite3.Connection]) -> dict | None:
+        conn = conns.get(job.key)
+        if conn is None:
+            try:
+                conn = conns[job.key] = self.executor.connect(job.key)
+            except (FileNotFoundError, sqlite3.Error) as e:
+                return open_error(e)
+        with self._cond:
+            if job.cancelled:
+                return None
+            job.conn = conn
+        return self.executor.run(conn, job.sql, job.params, **job.limits)
+
+    def close(self) -> None:
+        """Stop the workers once queued queries finish; close their connections."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    async def __aenter__(self) -> "AsyncExecutor":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await asyncio.to_thread(self.close)
@@ -0,0 +1,260 @@
+"""History of ``performance_benchmark.py`` runs and regression detection.
+
+Every benchmark run is appended to ``.build_cache/benchmark_history.db`` instead
+of only overwriting ``performance_benchmark_results.json``::
+
+    history = BenchHistory()
+    run_id = history.record(results)            # done by performance_benchmark.py
+    report = history.compare(baseline, run_id)  # {"regressions": [...], ...}
+
+A run is keyed by the git commit (plus a dirty flag), a host fingerprint
+(hostname, CPU, OS, Python and SQLite versions) and a corpus fingerprint (the
+content hashes of the benchmarked databases and of the benchmarked SQL), and
+stores every query's raw timing samples per mode.
+
+``compare`` matches queries by subdomain, name and mode and runs a one-sided
+Mann-Whitney U test per query on the raw samples (no normality assumption; a
+noisy outlier cannot carry the result). A query regresses when the test is
+significant at ``alpha`` after a Bonferroni correction over all compared
+queries *and* its p50 grew by at least ``min_change`` (relative) and
+``min_ms`` (absolute), so statistically real but negligible slowdowns of
+microsecond lookups are not reported. Baselines from another host are compared
+only when asked to, since their timings are not comparable.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import pathlib
+import platform
+import sqlite3
+import subprocess
+import time
+import zlib
+
+from common.gold import db_fingerprint
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+DEFAULT_HISTORY = ROOT / ".build_cache" / "benchmark_history.db"
+ALPHA = 0.01
+MIN_CHANGE = 0.10  # p50 must grow by 10% ...
+MIN_MS = 0.05  # ... and by 50 microseconds to count
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY, created_at TEXT NOT NULL, git_commit TEXT, git_dirty INTEGER,
+    host_fingerprint TEXT NOT NULL, host TEXT NOT NULL, corpus_fingerprint TEXT NOT NULL, config TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_commit ON runs (git_commit);
+CREATE INDEX IF NOT EXISTS runs_by_host ON runs (host_fingerprint, id);
+CREATE TABLE IF NOT EXISTS measurements (
+    run_id INTEGER NOT NULL REFERENCES runs (id), scope TEXT NOT NULL, query_class TEXT NOT NULL,
+    query_name TEXT NOT NULL, mode TEXT NOT NULL, sql_hash TEXT, p50_ms REAL, p95_ms REAL, p99_ms REAL,
+    samples BLOB NOT NULL,
+    PRIMARY KEY (run_id, scope, query_name, mode)
+);
+"""
+
+
+def host_info() -> dict:
+    return {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "system": f"{platform.system()} {platform.release()}",
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+    }
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def git_commit(root: pathlib.Path = ROOT) -> tuple[str | None, bool]:
+    """``(HEAD sha, tracked files modified)``; ``(None, False)`` outside a checkout."""
+    try:
+        sha = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return sha, bool(dirty)
+
+
+def corpus_fingerprint(results: dict, root: pathlib.Path = ROOT) -> str:
+    """Hash of every benchmarked database's contents and every query's SQL."""
+    parts = []
+    for system in results["results"]:
+        if "benchmarks" not in system:
+            continue
+        sql = sorted(q.get("sql_hash") or "" for qs in system["benchmarks"].values() for q in qs)
+        parts.append((system["db_path"], db_fingerprint(root / system["db_path"]), sql))
+    return _digest(sorted(parts))
+
+
+def mann_whitney_greater(a: list[float], b: list[float]) -> float:
+    """One-sided p-value that ``b`` tends to be larger than ``a``.
+
+    Normal approximation of the U statistic with tie and continuity corrections.
+    """
+    n1, n2 = len(a), len(b)
+    if not n1 or not n2:
+        return 1.0
+    pooled = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    n = n1 + n2
+    rank_b, ties, i = 0.0, 0, 0
+    while i < n:
+        j = i
+        while j + 1 < n and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        t = j - i + 1
+        rank = (i + j) / 2 + 1  # average rank of the tied group
+        rank_b += rank * sum(1 for k in range(i, j + 1) if pooled[k][1])
+        ties += t ** 3 - t
+        i = j + 1
+    u = rank_b - n2 * (n2 + 1) / 2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))))
+    if sigma == 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+class BenchHistory:
+    """SQLite store of benchmark runs; see the module docstring."""
+
+    def __init__(self, path: str | os.PathLike = DEFAULT_HISTORY) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def record(self, results: dict, root: pathlib.Path = ROOT) -> int:
+        """Append a ``performance_benchmark.py`` results document; return its run id."""
+        host = host_info()
+        commit, dirty = git_commit(root)
+        with self.conn:
+            run_id = self.conn.execute(
+                "INSERT INTO runs (created_at, git_commit, git_dirty, host_fingerprint, host, corpus_fingerprint, config) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    time.strftime("%Y-%m-%d %H:%M:%S"), commit, int(dirty), _digest(host), json.dumps(host),
+                    corpus_fingerprint(results, root), json.dumps(results.get("config")),
+                ),
+            ).lastrowid
+            rows = []
+            for system in results["results"]:
+                scope = f"{system['domain']}/{system['subdomain']}"
+                for query_class, queries in system.get("benchmarks", {}).items():
+                    for q in queries:
+                        for mode in ("warm", "cold"):
+                            stats = q.get(mode)
+                            if not stats:
+                                continue
+                            rows.append((
+                                run_id, scope, query_class, q["query_name"], mode, q.get("sql_hash"),
+                                stats["p50_ms"], stats["p95_ms"], stats["p99_ms"],
+                                zlib.compress(json.dumps(stats["samples_ms"]).encode()),
+                            ))
+            self.conn.executemany("INSERT INTO measurements VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return run_id
+
+    def runs(self, limit: int | None = None) -> list[dict]:
+        """Recorded runs, newest first."""
+        sql = (
+            "SELECT r.id, r.created_at, r.git_commit, r.git_dirty, r.host_fingerprint, r.corpus_fingerprint, "
+            "COUNT(m.run_id) FROM runs r LEFT JOIN measurements m ON m.run_id = r.id GROUP BY r.id ORDER BY r.id DESC"
+        )
+        rows = self.conn.execute(sql + (f" LIMIT {int(limit)}" if limit else "")).fetchall()
+        keys = ("id", "created_at", "git_commit", "git_dirty", "host_fingerprint", "corpus_fingerprint", "measurements")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def resolve(self, ref: str | int | None, before: int | None = None, host: str | None = None) -> int | None:
+        """Run id for ``ref``: an id, a git commit prefix (its latest run), or
+        None for the latest run (before run ``before``, on ``host`` if given)."""
+        where, params = [], []
+        if ref is not None and str(ref).isdigit() and self.conn.execute("SELECT 1 FROM runs WHERE id = ?", (int(ref),)).fetchone():
+            return int(ref)
+        if ref is not None:
+            where.append("git_commit LIKE ?")
+            params.append(f"{ref}%")
+        if before is not None:
+            where.append("id < ?")
+            params.append(before)
+        if host is not None:
+            where.append("host_fingerprint = ?")
+            params.append(host)
+        row = self.conn.execute(
+            "SELECT MAX(id) FROM runs" + (" WHERE " + " AND ".join(where) if where else ""), params
+        ).fetchone()
+        return row[0]
+
+    def _measurements(self, run_id: int) -> dict[tuple, tuple]:
+        return {
+            (scope, name, mode): (query_class, sql_hash, p50, json.loads(zlib.decompress(samples)))
+            for scope, query_class, name, mode, sql_hash, p50, samples in self.conn.execute(
+                "SELECT scope, query_class, query_name, mode, sql_hash, p50_ms, samples FROM measurements WHERE run_id = ?",
+                (run_id,),
+            )
+        }
+
+    def compare(
+        self,
+        baseline: int,
+        candidate: int,
+        alpha: float = ALPHA,
+        min_change: float = MIN_CHANGE,
+        min_ms: float = MIN_MS,
+    ) -> dict:
+        """Per-query regressions (and improvements) of run ``candidate`` against ``baseline``.
+
+        Returns ``{"compared", "regressions", "improvements", "missing", "added",
+        "same_host", "same_corpus"}``; each regression/improvement is ``{"scope",
+        "class", "query", "mode", "baseline_p50_ms", "candidate_p50_ms",
+        "change", "p_value", "sql_changed"}``.
+        """
+        runs = {
+            run_id: (host, corpus)
+            for run_id, host, corpus in self.conn.execute(
+                "SELECT id, host_fingerprint, corpus_fingerprint FROM runs WHERE id IN (?, ?)", (baseline, candidate)
+            )
+        }
+        old, new = self._measurements(baseline), self._measurements(candidate)
+        shared = sorted(set(old) & set(new))
+        threshold = alpha / max(len(shared), 1)  # Bonferroni over every compared query
+        report = {
+            "compared": len(shared),
+            "regressions": [],
+            "improvements": [],
+            "missing": sorted("/".join(k) for k in set(old) - set(new)),
+            "added": sorted("/".join(k) for k in set(new) - set(old)),
+            "same_host": runs[baseline][0] == runs[candidate][0],
+            "same_corpus": runs[baseline][1] == runs[candidate][1],
+        }
+        for key in shared:
+            query_class, old_hash, old_p50, old_samples = old[key]
+            _, new_hash, new_p50, new_samples = new[key]
+            for kind, (a, b, slow_p50, fast_p50) in (
+                ("regressions", (old_samples, new_samples, new_p50, old_p50)),
+                ("improvements", (new_samples, old_samples, old_p50, new_p50)),
+            ):
+                if slow_p50 - fast_p50 < max(min_ms, fast_p50 * min_change):
+                    continue
+                p = mann_whitney_greater(a, b)
+                if p < threshold:
+                    report[kind].append({
+                        "scope": key[0], "class": query_class, "query": key[1], "mode": key[2],
+                        "baseline_p50_ms": old_p50, "candidate_p50_ms": new_p50,
+                        "change": round(new_p50 / old_p50 - 1, 3) if old_p50 else None,
+                        "p_value": p, "sql_changed": old_hash != new_hash,
+                    })
+        for kind in ("regressions", "improvements"):
+            report[kind].sort(key=lambda r: r["p_value"])
+        return report
+
+    def close(self) -> None:
+        self.conn.close()
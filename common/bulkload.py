@@ -0,0 +1,93 @@
+"""Bulk-load sessions for fast SQLite writes during corpus builds."""
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator
+
+# Durability is irrelevant while building: a failed build is simply rerun.
+BUILD_PRAGMAS = {
+    "synchronous": "OFF",
+    "cache_size": "-262144",  # negative means KiB, i.e. 256 MiB
+    "temp_store": "MEMORY",
+    "foreign_keys": "OFF",  # checked once by foreign_key_check at the end
+}
+
+
+def deferrable_indexes(conn: sqlite3.Connection) -> list[tuple[str, str]]:
+    """Return ``(name, sql)`` for non-unique secondary indexes in ``main``.
+
+    Unique indexes are left in place because they enforce constraints that
+    ``INSERT OR IGNORE``/``OR REPLACE`` statements rely on during the load.
+    """
+    rows = conn.execute(
+        "SELECT name, sql FROM main.sqlite_master WHERE type='index' AND sql IS NOT NULL"
+    ).fetchall()
+    return [(name, sql) for name, sql in rows if not sql.lstrip().upper().startswith("CREATE UNIQUE")]
+
+
+def check_foreign_keys(conn: sqlite3.Connection) -> None:
+    """Raise ``sqlite3.IntegrityError`` if ``main`` has foreign key violations."""
+    violations = conn.execute("PRAGMA main.foreign_key_check").fetchall()
+    if violations:
+        tables = ", ".join(sorted({row[0] for row in violations}))
+        raise sqlite3.IntegrityError(f"{len(violations)} foreign key violations in {tables}")
+
+
+@contextmanager
+def bulk_load(
+    db: str,
+    journal_mode: str = "OFF",
+    defer_indexes: bool = True,
+    check_fks: bool = True,
+    schema: str | None = None,
+) -> Iterator[sqlite3.Connection]:
+    """Open ``db`` for a bulk load and finalise it on exit.
+
+    On entry ``schema`` (DDL) is applied, then the build pragmas, and
+    non-unique secondary indexes are dropped. Only indexes that exist at this
+    point are deferred: pass the schema here rather than running it in the
+    body, where its indexes would be maintained row by row. A schema-only
+    script can pass an empty body.
+
+    The body runs as a single transaction as long as it writes through
+    ``execute``/``executemany`` and does not commit itself. ``executescript``
+    commits whatever is pending before it runs, which is another reason DDL
+    belongs in ``schema``; ``common.denormalize.attach`` commits too, as
+    ATTACH cannot run inside a transaction. On clean exit the transaction is
+    committed, dropped indexes that the body did not recreate are rebuilt, one
+    ``foreign_key_check`` is run and the connection is closed.
+
+    ``journal_mode`` may be ``"OFF"`` (fastest) or ``"WAL"``; WAL databases
+    are switched back to rollback journaling before closing. With the journal
+    off, a failing body cannot be rolled back: the file is left half-written
+    and must be rebuilt, which the build does anyway.
+    """
+    conn = sqlite3.connect(db)
+    try:
+        conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        if schema:
+            conn.executescript(schema)
+        for pragma, value in BUILD_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma}={value}")
+        deferred = deferrable_indexes(conn) if defer_indexes else []
+        for name, _ in deferred:
+            conn.execute(f'DROP INDEX main."{name}"')
+
+        yield conn
+
+        conn.commit()
+        existing = {row[0] for row in conn.execute("SELECT name FROM main.sqlite_master WHERE type='index'")}
+        for name, sql in deferred:
+            if name not in existing:
+                conn.execute(sql)
+        conn.commit()
+        if check_fks:
+            check_foreign_keys(conn)
+        if journal_mode.upper() == "WAL":
+            conn.execute("PRAGMA journal_mode=DELETE")
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
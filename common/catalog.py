@@ -0,0 +1,233 @@
+"""Compiled index of every task file, so guards and loaders stop re-parsing markdown.
+
+``sample_text_to_sql_tasks.md`` (per subdomain) and ``workflow_tasks.md`` (per
+domain and subdomain) are parsed once into a SQLite catalog holding task ids,
+titles, user text, every SQL block with its ``fast``/``slow`` tag, the
+fast/slow pairs, evidence references and workflow steps with their
+dependencies::
+
+    catalog = TaskCatalog()                       # compiles stale files first
+    catalog.pairs("finance/retail_banking")       # [(fast_sql, slow_sql), ...]
+    catalog.task("finance/retail_banking", 3)     # one indexed lookup
+
+Every source is recorded with its size and mtime; opening the catalog stats
+the task files and recompiles only those that changed, appeared or vanished,
+so a stale catalog is never read. ``make build`` compiles it up front.
+"""
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import re
+import sqlite3
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+DEFAULT_CATALOG = ROOT / ".build_cache" / "task_catalog.db"
+TASKS_FILE = "sample_text_to_sql_tasks.md"
+WORKFLOW_FILE = "workflow_tasks.md"
+
+TASK_RE = re.compile(r"^## Task (\d+):?[ \t]*([^\n]*)$", re.MULTILINE)
+SQL_RE = re.compile(r"^```sql[ \t]*(\w*)[ \t]*\n(.*?)^```", re.DOTALL | re.MULTILINE)
+USER_RE = re.compile(r"^\*\*User\*\*:[ \t]*([^\n]*)$", re.MULTILINE)
+EVIDENCE_RE = re.compile(r"evidence/([\w_.-]+)")
+WORKFLOW_RE = re.compile(r"^## Task:[ \t]*([^\n]*)$", re.MULTILINE)
+WORKFLOW_BLOCK_RE = re.compile(r"```sql\n(.*?)```", re.DOTALL)
+STEP_RE = re.compile(r"--\s*step:\s*(\w+)")
+STEP_SPLIT_RE = re.compile(r"^(?=[ \t]*--\s*step:)", re.MULTILINE)
+DEP_RE = re.compile(r"--\s*depends:\s*([\w, ]+)")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY, kind TEXT NOT NULL, scope TEXT NOT NULL, size INTEGER, mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    scope TEXT NOT NULL, task INTEGER NOT NULL, title TEXT, user_text TEXT,
+    PRIMARY KEY (scope, task)
+);
+CREATE TABLE IF NOT EXISTS queries (
+    scope TEXT NOT NULL, seq INTEGER NOT NULL, task INTEGER NOT NULL, turn INTEGER NOT NULL,
+    tag TEXT NOT NULL, user_text TEXT, sql TEXT NOT NULL,
+    PRIMARY KEY (scope, seq)
+);
+CREATE TABLE IF NOT EXISTS pairs (
+    scope TEXT NOT NULL, seq INTEGER NOT NULL, fast_sql TEXT NOT NULL, slow_sql TEXT NOT NULL,
+    PRIMARY KEY (scope, seq)
+);
+CREATE TABLE IF NOT EXISTS evidence (
+    scope TEXT NOT NULL, seq INTEGER NOT NULL, file TEXT NOT NULL, PRIMARY KEY (scope, seq)
+);
+CREATE TABLE IF NOT EXISTS workflow_steps (
+    scope TEXT NOT NULL, seq INTEGER NOT NULL, workflow TEXT, step TEXT, depends TEXT, sql TEXT NOT NULL,
+    PRIMARY KEY (scope, seq)
+);
+"""
+TABLES = {"tasks": ("tasks", "queries", "pairs", "evidence"), "workflow": ("workflow_steps",)}
+
+
+def _sections(text: str, heads: list[re.Match]) -> list[tuple[re.Match | None, str]]:
+    """Split ``text`` at ``heads``; text before the first head has no head."""
+    bounds = [m.start() for m in heads] + [len(text)]
+    return [(None, text[:bounds[0]])] + [(m, text[m.end():bounds[i + 1]]) for i, m in enumerate(heads)]
+
+
+def parse_tasks_file(text: str) -> dict[str, list]:
+    """Rows for the ``tasks``/``queries``/``pairs``/``evidence`` tables (sans scope)."""
+    tasks, queries = [], []
+    for head, body in _sections(text, list(TASK_RE.finditer(text)))[1:]:
+        number = int(head.group(1))
+        users = [(m.start(), m.group(1).strip()) for m in USER_RE.finditer(body)]
+        tasks.append((number, head.group(2).strip(), users[0][1] if users else None))
+        turn = 0
+        for block in SQL_RE.finditer(body):
+            tag = block.group(1)
+            if tag in ("", "fast"):
+                turn += 1  # a slow block belongs to the turn of its fast block
+            user = next((u for pos, u in reversed(users) if pos < block.start()), None)
+            queries.append((len(queries), number, max(turn, 1), tag, user, block.group(2).strip()))
+    # Same pairing as the efficiency guard always used: consecutive fast/slow
+    # blocks anywhere in the file.
+    pairs, fast = [], None
+    slow = None
+    for _, _, _, tag, _, sql in queries:
+        if tag == "fast":
+            fast = sql
+        elif tag == "slow":
+            slow = sql
+        if fast and slow:
+            pairs.append((len(pairs), fast, slow))
+            fast = slow = None
+    evidence = [(i, name) for i, name in enumerate(EVIDENCE_RE.findall(text))]
+    return {"tasks": tasks, "queries": queries, "pairs": pairs, "evidence": evidence}
+
+
+def parse_workflow_file(text: str) -> dict[str, list]:
+    """Rows for the ``workflow_steps`` table (sans scope)."""
+    steps = []
+    for head, body in _sections(text, list(WORKFLOW_RE.finditer(text))):
+        workflow = head.group(1).strip() if head else None
+        # Some files put several ``-- step:`` sections in one block.
+        blocks = [part for block in WORKFLOW_BLOCK_RE.findall(body) for part in STEP_SPLIT_RE.split(block) if part.strip()]
+        for sql in blocks:
+            step = STEP_RE.search(sql)
+            dep = DEP_RE.search(sql)
+            depends = [d.strip() for d in dep.group(1).split(",") if d.strip()] if dep else []
+            steps.append((len(steps), workflow, step.group(1) if step else None, json.dumps(depends), sql))
+    return {"workflow_steps": steps}
+
+
+def task_files(root: pathlib.Path = ROOT) -> dict[str, tuple[str, str]]:
+    """``{relative path: (kind, scope)}`` for every task file at any depth
+    under ``root`` (e.g. ``sqlgym_production/<domain>/<subdomain>`` too);
+    hidden directories such as ``.git`` and ``.build_cache`` are skipped."""
+    kinds = {TASKS_FILE: "tasks", WORKFLOW_FILE: "workflow"}
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in set(filenames) & set(kinds):
+            rel = (pathlib.Path(dirpath) / name).relative_to(root)
+            if rel.parent != pathlib.Path("."):
+                files[rel.as_posix()] = (kinds[name], rel.parent.as_posix())
+    return files
+
+
+def compile_catalog(path: str | os.PathLike = DEFAULT_CATALOG, root: pathlib.Path = ROOT) -> dict[str, int]:
+    """Bring the catalog at ``path`` up to date; return counts of files
+    ``compiled``, ``unchanged`` and ``removed``."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(SCHEMA)
+        known = {p: (size, mtime) for p, size, mtime in conn.execute("SELECT path, size, mtime_ns FROM sources")}
+        files = task_files(root)
+        stats = {"compiled": 0, "unchanged": 0, "removed": 0}
+        for rel in sorted(set(known) - set(files)):
+            kind, scope = conn.execute("SELECT kind, scope FROM sources WHERE path = ?", (rel,)).fetchone()
+            for table in TABLES[kind]:
+                conn.execute(f"DELETE FROM {table} WHERE scope = ?", (scope,))
+            conn.execute("DELETE FROM sources WHERE path = ?", (rel,))
+            stats["removed"] += 1
+        for rel, (kind, scope) in sorted(files.items()):
+            st = os.stat(root / rel)
+            if known.get(rel) == (st.st_size, st.st_mtime_ns):
+                stats["unchanged"] += 1
+                continue
+            text = (root / rel).read_text(encoding="utf-8")
+            rows = parse_tasks_file(text) if kind == "tasks" else parse_workflow_file(text)
+            for table, table_rows in rows.items():
+                conn.execute(f"DELETE FROM {table} WHERE scope = ?", (scope,))
+                if table_rows:
+                    marks = ",".join("?" * (len(table_rows[0]) + 1))
+                    conn.executemany(f"INSERT OR REPLACE INTO {table} VALUES ({marks})", [(scope, *r) for r in table_rows])
+            conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)", (rel, kind, scope, st.st_size, st.st_mtime_ns))
+            stats["compiled"] += 1
+        conn.commit()
+        return stats
+    finally:
+        conn.close()
+
+
+class TaskCatalog:
+    """Read access to a compiled catalog; scopes are ``domain[/subdomain]`` paths."""
+
+    def __init__(self, path: str | os.PathLike = DEFAULT_CATALOG, root: pathlib.Path = ROOT, refresh: bool = True) -> None:
+        if refresh:
+            compile_catalog(path, root)
+        self.root = root
+        self.conn = sqlite3.connect(path)
+
+    def scopes(self, kind: str = "tasks") -> list[str]:
+        """Scopes that have a file of ``kind`` (``tasks`` or ``workflow``)."""
+        return [s for (s,) in self.conn.execute("SELECT scope FROM sources WHERE kind = ? ORDER BY scope", (kind,))]
+
+    def task(self, scope: str, task: int) -> dict | None:
+        """One task with its SQL turns: ``{"task", "title", "user_text", "queries"}``."""
+        row = self.conn.execute(
+            "SELECT title, user_text FROM tasks WHERE scope = ? AND task = ?", (scope, task)
+        ).fetchone()
+        if row is None:
+            return None
+        queries = [
+            {"turn": turn, "tag": tag, "user_text": user, "sql": sql}
+            for turn, tag, user, sql in self.conn.execute(
+                "SELECT turn, tag, user_text, sql FROM queries WHERE scope = ? AND task = ? ORDER BY seq", (scope, task)
+            )
+        ]
+        return {"task": task, "title": row[0], "user_text": row[1], "queries": queries}
+
+    def gold(self, scope: str) -> list[dict]:
+        """Gold turns (plain and ``fast`` blocks): ``[{"id", "task", "turn", "sql"}]``."""
+        return [
+            {"id": f"{task}.{turn}", "task": task, "turn": turn, "sql": sql}
+            for task, turn, sql in self.conn.execute(
+                "SELECT task, turn, sql FROM queries WHERE scope = ? AND tag IN ('', 'fast') ORDER BY seq", (scope,)
+            )
+        ]
+
+    def queries(self, scope: str) -> list[dict]:
+        """Every SQL block of ``scope``'s tasks: ``[{"task", "turn", "tag", "sql"}]``."""
+        return [
+            {"task": task, "turn": turn, "tag": tag, "sql": sql}
+            for task, turn, tag, sql in self.conn.execute(
+                "SELECT task, turn, tag, sql FROM queries WHERE scope = ? ORDER BY seq", (scope,)
+            )
+        ]
+
+    def pairs(self, scope: str) -> list[tuple[str, str]]:
+        return self.conn.execute("SELECT fast_sql, slow_sql FROM pairs WHERE scope = ? ORDER BY seq", (scope,)).fetchall()
+
+    def evidence(self, scope: str) -> list[str]:
+        """Evidence file names referenced by ``scope``'s tasks, in order of mention."""
+        return [f for (f,) in self.conn.execute("SELECT file FROM evidence WHERE scope = ? ORDER BY seq", (scope,))]
+
+    def workflow_steps(self, scope: str) -> list[dict]:
+        """Workflow SQL blocks in file order: ``{"workflow", "step", "depends", "sql"}``."""
+        return [
+            {"workflow": wf, "step": step, "depends": json.loads(deps), "sql": sql}
+            for wf, step, deps, sql in self.conn.execute(
+                "SELECT workflow, step, depends, sql FROM workflow_steps WHERE scope = ? ORDER BY seq", (scope,)
+            )
+        ]
+
+    def close(self) -> None:
+        self.conn.close()
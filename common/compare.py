@@ -0,0 +1,164 @@
+"""Streaming, order-insensitive comparison of query results.
+
+Two result sets are equal when they hold the same rows with the same
+multiplicities, in any order. Instead of fetching both and sorting, each side
+is folded into a ``MultisetHash`` while rows are streamed with ``fetchmany``,
+so a comparison holds at most one batch per query in memory::
+
+    verdict = compare(conn, predicted_sql, gold_sql)
+    verdict["equal"], verdict["reason"]     # reason: "columns", "row_count", "hash", ...
+
+``gold`` may also be a cached answer from ``common.gold.GoldCache.lookup``;
+then only the predicted query runs. The predicted and gold queries are
+streamed in lockstep, so a row-count mismatch stops both statements as soon as
+one side runs out (or, against a cached answer, as soon as the prediction has
+more rows than the gold result).
+
+Options:
+
+float_digits         floats are rounded to this many decimal places before
+                     hashing (``None``: exact), absorbing SUM/AVG summation-order
+                     noise; an integral float equals the integer (``3.0 == 3``)
+ignore_column_order  rows are hashed as multisets of cells, so ``SELECT a, b``
+                     matches ``SELECT b, a``. This also equates results whose
+                     rows permute their cells differently, which real answers
+                     practically never do.
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from typing import Iterable, Sequence
+
+from common.executor import FETCH_BATCH, PROGRESS_STEP, Budget
+
+FLOAT_DIGITS = 6
+_HASH_MOD = 1 << 256
+
+
+def canonical(value, float_digits: int | None = FLOAT_DIGITS) -> str:
+    """Type-tagged text form of one cell; equal answers encode equally."""
+    if value is None:
+        return "n"
+    if isinstance(value, float):
+        if float_digits is not None:
+            value = round(value, float_digits)
+        if value.is_integer():
+            return f"i{int(value)}"
+        return f"f{value!r}"
+    if isinstance(value, int):
+        return f"i{value}"
+    if isinstance(value, bytes):
+        return f"b{value.hex()}"
+    return f"s{value}"
+
+
+class MultisetHash:
+    """Incremental order-insensitive hash of a stream of rows.
+
+    Every row's SHA-256 is added modulo 2**256 (an additive multiset hash), so
+    rows can arrive in any order and in any batches. Column names are not
+    hashed: aliases do not change an answer.
+    """
+
+    def __init__(self, float_digits: int | None = FLOAT_DIGITS, ignore_column_order: bool = False) -> None:
+        self.float_digits = float_digits
+        self.ignore_column_order = ignore_column_order
+        self.count = 0
+        self.total = 0
+
+    def update(self, rows: Iterable[Iterable]) -> "MultisetHash":
+        digits, sort, sha256, from_bytes = self.float_digits, self.ignore_column_order, hashlib.sha256, int.from_bytes
+        total = self.total
+        count = 0
+        for row in rows:
+            cells = [canonical(v, digits) for v in row]
+            if sort:
+                cells.sort()
+            total += from_bytes(sha256("\x1f".join(cells).encode()).digest(), "big")
+            count += 1
+        # One reduction per batch; the unreduced sum only grows by log2(batch) bits.
+        self.total = total % _HASH_MOD
+        self.count += count
+        return self
+
+    def hexdigest(self) -> str:
+        return f"{self.count}:{self.total:064x}"
+
+
+def result_hash(rows: Iterable[Iterable], **options) -> str:
+    """``MultisetHash`` of a whole result set, e.g. ``"10:3fa9..."``."""
+    return MultisetHash(**options).update(rows).hexdigest()
+
+
+def _verdict(equal: bool, reason: str | None, pred: MultisetHash, gold_rows: int, error: str | None = None) -> dict:
+    return {"equal": equal, "reason": reason, "predicted_rows": pred.count, "gold_rows": gold_rows, "error": error}
+
+
+def compare(
+    conn: sqlite3.Connection,
+    predicted: str,
+    gold: str | dict,
+    params: Sequence = (),
+    float_digits: int | None = FLOAT_DIGITS,
+    ignore_column_order: bool = False,
+    timeout: float | None = None,
+    batch: int = FETCH_BATCH,
+) -> dict:
+    """Compare ``predicted`` (bound to ``params``) with ``gold`` (SQL, or a cached answer).
+
+    Returns ``{"equal", "reason", "predicted_rows", "gold_rows", "error"}``.
+    ``reason`` is None when equal, else ``columns`` (different widths),
+    ``row_count``, ``hash``, ``error`` (a query failed), ``timeout`` or
+    ``gold_error`` (the cached gold query failed). Row counts are those read
+    before the comparison stopped. A cached answer must have been hashed with
+    the same options (``GoldCache`` uses the defaults).
+    """
+    options = {"float_digits": float_digits, "ignore_column_order": ignore_column_order}
+    pred_hash, gold_hash = MultisetHash(**options), MultisetHash(**options)
+    if isinstance(gold, dict) and not gold["ok"]:
+        return _verdict(False, "gold_error", pred_hash, 0, gold["error"])
+    budget = Budget(timeout, None)
+    conn.set_progress_handler(budget, PROGRESS_STEP)
+    cursors = []
+    try:
+        pred_cur = conn.execute(predicted, params)
+        cursors.append(pred_cur)
+        if isinstance(gold, dict):
+            # Cached answer: stream the prediction only.
+            expected = gold["row_count"]
+            while True:
+                rows = pred_cur.fetchmany(batch)
+                if not rows:
+                    break
+                pred_hash.update(rows)
+                if pred_hash.count > expected:
+                    return _verdict(False, "row_count", pred_hash, expected)
+            if pred_hash.count != expected:
+                return _verdict(False, "row_count", pred_hash, expected)
+            equal = pred_hash.hexdigest() == gold["hash"]
+            return _verdict(equal, None if equal else "hash", pred_hash, expected)
+
+        gold_cur = conn.execute(gold)
+        cursors.append(gold_cur)
+        if len(pred_cur.description or ()) != len(gold_cur.description or ()):
+            return _verdict(False, "columns", pred_hash, 0)
+        while True:
+            pred_rows, gold_rows = pred_cur.fetchmany(batch), gold_cur.fetchmany(batch)
+            pred_hash.update(pred_rows)
+            gold_hash.update(gold_rows)
+            if len(pred_rows) != len(gold_rows):
+                # fetchmany only comes back short at the end of a result set.
+                return _verdict(False, "row_count", pred_hash, gold_hash.count)
+            if not pred_rows:
+                break
+        equal = pred_hash.total == gold_hash.total
+        return _verdict(equal, None if equal else "hash", pred_hash, gold_hash.count)
+    except (sqlite3.Error, sqlite3.Warning) as e:
+        if budget.exceeded:
+            return _verdict(False, budget.exceeded, pred_hash, gold_hash.count, f"comparison exceeded {timeout}s")
+        return _verdict(False, "error", pred_hash, gold_hash.count, str(e))
+    finally:
+        for cur in cursors:
+            cur.close()
+        conn.set_progress_handler(None, 0)
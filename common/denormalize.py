@@ -0,0 +1,201 @@
+"""Compute denormalized tables inside SQLite from an attached normalized db.
+
+Rollups run as ``INSERT INTO <table> SELECT ...`` with the normalized database
+ATTACHed to the denormalized connection, so rows never cross into Python::
+
+    with bulk_load(args.db) as dst, attach(dst, args.source):
+        materialize(dst, "sensor_daily_avg", "SELECT ... FROM readings GROUP BY ...")
+
+Queries name normalized tables unqualified. SQLite looks a name up in ``main``
+first and then in attached schemas, so ``attach`` refuses a source db whose
+tables would be shadowed by a denormalized table of the same name.
+
+Tables listed in a script's ``VIEWS`` can also be refreshed incrementally by
+``refresh`` (see ``scripts/refresh_views.py``), recomputing only the partitions
+touched by rows appended since the last run.
+"""
+from __future__ import annotations
+
+import contextlib
+import os
+import pathlib
+import sqlite3
+from typing import Iterator, Sequence
+
+from common.utils import DEFAULT_CHUNK, stream_insert
+
+
+def _tables(conn: sqlite3.Connection, schema: str) -> set[str]:
+    return {
+        name.lower()
+        for (name,) in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type='table'")
+    }
+
+
+@contextlib.contextmanager
+def attach(conn: sqlite3.Connection, db: str | os.PathLike, alias: str = "norm") -> Iterator[sqlite3.Connection]:
+    """ATTACH ``db`` to ``conn`` as ``alias`` for the duration of the block."""
+    if not os.path.exists(db):
+        # ATTACH would silently create an empty database.
+        raise FileNotFoundError(f"normalized database not found: {db}")
+    conn.commit()  # ATTACH cannot run inside a transaction
+    conn.execute(f"ATTACH DATABASE ? AS {alias}", (os.fspath(db),))
+    try:
+        shadowed = _tables(conn, "main") & _tables(conn, alias)
+        if shadowed:
+            raise ValueError(f"{db}: tables {sorted(shadowed)} also exist in the target database")
+        yield conn
+    finally:
+        conn.commit()
+        conn.execute(f"DETACH DATABASE {alias}")
+
+
+def materialize(conn: sqlite3.Connection, table: str, select: str, params: Sequence = ()) -> int:
+    """Run ``INSERT INTO table <select>`` in one statement; return rows inserted."""
+    return conn.execute(f'INSERT INTO "{table}" {select}', params).rowcount
+
+
+def round_trip(conn: sqlite3.Connection, table: str, select: str, params: Sequence = ()) -> int:
+    """The fetch + ``executemany`` path ``materialize`` replaces.
+
+    Same result, but every row is materialized as a Python tuple and bound
+    again; kept so ``scripts/bench_denormalize.py`` can measure the difference.
+    """
+    cur = conn.execute(select, params)
+    placeholders = ",".join("?" * len(cur.description))
+    rows = cur.fetchall()
+    return stream_insert(conn, f'INSERT INTO "{table}" VALUES ({placeholders})', rows, DEFAULT_CHUNK)
+
+
+# Incremental refresh
+# -------------------
+# A subdomain's ``populate_denormalized.py`` may declare the tables it can
+# refresh incrementally as ``VIEWS``, a list of dicts:
+#
+#   table       denormalized table
+#   key         its partition columns; every row depends only on source rows
+#               of its own partition
+#   select      query producing the table, with a ``{partitions}`` predicate:
+#               ``1`` for a full build, ``partitions`` for an incremental one
+#   partitions  predicate restricting ``select`` to the partitions listed in
+#               ``temp.refresh_keys`` (whose columns are named after ``key``)
+#   sources     normalized tables the view reads, each a dict of ``table``,
+#               ``watermark`` (a column that grows with every appended row,
+#               e.g. ``id``) and ``keys`` (select list mapping a row to the
+#               partitions it touches, aliased to ``key``)
+#
+# Sources are assumed append-only: updates to rows below a watermark are not
+# picked up until the next full refresh.
+#
+# Watermarks are kept out of the shipped database, in a sidecar db keyed by
+# the denormalized db's path and table. ``refresh`` ATTACHes it, so a view and
+# its new watermarks are still committed together.
+
+MARKS_DB = pathlib.Path(__file__).resolve().parent.parent / ".build_cache" / "refresh_watermarks.db"
+WATERMARKS = "refresh_watermarks"
+
+
+def _db_path(conn: sqlite3.Connection) -> str:
+    path = next(file for _, name, file in conn.execute("PRAGMA database_list") if name == "main")
+    if not path:
+        raise ValueError("refresh needs a file-backed database")
+    return os.path.realpath(path)
+
+
+def forget_marks(db: str | os.PathLike, marks_db: str | os.PathLike = MARKS_DB) -> None:
+    """Drop the watermarks recorded for ``db``, e.g. because it was rebuilt or
+    replaced; its views are then rebuilt in full by the next ``refresh``."""
+    if not os.path.exists(marks_db):
+        return
+    conn = sqlite3.connect(marks_db)
+    try:
+        with conn:
+            conn.execute(f"DELETE FROM {WATERMARKS} WHERE db = ?", (os.path.realpath(db),))
+    except sqlite3.OperationalError:  # no marks recorded yet
+        pass
+    finally:
+        conn.close()
+
+
+def refresh(
+    conn: sqlite3.Connection,
+    views: Sequence[dict],
+    alias: str = "norm",
+    full: bool = False,
+    marks_db: str | os.PathLike = MARKS_DB,
+) -> dict[str, dict]:
+    """Bring ``views`` up to date with the normalized db attached as ``alias``.
+
+    A view without recorded watermarks (or every view, with ``full``) is
+    rebuilt from scratch. Otherwise only the partitions touched by source rows
+    above the recorded watermarks are deleted and recomputed, so the work is
+    proportional to the rows appended since the last refresh. Each view is
+    committed together with its new watermarks, which are stored in
+    ``marks_db`` under the path of ``conn``'s main database.
+
+    Returns ``{table: {"mode", "partitions", "rows"}}``; ``partitions`` is
+    ``None`` for full rebuilds.
+    """
+    db = _db_path(conn)
+    os.makedirs(os.path.dirname(os.path.abspath(marks_db)), exist_ok=True)
+    conn.commit()  # ATTACH cannot run inside a transaction
+    conn.execute("ATTACH DATABASE ? AS marks", (os.fspath(marks_db),))
+    try:
+        conn.execute("PRAGMA marks.journal_mode=DELETE")  # not the build's OFF
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS marks.{WATERMARKS} (db TEXT NOT NULL, view TEXT NOT NULL, "
+            "source TEXT NOT NULL, watermark, PRIMARY KEY (db, view, source))"
+        )
+        conn.execute(f"DROP TABLE IF EXISTS main.{WATERMARKS}")  # left by older builds
+        conn.commit()
+        return _refresh(conn, views, alias, full, db)
+    except BaseException:
+        conn.rollback()  # DETACH cannot run inside a transaction either
+        raise
+    finally:
+        conn.execute("DETACH DATABASE marks")
+
+
+def _refresh(conn: sqlite3.Connection, views: Sequence[dict], alias: str, full: bool, db: str) -> dict[str, dict]:
+    stats = {}
+    for view in views:
+        table, sources = view["table"], view["sources"]
+        marks = dict(conn.execute(
+            f"SELECT source, watermark FROM marks.{WATERMARKS} WHERE db = ? AND view = ?", (db, table)
+        ))
+        # Read the new marks first: rows appended while refreshing are picked
+        # up again next time, which only recomputes their partitions twice.
+        new_marks = {
+            s["table"]: conn.execute(f'SELECT MAX({s["watermark"]}) FROM {alias}."{s["table"]}"').fetchone()[0]
+            for s in sources
+        }
+        if full or any(s["table"] not in marks for s in sources):
+            conn.execute(f'DELETE FROM main."{table}"')
+            rows = materialize(conn, table, view["select"].replace("{partitions}", "1"))
+            stats[table] = {"mode": "full", "partitions": None, "rows": rows}
+        else:
+            deltas, params = [], []
+            for s in sources:
+                if new_marks[s["table"]] is None or new_marks[s["table"]] == marks[s["table"]]:
+                    continue
+                deltas.append(
+                    f'SELECT DISTINCT {s["keys"]} FROM {alias}."{s["table"]}" '
+                    f'WHERE ({s["watermark"]} > ? OR ? IS NULL) AND {s["watermark"]} <= ?'
+                )
+                params += [marks[s["table"]], marks[s["table"]], new_marks[s["table"]]]
+            partitions = rows = 0
+            if deltas:
+                conn.execute("DROP TABLE IF EXISTS temp.refresh_keys")
+                conn.execute("CREATE TEMP TABLE refresh_keys AS " + " UNION ".join(deltas), params)
+                partitions = conn.execute("SELECT COUNT(*) FROM temp.refresh_keys").fetchone()[0]
+                cols = ", ".join(view["key"])
+                conn.execute(f'DELETE FROM main."{table}" WHERE ({cols}) IN (SELECT {cols} FROM temp.refresh_keys)')
+                rows = materialize(conn, table, view["select"].replace("{partitions}", view["partitions"]))
+                conn.execute("DROP TABLE temp.refresh_keys")
+            stats[table] = {"mode": "incremental", "partitions": partitions, "rows": rows}
+        conn.executemany(
+            f"INSERT OR REPLACE INTO marks.{WATERMARKS} VALUES (?, ?, ?, ?)",
+            [(db, table, source, mark) for source, mark in new_marks.items()],
+        )
+        conn.commit()
+    return stats
@@ -0,0 +1,141 @@
+"""Per-episode database copies for rollouts, without copying .db files.
+
+Each business database is read once (``mode=ro``) through the SQLite backup
+API into an in-memory template and kept as its serialized image. Episodes get
+private in-memory copies of that image, so TEMP tables and writes made by
+agent SQL never reach the file or other episodes::
+
+    manager = EpisodeManager()
+    with manager.episode("finance/retail_banking/retail_banking_normalized.db") as ep:
+        ep.conn.execute("CREATE TEMP TABLE t AS SELECT ...")
+        ...
+        ep.reset()          # back to the pristine database
+
+Two reset strategies:
+
+``copy``       every reset opens a new connection and deserializes the
+               template (a memcpy of the database image).
+``savepoint``  the episode keeps one connection inside ``SAVEPOINT episode``
+               and resets with ``ROLLBACK TO``, which only undoes the pages the
+               episode touched. If agent SQL ended the transaction (``COMMIT``,
+               ``RELEASE``, ``ROLLBACK``) the episode falls back to a fresh copy.
+
+Python builds without ``Connection.serialize`` fall back to the backup API
+from the in-memory template connection.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+
+MODES = ("copy", "savepoint")
+SAVEPOINT = "episode"
+
+
+def _connect_memory() -> sqlite3.Connection:
+    # Autocommit: the episode, not the sqlite3 module, owns transactions.
+    return sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+
+
+class EpisodeManager:
+    """Load each database once and hand out per-episode copies of it."""
+
+    def __init__(self, mode: str = "copy") -> None:
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.mode = mode
+        self._templates: dict[str, sqlite3.Connection] = {}
+        self._images: dict[str, bytes | None] = {}
+        self._lock = threading.Lock()
+        self.stats = {"loads": 0, "copies": 0, "rollbacks": 0, "load_seconds": 0.0}
+
+    def load(self, db: str | os.PathLike) -> str:
+        """Load ``db`` into its in-memory template (once); return its key."""
+        key = os.path.abspath(db)
+        with self._lock:
+            if key in self._templates:
+                return key
+            if not os.path.exists(key):
+                raise FileNotFoundError(key)
+            start = time.perf_counter()
+            src = sqlite3.connect(f"file:{key}?mode=ro", uri=True)
+            template = _connect_memory()
+            try:
+                src.backup(template)
+            finally:
+                src.close()
+            self._templates[key] = template
+            self._images[key] = template.serialize() if hasattr(template, "serialize") else None
+            self.stats["loads"] += 1
+            self.stats["load_seconds"] += time.perf_counter() - start
+        return key
+
+    def copy(self, db: str | os.PathLike) -> sqlite3.Connection:
+        """Return a new connection to a private copy of the pristine ``db``."""
+        key = self.load(db)
+        conn = _connect_memory()
+        image = self._images[key]
+        if image is not None:
+            conn.deserialize(image)
+        else:
+            with self._lock:
+                self._templates[key].backup(conn)
+        self.stats["copies"] += 1
+        return conn
+
+    def episode(self, db: str | os.PathLike) -> "Episode":
+        return Episode(self, db)
+
+    def unload(self, db: str | os.PathLike) -> None:
+        """Drop the template of ``db`` (e.g. after the file was rebuilt)."""
+        key = os.path.abspath(db)
+        with self._lock:
+            template = self._templates.pop(key, None)
+            self._images.pop(key, None)
+        if template is not None:
+            template.close()
+
+    def close(self) -> None:
+        for key in list(self._templates):
+            self.unload(key)
+
+
+class Episode:
+    """One rollout's view of a database; ``conn`` is valid until the next reset."""
+
+    def __init__(self, manager: EpisodeManager, db: str | os.PathLike) -> None:
+        self.manager = manager
+        self.db = db
+        self.conn: sqlite3.Connection | None = None
+        self._open()
+
+    def _open(self) -> None:
+        self.conn = self.manager.copy(self.db)
+        if self.manager.mode == "savepoint":
+            self.conn.execute(f"SAVEPOINT {SAVEPOINT}")
+
+    def reset(self) -> sqlite3.Connection:
+        """Discard everything the episode did; return the connection to use."""
+        if self.manager.mode == "savepoint" and self.conn.in_transaction:
+            try:
+                self.conn.execute(f"ROLLBACK TO {SAVEPOINT}")
+                self.manager.stats["rollbacks"] += 1
+                return self.conn
+            except sqlite3.OperationalError:
+                pass  # the savepoint itself was released; start over
+        self.conn.close()
+        self._open()
+        return self.conn
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self) -> "Episode":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
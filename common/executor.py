@@ -0,0 +1,275 @@
+"""Run untrusted (agent/model-generated) SQL against built databases safely.
+
+``Executor`` keeps a small pool of read-only connections per database and runs
+each query under a budget, returning a result dict instead of raising::
+
+    executor = Executor(timeout=2.0, max_rows=1000)
+    result = executor.execute("finance/retail_banking/retail_banking_normalized.db", sql)
+    if result["ok"]:
+        result["columns"], result["rows"], result["truncated"]
+    else:
+        result["error"]["type"]     # "timeout", "budget", "sql_error", ...
+
+Connections are opened with ``mode=ro&immutable=1`` (no locking, no change
+detection: call ``invalidate`` after rebuilding a db), a large ``mmap_size``
+and ``query_only``; an authorizer rejects ``ATTACH``/``DETACH`` and pragma
+assignments so one query cannot change what the next one on the same pooled
+connection sees.
+
+Budgets are enforced by a progress handler called every ``PROGRESS_STEP``
+virtual-machine instructions: it aborts the statement once the wall-clock
+``timeout`` or the ``max_instructions`` budget is spent, so a runaway cartesian
+join is interrupted inside SQLite instead of stalling the worker. Rows are
+fetched in ``fetchmany`` batches and the statement is abandoned after
+``max_rows``.
+"""
+from __future__ import annotations
+
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import Sequence
+
+PROGRESS_STEP = 1000  # VM instructions between budget checks
+FETCH_BATCH = 256
+DEFAULT_MMAP = 256 * 1024 * 1024
+
+_DENIED = {sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH}
+_KINDS = {"SQLITE_AUTH": "denied", "SQLITE_READONLY": "readonly", "SQLITE_INTERRUPT": "interrupted"}
+# Pragmas whose argument names an object to describe rather than a new value.
+_PRAGMA_READERS = {"table_info", "table_xinfo", "index_list", "index_info", "index_xinfo", "foreign_key_list"}
+
+
+def _authorize(action: int, arg1, arg2, db_name, trigger) -> int:
+    if action in _DENIED:
+        return sqlite3.SQLITE_DENY
+    if action == sqlite3.SQLITE_PRAGMA and arg2 is not None and arg1.lower() not in _PRAGMA_READERS:
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+
+def _error(kind: str, message: str, elapsed: float = 0.0, instructions: int = 0) -> dict:
+    return {
+        "ok": False,
+        "columns": [],
+        "rows": [],
+        "row_count": 0,
+        "truncated": False,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "instructions": instructions,
+        "error": {"type": kind, "message": message},
+    }
+
+
+def open_error(e: Exception) -> dict:
+    """Result dict for a database ``Executor.connect`` could not open."""
+    if isinstance(e, FileNotFoundError):
+        return _error("missing_db", f"database not found: {e}")
+    return _error("open_error", str(e))
+
+
+class Budget:
+    """Progress handler enforcing a deadline and an instruction budget."""
+
+    def __init__(self, timeout: float | None, max_instructions: int | None) -> None:
+        self.deadline = None if timeout is None else time.perf_counter() + timeout
+        self.max_steps = None if max_instructions is None else max(1, max_instructions // PROGRESS_STEP)
+        self.steps = 0
+        self.exceeded: str | None = None
+
+    def __call__(self) -> int:
+        self.steps += 1
+        if self.max_steps is not None and self.steps > self.max_steps:
+            self.exceeded = "budget"
+        elif self.deadline is not None and time.perf_counter() > self.deadline:
+            self.exceeded = "timeout"
+        return 1 if self.exceeded else 0
+
+
+class Executor:
+    """Pooled read-only connections plus per-query time/instruction/row limits."""
+
+    def __init__(
+        self,
+        timeout: float | None = 5.0,
+        max_instructions: int | None = None,
+        max_rows: int | None = 10_000,
+        pool_size: int = 4,
+        mmap_size: int = DEFAULT_MMAP,
+        cache_size: int | None = None,
+    ) -> None:
+        self.timeout = timeout
+        self.max_instructions = max_instructions
+        self.max_rows = max_rows
+        self.pool_size = pool_size
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size  # PRAGMA cache_size (pages, or -KiB); None keeps SQLite's default
+        self._idle: dict[str, list[sqlite3.Connection]] = {}
+        self._live: dict[str, set[sqlite3.Connection]] = {}
+        self._pending: dict[str, int] = {}  # slots reserved by connects in progress
+        self._cond = threading.Condition()
+        self._stats_lock = threading.Lock()
+        self.stats = {"connects": 0, "queries": 0, "errors": 0, "timeouts": 0, "budgets": 0, "truncated": 0}
+
+    def connect(self, db: str | os.PathLike) -> sqlite3.Connection:
+        """Open a new read-only connection to ``db`` configured for ``run``."""
+        key = os.path.abspath(db)
+        if not os.path.exists(key):
+            # mode=ro would only fail with "unable to open database file".
+            raise FileNotFoundError(key)
+        uri = pathlib.Path(key).as_uri() + "?mode=ro&immutable=1"
+        conn = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        if self.cache_size is not None:
+            conn.execute(f"PRAGMA cache_size={int(self.cache_size)}")
+        conn.execute("PRAGMA query_only=ON")
+        conn.set_authorizer(_authorize)
+        self._count("connects")
+        return conn
+
+    def _count(self, *names: str) -> None:
+        with self._stats_lock:
+            for name in names:
+                self.stats[name] += 1
+
+    def acquire(self, db: str | os.PathLike) -> tuple[str, sqlite3.Connection]:
+        """Borrow a pooled connection to ``db``, waiting if all are in use."""
+        key = os.path.abspath(db)
+        if not os.path.exists(key):
+            raise FileNotFoundError(key)
+        with self._cond:
+            while True:
+                idle = self._idle.setdefault(key, [])
+                live = self._live.setdefault(key, set())
+                if idle:
+                    return key, idle.pop()
+                if len(live) + self._pending.get(key, 0) < self.pool_size:
+                    self._pending[key] = self._pending.get(key, 0) + 1  # reserve the slot while connecting
+                    break
+                self._cond.wait()
+        try:
+            conn = self.connect(key)
+        except BaseException:
+            with self._cond:
+                self._pending[key] -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._pending[key] -= 1
+            # invalidate() may have dropped the set fetched before connecting.
+            self._live.setdefault(key, set()).add(conn)
+        return key, conn
+
+    def release(self, key: str, conn: sqlite3.Connection) -> None:
+        with self._cond:
+            if conn in self._live.get(key, ()):
+                self._idle.setdefault(key, []).append(conn)
+            else:  # invalidated while borrowed
+                conn.close()
+            self._cond.notify()
+
+    def execute(
+        self,
+        db: str | os.PathLike,
+        sql: str,
+        params: Sequence = (),
+        timeout: float | None = ...,
+        max_instructions: int | None = ...,
+        max_rows: int | None = ...,
+    ) -> dict:
+        """Run one statement; never raises for bad SQL or exhausted budgets.
+
+        Limits default to the executor's; pass ``None`` to lift one. Returns
+        ``{"ok", "columns", "rows", "row_count", "truncated", "elapsed_ms",
+        "instructions", "error"}`` where ``error`` is ``None`` or
+        ``{"type", "message"}`` with ``type`` one of ``timeout``, ``budget``,
+        ``interrupted``, ``sql_error``, ``denied``, ``readonly``, ``missing_db``,
+        ``open_error``. ``instructions`` is counted in ``PROGRESS_STEP`` units.
+        """
+        try:
+            key, conn = self.acquire(db)
+        except (FileNotFoundError, sqlite3.Error) as e:
+            self._count("queries", "errors")
+            return open_error(e)
+        try:
+            return self.run(conn, sql, params, timeout, max_instructions, max_rows)
+        finally:
+            self.release(key, conn)
+
+    def run(
+        self,
+        conn: sqlite3.Connection,
+        sql: str,
+        params: Sequence = (),
+        timeout: float | None = ...,
+        max_instructions: int | None = ...,
+        max_rows: int | None = ...,
+    ) -> dict:
+        """``execute`` on a connection from ``connect`` the caller holds."""
+        timeout = self.timeout if timeout is ... else timeout
+        max_instructions = self.max_instructions if max_instructions is ... else max_instructions
+        max_rows = self.max_rows if max_rows is ... else max_rows
+        self._count("queries")
+        budget = Budget(timeout, max_instructions)
+        conn.set_progress_handler(budget, PROGRESS_STEP)
+        start = time.perf_counter()
+        cur = None
+        try:
+            cur = conn.execute(sql, params)
+            columns = [d[0] for d in cur.description or ()]
+            rows: list[tuple] = []
+            truncated = False
+            while True:
+                batch = cur.fetchmany(FETCH_BATCH)
+                if not batch:
+                    break
+                rows.extend(batch)
+                if max_rows is not None and len(rows) > max_rows:
+                    del rows[max_rows:]
+                    truncated = True
+                    break
+        except (sqlite3.Error, sqlite3.Warning) as e:
+            elapsed = time.perf_counter() - start
+            if budget.exceeded:
+                self._count("errors", f"{budget.exceeded}s")
+                limit = f"{timeout}s" if budget.exceeded == "timeout" else f"{max_instructions} instructions"
+                return _error(budget.exceeded, f"query exceeded {limit}", elapsed, budget.steps * PROGRESS_STEP)
+            self._count("errors")
+            kind = _KINDS.get(getattr(e, "sqlite_errorname", ""), "sql_error")
+            return _error(kind, str(e), elapsed, budget.steps * PROGRESS_STEP)
+        finally:
+            if cur is not None:
+                cur.close()  # resets an abandoned (truncated) statement
+            conn.set_progress_handler(None, 0)
+
+        if truncated:
+            self._count("truncated")
+        return {
+            "ok": True,
+            "columns": columns,
+            "rows": rows,
+            "row_count": len(rows),
+            "truncated": truncated,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+            "instructions": budget.steps * PROGRESS_STEP,
+            "error": None,
+        }
+
+    def invalidate(self, db: str | os.PathLike) -> None:
+        """Close the pooled connections of ``db`` (e.g. after it was rebuilt).
+
+        ``immutable=1`` connections do not notice changes to the file.
+        """
+        key = os.path.abspath(db)
+        with self._cond:
+            idle = self._idle.pop(key, [])
+            self._live.pop(key, None)
+            self._cond.notify_all()
+        for conn in idle:
+            conn.close()
+
+    def close(self) -> None:
+        for key in list(self._idle):
+            self.invalidate(key)
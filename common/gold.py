@@ -0,0 +1,172 @@
+"""Precomputed results of the gold SQL in ``sample_text_to_sql_tasks.md``.
+
+The build runs every task's reference query once per database content and
+stores its answer, so graders compare against the cache instead of
+re-executing gold SQL::
+
+    cache = GoldCache()
+    cache.precompute(ROOT / "finance/retail_banking")      # done by build_all
+    gold = cache.lookup("finance/retail_banking", "3.1", db)
+    if gold is not None and gold["ok"]:
+        correct = matches(gold, agent_rows)
+
+Gold SQL comes from the task catalog (``common/catalog.py``): each plain
+``sql`` or ``sql fast`` block of ``## Task N`` is one gold turn with id
+``"N.<turn>"`` (``sql slow`` blocks are equivalent rewrites and are skipped). Entries are keyed by subdomain, task id and a
+content fingerprint of the database, so rebuilding a db (new fingerprint)
+makes its old answers misses; ``precompute`` then recomputes them and prunes the
+stale ones. Editing a task's SQL is also a miss. Queries whose result depends
+on when they run (``'now'``, ``CURRENT_DATE``, ``random()``) are never cached.
+
+Each answer is stored as a canonical order-insensitive hash of its rows (see
+``common.compare.result_hash``) plus the zlib-compressed JSON result set when
+it has at most ``MAX_STORED_ROWS`` rows.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import re
+import sqlite3
+import zlib
+from typing import Iterable
+
+from common.catalog import TaskCatalog
+from common.compare import result_hash
+from common.executor import Executor
+
+DEFAULT_CACHE = pathlib.Path(__file__).resolve().parent.parent / ".build_cache" / "gold_answers.db"
+MAX_STORED_ROWS = 10_000
+GOLD_TIMEOUT = 60.0
+
+VOLATILE_RE = re.compile(r"'now'|\bcurrent_(?:date|time|timestamp)\b|\brandom\s*\(", re.IGNORECASE)
+
+
+_fingerprints: dict[tuple, str] = {}
+
+
+def db_fingerprint(db: str | os.PathLike) -> str:
+    """SHA-256 of the database file, memoized on (path, size, mtime)."""
+    path = os.path.abspath(db)
+    st = os.stat(path)
+    memo = (path, st.st_size, st.st_mtime_ns)
+    if memo not in _fingerprints:
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                h.update(block)
+        _fingerprints[memo] = h.hexdigest()
+    return _fingerprints[memo]
+
+
+def _encode(columns: list[str], rows: list[tuple]) -> bytes:
+    packed = [[{"b": v.hex()} if isinstance(v, bytes) else v for v in row] for row in rows]
+    return zlib.compress(json.dumps({"columns": columns, "rows": packed}, separators=(",", ":")).encode())
+
+
+def _decode(blob: bytes) -> tuple[list[str], list[tuple]]:
+    data = json.loads(zlib.decompress(blob))
+    rows = [tuple(bytes.fromhex(v["b"]) if isinstance(v, dict) else v for v in row) for row in data["rows"]]
+    return data["columns"], rows
+
+
+def matches(gold: dict, rows: Iterable[Iterable]) -> bool:
+    """True if ``rows`` are the gold answer up to row order and float noise.
+
+    ``common.compare.compare`` does the same while streaming the prediction.
+    """
+    return gold["ok"] and result_hash(rows) == gold["hash"]
+
+
+def subdomain_label(subdir: pathlib.Path) -> str:
+    return f"{subdir.parent.name}/{subdir.name}"
+
+
+class GoldCache:
+    """SQLite-backed store of gold answers keyed by (subdomain, task, db fingerprint)."""
+
+    def __init__(self, path: str | os.PathLike = DEFAULT_CACHE) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS gold_answers ("
+            "subdomain TEXT NOT NULL, task_id TEXT NOT NULL, db_fingerprint TEXT NOT NULL, "
+            "sql TEXT NOT NULL, ok INTEGER NOT NULL, error TEXT, row_count INTEGER, "
+            "result_hash TEXT, result BLOB, "
+            "PRIMARY KEY (subdomain, task_id, db_fingerprint))"
+        )
+        self.conn.commit()
+
+    def lookup(self, subdomain: str, task_id: str, db: str | os.PathLike, sql: str | None = None) -> dict | None:
+        """Cached answer for ``task_id`` on the current contents of ``db``, or None.
+
+        Returns ``{"ok", "error", "row_count", "hash", "columns", "rows"}``;
+        ``columns``/``rows`` are None when the result was too large to store.
+        Passing the task's ``sql`` also treats an edited query as a miss.
+        """
+        row = self.conn.execute(
+            "SELECT sql, ok, error, row_count, result_hash, result FROM gold_answers "
+            "WHERE subdomain = ? AND task_id = ? AND db_fingerprint = ?",
+            (subdomain, task_id, db_fingerprint(db)),
+        ).fetchone()
+        if row is None or (sql is not None and row[0] != sql.strip()):
+            return None
+        columns, rows = _decode(row[5]) if row[5] is not None else (None, None)
+        return {"ok": bool(row[1]), "error": row[2], "row_count": row[3], "hash": row[4], "columns": columns, "rows": rows}
+
+    def precompute(
+        self, subdir: pathlib.Path, executor: Executor | None = None, catalog: TaskCatalog | None = None
+    ) -> dict[str, int]:
+        """Run every uncached gold query of ``subdir`` against its normalized db.
+
+        Returns counts of ``tasks``, ``cached`` (already up to date),
+        ``computed``, ``errors`` (gold SQL that failed; stored as such) and
+        ``volatile`` (time-dependent, not cached).
+        """
+        subdir = pathlib.Path(subdir)
+        db = subdir / f"{subdir.name}_normalized.db"
+        catalog = catalog or TaskCatalog()
+        gold = catalog.gold(subdomain_label(subdir))
+        stats = {"tasks": len(gold), "cached": 0, "computed": 0, "errors": 0, "volatile": 0}
+        if not gold or not db.exists():
+            return stats
+        label, fp = subdomain_label(subdir), db_fingerprint(db)
+        executor = executor or Executor(timeout=GOLD_TIMEOUT, max_rows=None)
+        stored = dict(self.conn.execute(
+            "SELECT task_id, sql FROM gold_answers WHERE subdomain = ? AND db_fingerprint = ?", (label, fp)
+        ))
+        keep = []
+        for task in gold:
+            if VOLATILE_RE.search(task["sql"]):
+                stats["volatile"] += 1
+                continue
+            keep.append(task["id"])
+            if stored.get(task["id"]) == task["sql"]:
+                stats["cached"] += 1
+                continue
+            result = executor.execute(db, task["sql"])
+            if result["ok"]:
+                blob = _encode(result["columns"], result["rows"]) if result["row_count"] <= MAX_STORED_ROWS else None
+                entry = (1, None, result["row_count"], result_hash(result["rows"]), blob)
+                stats["computed"] += 1
+            else:
+                entry = (0, f"{result['error']['type']}: {result['error']['message']}", None, None, None)
+                stats["errors"] += 1
+            self.conn.execute(
+                "INSERT OR REPLACE INTO gold_answers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (label, task["id"], fp, task["sql"], *entry),
+            )
+        # Answers for older builds of the db, or for tasks that were removed.
+        self.conn.execute(
+            "DELETE FROM gold_answers WHERE subdomain = ? AND (db_fingerprint != ? OR task_id NOT IN "
+            "(SELECT value FROM json_each(?)))",
+            (label, fp, json.dumps(keep)),
+        )
+        self.conn.commit()
+        executor.invalidate(db)
+        return stats
+
+    def close(self) -> None:
+        self.conn.close()
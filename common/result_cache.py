@@ -0,0 +1,183 @@
+"""Result cache in front of ``common.executor.Executor`` for repeated rollout queries.
+
+RL rollouts ask the same questions of the same immutable databases over and
+over, differing only in spelling. ``ResultCache.execute`` has the signature of
+``Executor.execute`` and answers from memory when it can::
+
+    cache = ResultCache(Executor(timeout=2.0), max_bytes=512 << 20)
+    result = cache.execute(db, "select * from customers where customer_id='CUST01000'")
+    result["cached"]        # False the first time, True for any respelling
+    cache.stats             # {"hits", "misses", "bypassed", "evictions", "bytes", "entries"}
+
+Entries are keyed by the database's content fingerprint
+(``common.gold.db_fingerprint``), the bound parameters and ``canonicalize(sql)``:
+comments dropped, whitespace collapsed, unquoted words (keywords, functions,
+names) upper-cased, ``==``/``!=`` spelled ``=``/``<>``, trailing ``;`` removed
+and numeric literals rewritten by value (``1.50`` -> ``1.5``, ``0x10`` ->
+``16``). String literals and quoted identifiers are kept as written.
+Rebuilding a db changes its fingerprint, so stale entries are never served; they
+just age out of the LRU, which is capped at ``max_bytes`` of (estimated) result
+size.
+
+Only successful, non-truncated results are stored; a caller with a lower
+``max_rows`` gets a prefix marked ``truncated``. A hit whose original run used
+more time or instructions than the caller's budget allows is executed again so
+limits still bite. Queries whose answer depends on when they run (``'now'``,
+``CURRENT_DATE``, ``random()``) bypass the cache. Column names come from the
+first spelling that filled the entry. Plain column references are labelled by
+their declared name either way, so labels can differ from a re-execution only
+for expressions and aliases spelled differently (``count(*)`` vs ``COUNT(*)``).
+"""
+from __future__ import annotations
+
+import collections
+import os
+import re
+import threading
+import time
+from typing import Sequence
+
+from common.executor import Executor
+from common.gold import VOLATILE_RE, db_fingerprint
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ROW_OVERHEAD = 64  # rough per-row and per-value costs of a cached tuple
+VALUE_OVERHEAD = 16
+
+TOKEN_RE = re.compile(
+    r"""(?P<space>\s+|--[^\n]*|/\*.*?(?:\*/|$))
+      | (?P<blob>[xX]'[0-9a-fA-F]*')
+      | (?P<string>'(?:[^']|'')*')
+      | (?P<ident>"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\])
+      | (?P<number>0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<word>[A-Za-z_][\w$]*)
+      | (?P<param>\?\d*|[:@$][\w$]+)
+      | (?P<op><=|>=|<>|!=|==|\|\||<<|>>|->>|->|.)""",
+    re.VERBOSE | re.DOTALL,
+)
+OPERATORS = {"==": "=", "!=": "<>"}
+
+
+def _number(text: str) -> str:
+    if text[:2].lower() == "0x":
+        return str(int(text, 16))
+    if any(c in text for c in ".eE"):
+        return repr(float(text))
+    return str(int(text))
+
+
+def canonicalize(sql: str) -> str:
+    """Spelling-insensitive form of ``sql`` used as the cache key (never executed)."""
+    tokens = []
+    for m in TOKEN_RE.finditer(sql):
+        kind, text = m.lastgroup, m.group()
+        if kind == "space":
+            continue
+        if kind == "word":  # keywords, functions and unquoted names are case-insensitive
+            text = text.upper()
+        elif kind == "number":
+            text = _number(text)
+        elif kind == "blob":
+            text = "X" + text[1:].upper()
+        elif kind == "op":
+            text = OPERATORS.get(text, text)
+        tokens.append(text)
+    while tokens and tokens[-1] == ";":
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def result_size(result: dict) -> int:
+    """Approximate bytes held by a cached result."""
+    size = sum(len(c) for c in result["columns"])
+    for row in result["rows"]:
+        size += ROW_OVERHEAD
+        for value in row:
+            size += VALUE_OVERHEAD + (len(value) if isinstance(value, (str, bytes)) else 8)
+    return size
+
+
+class ResultCache:
+    """Byte-capped LRU of ``Executor.execute`` results for read-only databases."""
+
+    def __init__(self, executor: Executor | None = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.executor = executor or Executor()
+        self.max_bytes = max_bytes
+        self._entries: collections.OrderedDict[tuple, tuple[dict, int]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "evictions": 0, "bytes": 0, "entries": 0}
+
+    def _fits(self, result: dict, timeout, max_instructions) -> bool:
+        timeout = self.executor.timeout if timeout is ... else timeout
+        max_instructions = self.executor.max_instructions if max_instructions is ... else max_instructions
+        if timeout is not None and result["elapsed_ms"] > timeout * 1000:
+            return False
+        return max_instructions is None or result["instructions"] <= max_instructions
+
+    def execute(
+        self,
+        db: str | os.PathLike,
+        sql: str,
+        params: Sequence = (),
+        timeout: float | None = ...,
+        max_instructions: int | None = ...,
+        max_rows: int | None = ...,
+    ) -> dict:
+        """``Executor.execute`` plus ``"cached"``; a hit costs a stat and a dict lookup."""
+        if VOLATILE_RE.search(sql):
+            self.stats["bypassed"] += 1
+            return {**self.executor.execute(db, sql, params, timeout, max_instructions, max_rows), "cached": False}
+        try:
+            key = (db_fingerprint(db), canonicalize(sql), repr(params))
+        except OSError:  # missing db: let the executor report it
+            self.stats["bypassed"] += 1
+            return {**self.executor.execute(db, sql, params, timeout, max_instructions, max_rows), "cached": False}
+        start = time.perf_counter()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None and self._fits(entry[0], timeout, max_instructions):
+            self.stats["hits"] += 1
+            result = entry[0]
+            limit = self.executor.max_rows if max_rows is ... else max_rows
+            rows = result["rows"][:limit] if limit is not None else list(result["rows"])
+            return {
+                **result,
+                "columns": list(result["columns"]),
+                "rows": rows,
+                "row_count": len(rows),
+                "truncated": len(rows) < len(result["rows"]),
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+                "cached": True,
+            }
+        self.stats["misses"] += 1
+        result = self.executor.execute(db, sql, params, timeout, max_instructions, max_rows)
+        if result["ok"] and not result["truncated"]:
+            self._store(key, result)
+        return {**result, "cached": False}
+
+    def _store(self, key: tuple, result: dict) -> None:
+        size = result_size(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.stats["bytes"] -= old[1]
+            self._entries[key] = (result, size)
+            self.stats["bytes"] += size
+            while self.stats["bytes"] > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.stats["bytes"] -= evicted
+                self.stats["evictions"] += 1
+            self.stats["entries"] = len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats.update(bytes=0, entries=0)
+
+    def close(self) -> None:
+        self.clear()
+        self.executor.close()
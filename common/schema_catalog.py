@@ -0,0 +1,206 @@
+"""Cached schema descriptions of built databases, for prompts and audits.
+
+Describing a database means walking ``sqlite_master`` and issuing a handful of
+``PRAGMA`` calls plus a ``COUNT(*)`` per table. ``SchemaCatalog`` does that once
+per database *content* and keeps the result in an in-memory LRU backed by
+``.build_cache/schema_catalog.db``::
+
+    schemas = SchemaCatalog()
+    desc = schemas.describe(db)     # {"fingerprint", "tables": [...]}
+    text = schemas.prompt(db)       # compact CREATE TABLE text for an LLM prompt
+
+Entries are keyed by the db's content fingerprint (``common.gold.db_fingerprint``,
+memoized on path/size/mtime), so a repeated call costs one ``os.stat`` and a
+dict lookup, and a rebuilt db is described afresh. Each table entry holds its
+columns (name, type, not-null, default, primary key position), primary key,
+foreign keys, indexes, the value lists of ``CHECK (col IN (...))`` constraints,
+its row count and a few sample rows. Views are listed with their columns only.
+"""
+from __future__ import annotations
+
+import collections
+import json
+import os
+import pathlib
+import re
+import sqlite3
+import threading
+import zlib
+
+from common.gold import db_fingerprint
+
+DEFAULT_SCHEMA_CACHE = pathlib.Path(__file__).resolve().parent.parent / ".build_cache" / "schema_catalog.db"
+FORMAT_VERSION = 1  # bump when describe() output changes; older entries become misses
+SAMPLE_ROWS = 3
+SAMPLE_TEXT = 60  # longer sample strings are cut for prompts
+
+ENUM_RE = re.compile(r"CHECK\s*\(\s*[\"`\[]?(\w+)[\"`\]]?\s+IN\s*\(([^)]*)\)\s*\)", re.IGNORECASE)
+LITERAL_RE = re.compile(r"'((?:[^']|'')*)'|(-?\d+(?:\.\d+)?)")
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sample(value):
+    if isinstance(value, bytes):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, str) and len(value) > SAMPLE_TEXT:
+        return value[:SAMPLE_TEXT] + "..."
+    return value
+
+
+def check_enums(sql: str | None) -> dict[str, list]:
+    """``{column: [allowed values]}`` from ``CHECK (col IN (...))`` clauses."""
+    enums = {}
+    for m in ENUM_RE.finditer(sql or ""):
+        values = []
+        for text, number in LITERAL_RE.findall(m.group(2)):
+            values.append(float(number) if "." in number else int(number) if number else text.replace("''", "'"))
+        enums[m.group(1)] = values
+    return enums
+
+
+def describe_connection(conn: sqlite3.Connection, samples: int = SAMPLE_ROWS) -> list[dict]:
+    """Table and view descriptions of ``conn``'s main database."""
+    tables = []
+    for kind, name, sql in conn.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE type IN ('table', 'view') "
+        "AND name NOT LIKE 'sqlite_%' ORDER BY type = 'view', rowid"
+    ):
+        q = _quote(name)
+        columns = [
+            {"name": col, "type": ctype, "not_null": bool(notnull), "default": default, "primary_key": pk}
+            for _, col, ctype, notnull, default, pk in conn.execute(f"PRAGMA table_info({q})")
+        ]
+        entry = {"name": name, "kind": kind, "columns": columns}
+        if kind == "table":
+            fks: dict[int, dict] = {}
+            for fid, _, ref, col, ref_col, *_ in conn.execute(f"PRAGMA foreign_key_list({q})"):
+                fk = fks.setdefault(fid, {"columns": [], "table": ref, "ref_columns": []})
+                fk["columns"].append(col)
+                fk["ref_columns"].append(ref_col)
+            indexes = []
+            for _, index, unique, origin, _ in conn.execute(f"PRAGMA index_list({q})"):
+                cols = [c for _, _, c in conn.execute(f"PRAGMA index_info({_quote(index)})")]
+                indexes.append({"name": index, "unique": bool(unique), "origin": origin, "columns": cols})
+            entry.update(
+                primary_key=[c["name"] for c in sorted(columns, key=lambda c: c["primary_key"]) if c["primary_key"]],
+                foreign_keys=list(fks.values()),
+                indexes=indexes,
+                enums=check_enums(sql),
+                row_count=conn.execute(f"SELECT COUNT(*) FROM {q}").fetchone()[0],
+                sample_rows=[[_sample(v) for v in row] for row in conn.execute(f"SELECT * FROM {q} LIMIT {int(samples)}")],
+            )
+        tables.append(entry)
+    return tables
+
+
+def render(desc: dict, samples: bool = True) -> str:
+    """Prompt text: one ``CREATE TABLE`` per table with enums, counts and samples as comments."""
+    out = []
+    for table in desc["tables"]:
+        pk = table.get("primary_key", [])
+        items = []  # (definition, trailing comment)
+        for col in table["columns"]:
+            line = f"{col['name']} {col['type']}".rstrip()
+            if len(pk) == 1 and col["primary_key"]:
+                line += " PRIMARY KEY"
+            elif col["not_null"]:
+                line += " NOT NULL"
+            enum = table.get("enums", {}).get(col["name"])
+            items.append((line, "one of " + ", ".join(map(repr, enum)) if enum else None))
+        if len(pk) > 1:
+            items.append((f"PRIMARY KEY ({', '.join(pk)})", None))
+        for index in table.get("indexes", []):
+            if index["origin"] == "u":
+                items.append((f"UNIQUE ({', '.join(index['columns'])})", None))
+        for fk in table.get("foreign_keys", []):
+            ref = f"({', '.join(fk['ref_columns'])})" if all(fk["ref_columns"]) else ""
+            items.append((f"FOREIGN KEY ({', '.join(fk['columns'])}) REFERENCES {fk['table']}{ref}", None))
+        if table["kind"] == "table":
+            out.append(f"-- {table['row_count']} rows")
+        out.append(f"CREATE {table['kind'].upper()} {table['name']} (")
+        for i, (line, comment) in enumerate(items):
+            line = "  " + line + ("," if i < len(items) - 1 else "")
+            out.append(f"{line} -- {comment}" if comment else line)
+        out.append(");")
+        for index in table.get("indexes", []):
+            if index["origin"] == "c":  # not implied by a PRIMARY KEY / UNIQUE constraint
+                unique = "UNIQUE " if index["unique"] else ""
+                out.append(f"CREATE {unique}INDEX {index['name']} ON {table['name']} ({', '.join(index['columns'])});")
+        if samples and table.get("sample_rows"):
+            out.append("-- sample rows:")
+            out.extend(f"--   {tuple(row)!r}" for row in table["sample_rows"])
+    return "\n".join(out) + "\n"
+
+
+class SchemaCatalog:
+    """Schema descriptions keyed by db content: in-memory LRU over a SQLite store."""
+
+    def __init__(self, path: str | os.PathLike | None = DEFAULT_SCHEMA_CACHE, max_entries: int = 128) -> None:
+        self.max_entries = max_entries
+        self._lru: collections.OrderedDict[str, dict] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+        self.conn = None
+        if path is not None:  # None: memory only
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS schemas ("
+                "db_fingerprint TEXT NOT NULL, version INTEGER NOT NULL, description BLOB NOT NULL, "
+                "PRIMARY KEY (db_fingerprint, version))"
+            )
+            self.conn.commit()
+
+    def _entry(self, db: str | os.PathLike) -> dict:
+        fp = db_fingerprint(db)
+        with self._lock:
+            entry = self._lru.get(fp)
+            if entry is not None:
+                self._lru.move_to_end(fp)
+                self.stats["hits"] += 1
+                return entry
+            row = self.conn.execute(
+                "SELECT description FROM schemas WHERE db_fingerprint = ? AND version = ?", (fp, FORMAT_VERSION)
+            ).fetchone() if self.conn else None
+        if row:
+            desc = json.loads(zlib.decompress(row[0]))
+            self.stats["disk_hits"] += 1
+        else:
+            conn = sqlite3.connect(f"file:{os.path.abspath(db)}?mode=ro", uri=True)
+            try:
+                desc = {"fingerprint": fp, "tables": describe_connection(conn)}
+            finally:
+                conn.close()
+            self.stats["misses"] += 1
+            if self.conn:
+                blob = zlib.compress(json.dumps(desc, separators=(",", ":")).encode())
+                with self._lock:
+                    self.conn.execute("INSERT OR REPLACE INTO schemas VALUES (?, ?, ?)", (fp, FORMAT_VERSION, blob))
+                    self.conn.commit()
+        entry = {"description": desc, "prompts": {}}
+        with self._lock:
+            self._lru[fp] = entry
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+        return entry
+
+    def describe(self, db: str | os.PathLike) -> dict:
+        """``{"fingerprint", "tables": [...]}`` for the current contents of ``db``.
+
+        Shared with the cache; treat it as read-only.
+        """
+        return self._entry(db)["description"]
+
+    def prompt(self, db: str | os.PathLike, samples: bool = True) -> str:
+        """``render(describe(db))``, itself cached alongside the description."""
+        entry = self._entry(db)
+        if samples not in entry["prompts"]:
+            entry["prompts"][samples] = render(entry["description"], samples)
+        return entry["prompts"][samples]
+
+    def close(self) -> None:
+        if self.conn:
+            self.conn.close()
@@ -0,0 +1,151 @@
+"""Sharded generation of large fact tables across worker processes.
+
+``sharded_insert`` splits a table's id range into the fixed-size chunks of
+:func:`common.utils.chunk_spans`. Each worker writes a contiguous run of chunks
+into its own temporary SQLite file, drawing every chunk from
+:func:`common.utils.table_rng`. The parent then merges the shards in id order
+with ``ATTACH`` + ``INSERT ... SELECT``. Secondary indexes are built afterwards
+by :func:`common.bulkload.bulk_load`. Output is identical for any ``jobs``
+value, including the in-process ``jobs=1`` path.
+
+``make_rows(rng, start, stop)`` must be a module-level function, optionally
+wrapped in ``functools.partial`` with picklable arguments. Workers re-load it
+from its source file, so this also works for generator scripts that were
+loaded by path.
+"""
+from __future__ import annotations
+
+import os
+import runpy
+import shutil
+import sqlite3
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, Sequence
+
+from common.utils import DEFAULT_CHUNK, batch, chunk_spans, table_rng
+
+_loaded: dict[str, dict] = {}
+
+
+def _portable(make_rows: Callable) -> tuple[str, str, tuple, dict]:
+    args: tuple = ()
+    keywords: dict = {}
+    if isinstance(make_rows, partial):
+        make_rows, args, keywords = make_rows.func, make_rows.args, make_rows.keywords
+    return make_rows.__code__.co_filename, make_rows.__name__, args, keywords
+
+
+def _resolve(spec: tuple[str, str, tuple, dict]) -> Callable:
+    path, name, args, keywords = spec
+    if path not in _loaded:
+        _loaded[path] = runpy.run_path(path, run_name=f"_shard_{os.path.basename(path)}")
+    return partial(_loaded[path][name], *args, **keywords)
+
+
+def _insert_chunks(
+    conn: sqlite3.Connection,
+    tables: Sequence[str],
+    make_rows: Callable,
+    seed: int | None,
+    key: str,
+    spans: Iterable[tuple[int, int, int]],
+) -> dict[str, int]:
+    """Insert the rows of ``spans`` into ``conn``; return per-table counts."""
+    counts = dict.fromkeys(tables, 0)
+    inserts = {t: None for t in tables}
+    for table in tables:
+        width = len(conn.execute(f'SELECT * FROM "{table}" LIMIT 0').description)
+        inserts[table] = f'INSERT INTO "{table}" VALUES ({",".join("?" * width)})'
+    for chunk, start, stop in spans:
+        rows = make_rows(table_rng(seed, key, chunk), start, stop)
+        if len(tables) == 1:
+            grouped = {tables[0]: rows}
+        else:
+            grouped = {t: [] for t in tables}
+            for table, row in rows:
+                grouped[table].append(row)
+        for table, table_rows in grouped.items():
+            for part in batch(table_rows, DEFAULT_CHUNK):
+                conn.executemany(inserts[table], part)
+                counts[table] += len(part)
+    return counts
+
+
+def _write_shard(spec, tables, ddl, seed, key, spans, path) -> dict[str, int]:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    for table in tables:
+        conn.execute(ddl[table])
+    counts = _insert_chunks(conn, tables, _resolve(spec), seed, key, spans)
+    conn.commit()
+    conn.close()
+    return counts
+
+
+def _split(spans: list, parts: int) -> list[list]:
+    """Split ``spans`` into ``parts`` contiguous groups of near-equal size."""
+    size, extra = divmod(len(spans), parts)
+    groups, start = [], 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        groups.append(spans[start:stop])
+        start = stop
+    return groups
+
+
+def sharded_insert(
+    conn: sqlite3.Connection,
+    tables: str | Sequence[str],
+    make_rows: Callable,
+    seed: int | None,
+    total: int,
+    size: int = DEFAULT_CHUNK,
+    jobs: int = 1,
+    key: str | None = None,
+) -> dict[str, int]:
+    """Generate ids ``1..total`` of ``tables`` in ``size`` chunks on ``jobs`` workers.
+
+    With a single table ``make_rows`` yields rows; with several it yields
+    ``(table, row)`` pairs. Chunk streams are named after ``key`` (default:
+    the first table). The tables must already exist in ``conn``. Returns the
+    number of rows inserted per table.
+
+    The sharded path commits ``conn`` before merging, because ``ATTACH``
+    cannot run inside a transaction.
+    """
+    tables = [tables] if isinstance(tables, str) else list(tables)
+    key = key or tables[0]
+    spans = list(chunk_spans(total, size))
+    if jobs <= 1 or len(spans) <= 1:
+        return _insert_chunks(conn, tables, make_rows, seed, key, spans)
+
+    ddl = {
+        t: conn.execute("SELECT sql FROM main.sqlite_master WHERE type='table' AND name=?", (t,)).fetchone()[0]
+        for t in tables
+    }
+    db_file = conn.execute("PRAGMA database_list").fetchone()[2]
+    workdir = tempfile.mkdtemp(prefix=f".{key}-shards-", dir=os.path.dirname(db_file) or None)
+    try:
+        groups = _split(spans, min(jobs, len(spans)))
+        paths = [os.path.join(workdir, f"shard{i:04d}.db") for i in range(len(groups))]
+        spec = _portable(make_rows)
+        with ProcessPoolExecutor(max_workers=len(groups)) as pool:
+            futures = [
+                pool.submit(_write_shard, spec, tables, ddl, seed, key, group, path)
+                for group, path in zip(groups, paths)
+            ]
+            shard_counts = [f.result() for f in futures]
+
+        conn.commit()
+        for path in paths:
+            conn.execute("ATTACH DATABASE ? AS shard", (path,))
+            for table in tables:
+                conn.execute(f'INSERT INTO main."{table}" SELECT * FROM shard."{table}"')
+            conn.commit()
+            conn.execute("DETACH DATABASE shard")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {t: sum(c[t] for c in shard_counts) for t in tables}
@@ -0,0 +1,98 @@
+"""Run step scripts inside the current interpreter instead of a subprocess.
+
+Starting ``python3`` for every schema/populate/evidence step costs an
+interpreter start plus re-importing ``common`` (and NumPy) each time. These
+helpers execute a script in-process so a long-lived worker pays that once::
+
+    code, seconds, out, err = call_entry(pop, "populate", db=db, scale=2.0)
+    code, seconds, out, err = run_script(loader, ["--db", db], cwd=subdir)
+
+Both return the exit code, wall seconds, captured stdout and the tail of
+captured stderr (including the traceback of an uncaught exception).
+"""
+from __future__ import annotations
+
+import contextlib
+import inspect
+import io
+import os
+import pathlib
+import runpy
+import sys
+import time
+import traceback
+from typing import Callable, Iterator
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+ERROR_TAIL_LINES = 5
+
+
+@contextlib.contextmanager
+def _script_env(path: pathlib.Path, argv: list[str], cwd: str | os.PathLike | None) -> Iterator[None]:
+    """Temporarily set ``sys.argv``, ``sys.path`` and the working directory for ``path``."""
+    saved_argv, saved_path, saved_cwd = sys.argv[:], sys.path[:], os.getcwd()
+    sys.argv = [str(path), *argv]
+    # Match `python3 script.py`: the script's directory and the repo root
+    # (for `common`) are importable.
+    sys.path[:0] = [str(path.parent), str(ROOT)]
+    if cwd is not None:
+        os.chdir(cwd)
+    try:
+        yield
+    finally:
+        sys.argv, sys.path[:] = saved_argv, saved_path
+        os.chdir(saved_cwd)
+
+
+def _exit_code(exc: SystemExit) -> int:
+    if exc.code is None:
+        return 0
+    return exc.code if isinstance(exc.code, int) else 1
+
+
+def _run(path: pathlib.Path, argv: list[str], cwd, target: Callable[[], object]) -> tuple[int, float, str, str]:
+    out, err = io.StringIO(), io.StringIO()
+    start = time.perf_counter()
+    code = 0
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            with _script_env(path, argv, cwd):
+                target()
+        except SystemExit as exc:
+            code = _exit_code(exc)
+            if code and not isinstance(exc.code, int):
+                print(exc.code, file=sys.stderr)
+        except Exception:
+            code = 1
+            traceback.print_exc()
+    tail = "\n".join(err.getvalue().strip().splitlines()[-ERROR_TAIL_LINES:])
+    return code, time.perf_counter() - start, out.getvalue(), tail
+
+
+def run_script(path: str | os.PathLike, argv: list[str] | None = None, cwd: str | os.PathLike | None = None) -> tuple[int, float, str, str]:
+    """Execute ``path`` as ``__main__`` with ``argv``, like ``python3 path *argv``."""
+    path = pathlib.Path(path).resolve()
+    return _run(path, list(argv or []), cwd, lambda: runpy.run_path(str(path), run_name="__main__"))
+
+
+def call_entry(
+    path: str | os.PathLike,
+    entry: str,
+    cwd: str | os.PathLike | None = None,
+    optional: dict | None = None,
+    **kwargs,
+) -> tuple[int, float, str, str]:
+    """Load ``path`` as a module and call its ``entry`` function with ``kwargs``.
+
+    ``optional`` keyword arguments are passed only if ``entry`` accepts them,
+    e.g. tuning knobs that only some generators implement.
+    """
+    path = pathlib.Path(path).resolve()
+
+    def target() -> None:
+        namespace = runpy.run_path(str(path), run_name=f"_step_{path.parent.name}_{path.stem}")
+        func = namespace[entry]
+        accepted = inspect.signature(func).parameters
+        func(**kwargs, **{k: v for k, v in (optional or {}).items() if k in accepted})
+
+    return _run(path, [], cwd, target)
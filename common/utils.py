@@ -1,11 +1,21 @@
 """Common utilities for deterministic data generation and helpers."""
 from __future__ import annotations
 
+import hashlib
 import random
+import sqlite3
 import datetime as _dt
-from typing import Iterable, Iterator, List, Sequence, Tuple
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Sequence, Tuple
+
+try:  # NumPy is only needed by the columnar generation helpers.
+    import numpy as _np
+except ImportError:  # pragma: no cover - exercised on numpy-less installs
+    _np = None
 
 GLOBAL_SEED = 42
+DEFAULT_SCALE = 1.0
+DEFAULT_CHUNK = 1000
 
 
 def get_rng(seed: int | None = None) -> random.Random:
@@ -19,10 +29,97 @@ def get_rng(seed: int | None = None) -> random.Random:
     return random.Random(GLOBAL_SEED if seed is None else seed)
 
 
-def batch(iterable: Sequence, size: int) -> Iterator[Sequence]:
-    """Yield successive batches of ``size`` from ``iterable``."""
-    for i in range(0, len(iterable), size):
-        yield iterable[i : i + size]
+def derive_seed(seed: int | None, *keys: object) -> int:
+    """Derive an independent 64-bit seed from ``seed`` and ``keys``.
+
+    Uses SHA-256 rather than ``hash()`` so the result is stable across
+    processes, platforms and Python versions. ``derive_seed(s, "orders", 3)``
+    names the stream for chunk 3 of the orders table.
+    """
+    material = repr((GLOBAL_SEED if seed is None else seed, *keys)).encode()
+    return int.from_bytes(hashlib.sha256(material).digest()[:8], "big")
+
+
+def table_rng(seed: int | None, table: str, chunk: int | None = None) -> random.Random:
+    """Return the random stream for ``table`` (or one ``chunk`` of it).
+
+    Each table draws from its own stream, so changing how one table is
+    generated never shifts the values of another, and chunks of a large table
+    can be generated in any order or process with identical output.
+    """
+    keys = (table,) if chunk is None else (table, chunk)
+    return random.Random(derive_seed(seed, *keys))
+
+
+def chunk_spans(total: int, size: int = DEFAULT_CHUNK) -> Iterator[Tuple[int, int, int]]:
+    """Yield ``(chunk, start, stop)`` covering ids ``1..total`` in ``size`` blocks."""
+    for chunk, start in enumerate(range(1, total + 1, size)):
+        yield chunk, start, min(start + size, total + 1)
+
+
+def chunked_rows(
+    make_rows: Callable[[random.Random, int, int], Iterable[Sequence]],
+    seed: int | None,
+    table: str,
+    total: int,
+    size: int = DEFAULT_CHUNK,
+) -> Iterator[Sequence]:
+    """Yield rows for ids ``1..total`` generated chunk by chunk.
+
+    ``make_rows(rng, start, stop)`` must only use ``rng`` and its id range, so
+    any chunk can be regenerated on its own. Keep ``size`` fixed per table:
+    output depends on the chunk size, never on the order or worker count.
+    """
+    for chunk, start, stop in chunk_spans(total, size):
+        yield from make_rows(table_rng(seed, table, chunk), start, stop)
+
+
+def scaled(count: int, scale: float = DEFAULT_SCALE) -> int:
+    """Return entity ``count`` multiplied by the corpus ``scale`` factor.
+
+    Only root entity counts should be scaled; per-parent fan-outs, rates and
+    reference catalogs stay fixed so referential ratios are preserved. The
+    result is never below 1 so fractional smoke-test scales still produce rows.
+    """
+    if scale <= 0:
+        raise ValueError(f"scale must be positive, got {scale}")
+    return max(1, round(count * scale))
+
+
+def require_unscaled(scale: float, generator: str) -> None:
+    """Raise ``ValueError`` unless ``scale`` is ``DEFAULT_SCALE``.
+
+    For generators that write a fixed fixture (or nothing yet): rejecting
+    ``--scale`` beats building a db that silently ignores it.
+    """
+    if scale != DEFAULT_SCALE:
+        raise ValueError(f"{generator} writes fixed-size data and does not support scale={scale}")
+
+
+def batch(iterable: Iterable, size: int = DEFAULT_CHUNK) -> Iterator[List]:
+    """Yield successive lists of up to ``size`` items from ``iterable``.
+
+    ``iterable`` may be a lazy row generator or a cursor, so a table never has
+    to be materialised in full: only one chunk is alive at a time.
+    """
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def stream_insert(conn: sqlite3.Connection, sql: str, rows: Iterable[Sequence], size: int = DEFAULT_CHUNK) -> int:
+    """Insert lazily produced ``rows`` with ``executemany`` in bounded chunks.
+
+    Returns the number of rows inserted.
+    """
+    count = 0
+    for chunk in batch(rows, size):
+        conn.executemany(sql, chunk)
+        count += len(chunk)
+    return count
 
 
 def daterange(start: _dt.date, end: _dt.date, step: int = 1) -> Iterator[_dt.date]:
@@ -41,3 +138,82 @@ def next_business_day(date: _dt.date) -> _dt.date:
         next_day += _dt.timedelta(days=1)
     return next_day
 
+
+# ---------------------------------------------------------------------------
+# Columnar generation
+#
+# These helpers draw a whole column per call from a NumPy Generator instead of
+# one value per ``random.Random`` call. They return plain Python lists because
+# sqlite3 cannot bind NumPy scalars, so columns can be zipped straight into
+# ``executemany``::
+#
+#     nrng = get_np_rng(args.seed)
+#     ids = list(range(1, n + 1))
+#     conn.executemany("INSERT INTO t VALUES (?,?,?)",
+#                      zip(ids, id_column("ACCT{:06d}", 1, n + 1),
+#                          choice_column(nrng, ["A", "B"], n, weights=[0.9, 0.1])))
+# ---------------------------------------------------------------------------
+
+
+def _require_numpy():
+    if _np is None:
+        raise ImportError("numpy is required for columnar generation; pip install numpy")
+    return _np
+
+
+def get_np_rng(seed: int | None = None, *keys: object):
+    """Return a NumPy ``Generator`` seeded like :func:`get_rng`.
+
+    With ``keys`` the seed is split like :func:`table_rng`, e.g.
+    ``get_np_rng(seed, "readings", chunk)``.
+    """
+    np = _require_numpy()
+    if keys:
+        return np.random.default_rng(derive_seed(seed, *keys))
+    return np.random.default_rng(GLOBAL_SEED if seed is None else seed)
+
+
+def choice_column(rng, options: Sequence, size: int, weights: Sequence[float] | None = None) -> list:
+    """Draw ``size`` values from ``options``, optionally weighted.
+
+    Weights need not sum to one; they are normalised like ``random.choices``.
+    """
+    np = _require_numpy()
+    p = None
+    if weights is not None:
+        p = np.asarray(weights, dtype=float)
+        p = p / p.sum()
+    idx = rng.choice(len(options), size=size, p=p)
+    return np.asarray(options, dtype=object)[idx].tolist()
+
+
+def int_column(rng, low, high, size: int) -> list[int]:
+    """Draw ``size`` integers in ``[low, high]`` inclusive, like ``randint``.
+
+    ``low`` and ``high`` may be arrays of length ``size`` for per-row bounds.
+    """
+    return rng.integers(low, high, size=size, endpoint=True).tolist()
+
+
+def uniform_column(rng, low, high, size: int, ndigits: int | None = None) -> list[float]:
+    """Draw ``size`` floats in ``[low, high)``, rounded to ``ndigits`` if given.
+
+    ``low`` and ``high`` may be arrays of length ``size`` for per-row bounds.
+    """
+    np = _require_numpy()
+    values = rng.uniform(low, high, size=size)
+    if ndigits is not None:
+        values = np.round(values, ndigits)
+    return values.tolist()
+
+
+def date_column(rng, start: _dt.date, end: _dt.date, size: int) -> list[str]:
+    """Draw ``size`` ISO ``YYYY-MM-DD`` dates between ``start`` and ``end`` inclusive."""
+    np = _require_numpy()
+    offsets = rng.integers(0, (end - start).days, size=size, endpoint=True)
+    return (np.datetime64(start, "D") + offsets).astype(str).tolist()
+
+
+def id_column(template: str, start: int, stop: int) -> list[str]:
+    """Format sequential ids ``start`` to ``stop - 1`` with ``template``, e.g. ``"ACCT{:06d}"``."""
+    return [template.format(i) for i in range(start, stop)]
@@ -0,0 +1,406 @@
+"""Run ``workflow_tasks.md`` workflows as DAGs, with independent steps in parallel.
+
+Steps come from the task catalog (``-- step:`` / ``-- depends:``)::
+
+    wf = WorkflowExecutor(workers=4)
+    result = wf.run_workflow(db, "finance", "credit_risk_assessment")
+    result["steps"]["risk_scoring"]          # {"status", "rows", "row_count", ...}
+
+The database is loaded once into a named in-memory copy (``main`` of every
+step connection). ``SELECT`` steps return rows; any other statement
+(``UPDATE`` ...) writes to a private copy of the base made for that run.
+
+Chains, and any DAG of at most ``serial_steps`` steps, run in dependency order
+on one connection with real TEMP tables: for the corpus' workflows (2-4 steps
+of sub-millisecond SQL) per-step set-up costs more than concurrency saves.
+Every step result is cached (LRU, ``max_cached`` entries) under a key hashing
+the database fingerprint, the step's table name and SQL and the keys of its
+dependencies, so re-running the workflow, or a prefix of it (``targets=``), is
+answered from the cache without touching SQLite.
+
+Larger DAGs with independent branches run on per-step connections instead:
+each ``CREATE TEMP TABLE x AS ...`` step writes ``x`` into its own named
+in-memory database, which later steps ATTACH, so siblings whose dependencies
+are done run concurrently without contending for a write lock. ``plan``
+rejects such DAGs when a step would need more ATTACHed databases than SQLite
+allows. Their table outputs are cached under the same keys, so a longer prefix
+reuses the upstream tables; a write step runs while no other step does. In
+this mode a step only sees the tables of steps it (transitively) depends on,
+and a missing ``-- depends:`` shows up as ``no such table``. Runs containing a
+write neither use nor fill either cache.
+"""
+from __future__ import annotations
+
+import collections
+import hashlib
+import itertools
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from common.catalog import TaskCatalog
+from common.executor import Executor, open_error
+from common.gold import db_fingerprint
+
+CTAS_RE = re.compile(r"^\s*CREATE\s+(?:TEMP\s+|TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+AS\b", re.IGNORECASE)
+QUERY_RE = re.compile(r"^\s*(?:SELECT|WITH|VALUES)\b", re.IGNORECASE)
+COMMENT_RE = re.compile(r"^\s*--[^\n]*\n?", re.MULTILINE)
+STEP_TIMEOUT = 60.0
+SERIAL_STEPS = 8  # DAGs up to this size run on one connection even if they branch
+_ids = itertools.count()
+
+
+def _attach_limit() -> int:
+    conn = sqlite3.connect(":memory:")
+    try:
+        return conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    except AttributeError:  # Python < 3.11: SQLite's compiled-in default
+        return 10
+    finally:
+        conn.close()
+
+
+MAX_ATTACHED = _attach_limit()
+
+
+def _memory_uri(name: str) -> str:
+    # A named memdb database (SQLite >= 3.36) is shared by every connection in
+    # the process like a shared-cache one, but each connection keeps its own
+    # pager, so readers do not serialize on the shared btree mutex.
+    if sqlite3.sqlite_version_info >= (3, 36):
+        return f"file:/sqlgym-wf-{os.getpid()}-{name}?vfs=memdb"
+    return f"file:sqlgym-wf-{os.getpid()}-{name}?mode=memory&cache=shared"
+
+
+def _connect(uri: str) -> sqlite3.Connection:
+    return sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
+
+
+def classify(sql: str) -> tuple[str, str | None, str]:
+    """``(kind, table, body)``: kind is ``table``, ``query`` or ``write``."""
+    body = COMMENT_RE.sub("", sql).strip()
+    m = CTAS_RE.match(body)
+    if m:
+        return "table", m.group(1), body[m.end():]
+    return ("query" if QUERY_RE.match(body) else "write"), None, body
+
+
+def plan(steps: list[dict], targets: list[str] | None = None, serial_steps: int = SERIAL_STEPS) -> list[dict]:
+    """Validate the DAG; return the steps needed for ``targets`` (default all)
+    with ``ancestors`` and their ``kind``/``table``/``body`` filled in.
+
+    Raises ``ValueError`` for unnamed, duplicate or unknown steps, cycles, and
+    DAGs that would run on per-step databases (see ``runs_serially``) with a
+    step needing more than ``MAX_ATTACHED`` of them (its ancestors' tables
+    plus its own output).
+    """
+    by_name = {}
+    for step in steps:
+        if not step.get("step"):
+            raise ValueError("workflow block without -- step: name")
+        if step["step"] in by_name:
+            raise ValueError(f"duplicate step {step['step']!r}")
+        by_name[step["step"]] = step
+    ancestors: dict[str, set[str]] = {}
+
+    def visit(name: str, path: tuple[str, ...]) -> set[str]:
+        if name in path:
+            raise ValueError(f"dependency cycle: {' -> '.join(path + (name,))}")
+        if name not in by_name:
+            raise ValueError(f"unknown step {name!r}")
+        if name not in ancestors:
+            found: set[str] = set()
+            for dep in by_name[name]["depends"]:
+                found |= {dep} | visit(dep, path + (name,))
+            ancestors[name] = found
+        return ancestors[name]
+
+    wanted = set()
+    for name in targets or by_name:
+        wanted |= {name} | visit(name, ())
+    planned = []
+    for step in steps:  # file order is a valid tie-break among ready steps
+        if step["step"] in wanted:
+            kind, table, body = classify(step["sql"])
+            planned.append({**step, "ancestors": ancestors[step["step"]], "kind": kind, "table": table, "body": body})
+    if not runs_serially(planned, serial_steps):
+        tables = {s["step"] for s in planned if s["kind"] == "table"}
+        for step in planned:
+            need = len(step["ancestors"] & tables) + (step["kind"] == "table")
+            if need > MAX_ATTACHED:
+                raise ValueError(
+                    f"step {step['step']!r} needs {need} attached databases; SQLite allows {MAX_ATTACHED}"
+                )
+    return planned
+
+
+def runs_serially(planned: list[dict], serial_steps: int = SERIAL_STEPS) -> bool:
+    """True if ``planned`` runs on one connection: it has at most
+    ``serial_steps`` steps, or no two of its steps are independent."""
+    if len(planned) <= serial_steps:
+        return True
+    return all(
+        a["step"] in b["ancestors"] or b["step"] in a["ancestors"] for a, b in itertools.combinations(planned, 2)
+    )
+
+
+def step_keys(planned: list[dict], fp: str | None) -> dict[str, str | None]:
+    """Cache key per step: hash of ``fp``, table name, SQL and the keys of its
+    ancestors; all None (not cacheable) without a fingerprint."""
+    by_name = {s["step"]: s for s in planned}
+    keys: dict[str, str] = {}
+
+    def key(name: str) -> str:
+        if name not in keys:
+            step = by_name[name]
+            parts = [fp, step["table"] or "", step["body"], *(key(d) for d in sorted(step["ancestors"]))]
+            keys[name] = hashlib.sha256("\0".join(parts).encode()).hexdigest()
+        return keys[name]
+
+    return {name: key(name) if fp else None for name in by_name}
+
+
+class WorkflowExecutor:
+    """Topologically scheduled, cached workflow runs over in-memory db copies."""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_cached: int = 64,
+        executor: Executor | None = None,
+        serial_steps: int = SERIAL_STEPS,
+    ) -> None:
+        self.executor = executor or Executor(timeout=STEP_TIMEOUT, max_rows=None)
+        self.max_cached = max_cached
+        self.serial_steps = serial_steps
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sqlgym-wf")
+        self._bases: dict[str, tuple[str, sqlite3.Connection]] = {}
+        # cache key -> (memory uri, keeper connection holding the db alive)
+        self._outputs: collections.OrderedDict[str, tuple[str, sqlite3.Connection]] = collections.OrderedDict()
+        # cache key -> step result of a serial run
+        self._results: collections.OrderedDict[str, dict] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"steps": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+    def load(self, db: str | os.PathLike) -> str:
+        """URI of the in-memory copy of ``db``; the first call copies it in
+        (and hashes the file for the cache keys, so runs only ``stat`` it)."""
+        key = os.path.abspath(db)
+        with self._lock:
+            if key not in self._bases:
+                if not os.path.exists(key):
+                    raise FileNotFoundError(key)
+                uri = _memory_uri(f"base{next(_ids)}")
+                keeper = _connect(uri)
+                src = sqlite3.connect(f"file:{key}?mode=ro", uri=True)
+                try:
+                    src.backup(keeper)
+                finally:
+                    src.close()
+                self._bases[key] = (uri, keeper)
+                db_fingerprint(key)
+            return self._bases[key][0]
+
+    def _private_base(self, base_uri: str) -> tuple[str, sqlite3.Connection]:
+        uri = _memory_uri(f"run{next(_ids)}")
+        keeper = _connect(uri)
+        src = _connect(base_uri)
+        try:
+            src.backup(keeper)
+        finally:
+            src.close()
+        return uri, keeper
+
+    def _cached(self, key: str) -> str | None:
+        with self._lock:
+            if key in self._outputs:
+                self._outputs.move_to_end(key)
+                return self._outputs[key][0]
+        return None
+
+    def _store(self, key: str, uri: str, keeper: sqlite3.Connection) -> None:
+        with self._lock:
+            self._outputs[key] = (uri, keeper)
+            while len(self._outputs) > self.max_cached:
+                _, (_, old) = self._outputs.popitem(last=False)
+                old.close()  # the db lives on while a running step has it attached
+                self.stats["evictions"] += 1
+
+    def _run_step(self, step: dict, base_uri: str, inputs: list[str], out_uri: str | None) -> dict:
+        conn = _connect(base_uri)
+        try:
+            try:
+                for i, uri in enumerate(inputs):
+                    conn.execute(f"ATTACH DATABASE ? AS in{i}", (uri,))
+                if out_uri:
+                    conn.execute("ATTACH DATABASE ? AS out", (out_uri,))
+            except sqlite3.Error as e:  # e.g. more ancestors than SQLITE_MAX_ATTACHED
+                return open_error(e)
+            if step["kind"] != "table":
+                return self.executor.run(conn, step["body"])
+            result = self.executor.run(conn, f'CREATE TABLE out."{step["table"]}" AS {step["body"]}')
+            if result["ok"]:
+                result["row_count"] = conn.execute(f'SELECT COUNT(*) FROM out."{step["table"]}"').fetchone()[0]
+            return result
+        finally:
+            conn.close()
+
+    def run(self, db: str | os.PathLike, steps: list[dict], targets: list[str] | None = None) -> dict:
+        """Run ``steps`` (``{"step", "depends", "sql"}``, e.g. from the catalog).
+
+        Only ``targets`` and their ancestors run when given. Returns ``{"ok",
+        "steps": {name: result}}`` where each result is an ``Executor`` result
+        dict plus ``status``: ``ok``, ``cached``, ``error`` or ``skipped`` (an
+        ancestor failed).
+        """
+        planned = plan(steps, targets, self.serial_steps)
+        base_uri = self.load(db)
+        private = None
+        if any(s["kind"] == "write" for s in planned):
+            # Steps not downstream of the write may still run after it, so
+            # nothing in this run is cacheable.
+            private = self._private_base(base_uri)
+            base_uri = private[0]
+        keys = step_keys(planned, None if private else db_fingerprint(db))
+        try:
+            if runs_serially(planned, self.serial_steps):
+                results = self._run_serial(planned, base_uri, keys)
+            else:
+                results = self._run_parallel(planned, base_uri, keys)
+        finally:
+            if private:
+                private[1].close()
+        return {"ok": all(r["status"] in ("ok", "cached") for r in results.values()), "steps": results}
+
+    def _run_serial(self, planned: list[dict], base_uri: str, keys: dict[str, str | None]) -> dict[str, dict]:
+        """Steps in dependency order on one connection, TEMP tables for outputs."""
+        with self._lock:
+            hits = [self._results.get(keys[s["step"]]) if keys[s["step"]] else None for s in planned]
+            if all(hits):
+                for step in planned:
+                    self._results.move_to_end(keys[step["step"]])
+                self.stats["hits"] += len(planned)
+                return {step["step"]: {**hit, "status": "cached"} for step, hit in zip(planned, hits)}
+            self.stats["misses"] += len(planned)
+        results: dict[str, dict] = {}
+        pending = list(planned)
+        conn = _connect(base_uri)
+        try:
+            conn.execute("PRAGMA temp_store=MEMORY")
+            while pending:
+                step = next(s for s in pending if s["ancestors"] <= results.keys())  # file order breaks ties
+                pending.remove(step)
+                name = step["step"]
+                if any(results[d]["status"] != "ok" for d in step["ancestors"]):
+                    results[name] = {"status": "skipped", "ok": False, "error": None}
+                    continue
+                self.stats["steps"] += 1
+                if step["kind"] == "table":
+                    result = self.executor.run(conn, f'CREATE TEMP TABLE "{step["table"]}" AS {step["body"]}')
+                    if result["ok"]:
+                        result["row_count"] = conn.execute(f'SELECT COUNT(*) FROM temp."{step["table"]}"').fetchone()[0]
+                else:
+                    result = self.executor.run(conn, step["body"])
+                result["status"] = "ok" if result["ok"] else "error"
+                results[name] = result
+        finally:
+            conn.close()
+        with self._lock:
+            for name, result in results.items():
+                if result["status"] == "ok" and keys[name]:
+                    self._results[keys[name]] = result
+                    self._results.move_to_end(keys[name])
+            while len(self._results) > self.max_cached:
+                self._results.popitem(last=False)
+                self.stats["evictions"] += 1
+        return results
+
+    def _run_parallel(self, planned: list[dict], base_uri: str, keys: dict[str, str | None]) -> dict[str, dict]:
+        """Steps on per-step connections, siblings concurrently on the pool."""
+        outputs: dict[str, str] = {}  # step -> memory uri of its output table
+        # Every output this run uses stays open until it ends, even if the LRU
+        # evicts it meanwhile.
+        holders: list[sqlite3.Connection] = []
+        results: dict[str, dict] = {}
+        pending, running = list(planned), {}
+        try:
+            while pending or running:
+                progressed = False
+                for step in list(pending):
+                    deps = [results.get(d, {}).get("status") for d in step["ancestors"]]
+                    if any(s in ("error", "skipped") for s in deps):
+                        results[step["step"]] = {"status": "skipped", "ok": False, "error": None}
+                        pending.remove(step)
+                        progressed = True
+                        continue
+                    if not all(s in ("ok", "cached") for s in deps):
+                        continue
+                    exclusive = step["kind"] == "write"
+                    if running and (exclusive or any(s["kind"] == "write" for s in running.values())):
+                        continue
+                    pending.remove(step)
+                    progressed = True
+                    name = step["step"]
+                    inputs = [outputs[d] for d in sorted(step["ancestors"]) if d in outputs]
+                    out_uri = None
+                    if step["kind"] == "table":
+                        hit = self._cached(keys[name]) if keys[name] else None
+                        if hit:
+                            holders.append(_connect(hit))
+                            outputs[name] = hit
+                            results[name] = {"status": "cached", "ok": True, "error": None}
+                            self.stats["hits"] += 1
+                            continue
+                        self.stats["misses"] += 1
+                        out_uri = _memory_uri(f"out{next(_ids)}")
+                        holders.append(_connect(out_uri))
+                        outputs[name] = out_uri
+                    self.stats["steps"] += 1
+                    running[self._pool.submit(self._run_step, step, base_uri, inputs, out_uri)] = step
+                    if exclusive:
+                        break
+                if not running:
+                    if progressed:
+                        continue  # cache hits may have made more steps ready
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    step = running.pop(fut)
+                    result = fut.result()
+                    result["status"] = "ok" if result["ok"] else "error"
+                    results[step["step"]] = result
+                    name = step["step"]
+                    # Published only once complete, so a concurrent run never attaches a half-built output
+                    if result["ok"] and step["kind"] == "table" and keys.get(name):
+                        self._store(keys[name], outputs[name], _connect(outputs[name]))
+        finally:
+            for holder in holders:
+                holder.close()
+        return results
+
+    def run_workflow(
+        self,
+        db: str | os.PathLike,
+        scope: str,
+        workflow: str,
+        targets: list[str] | None = None,
+        catalog: TaskCatalog | None = None,
+    ) -> dict:
+        """Run workflow ``workflow`` of ``scope``'s ``workflow_tasks.md`` on ``db``."""
+        catalog = catalog or TaskCatalog()
+        steps = [s for s in catalog.workflow_steps(scope) if s["workflow"] == workflow]
+        if not steps:
+            raise KeyError(f"no workflow {workflow!r} in {scope}")
+        return self.run(db, steps, targets)
+
+    def close(self) -> None:
+        self._pool.shutdown()
+        with self._lock:
+            conns = [keeper for _, keeper in self._outputs.values()] + [keeper for _, keeper in self._bases.values()]
+            self._outputs.clear()
+            self._results.clear()
+            self._bases.clear()
+        for conn in conns:
+            conn.close()
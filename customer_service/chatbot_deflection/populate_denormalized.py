@@ -3,12 +3,12 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
 from pathlib import Path
 from datetime import datetime, timedelta
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import batch
+from common.bulkload import bulk_load
+from common.denormalize import attach, materialize
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -16,14 +16,11 @@ def main() -> None:
     parser.add_argument("--denormalized-db", required=True)
     args = parser.parse_args()
     
-    # Connect to both databases
-    norm_conn = sqlite3.connect(args.normalized_db)
-    norm_conn.row_factory = sqlite3.Row
-    denorm_conn = sqlite3.connect(args.denormalized_db)
+    with bulk_load(args.denormalized_db) as denorm_conn, attach(denorm_conn, args.normalized_db):
     
-    print("Building conversation analytics...")
-    # Build conversation_analytics table
-    conv_query = """
+        print("Building conversation analytics...")
+        # Build conversation_analytics table
+        conv_query = """
     SELECT 
         c.id as conversation_id,
         cu.email as customer_email,
@@ -58,20 +55,11 @@ def main() -> None:
     GROUP BY c.id
     """
     
-    conv_data = []
-    for row in norm_conn.execute(conv_query):
-        conv_data.append(tuple(row))
+        materialize(denorm_conn, "conversation_analytics", conv_query)
     
-    # Insert in batches
-    for chunk in batch(conv_data, 1000):
-        denorm_conn.executemany("""
-            INSERT INTO conversation_analytics VALUES 
-            (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-        """, chunk)
-    
-    print("Building daily deflection metrics...")
-    # Build daily_deflection_metrics
-    daily_query = """
+        print("Building daily deflection metrics...")
+        # Build daily_deflection_metrics
+        daily_query = """
     SELECT 
         DATE(c.started_at) as date,
         c.channel,
@@ -92,18 +80,11 @@ def main() -> None:
     GROUP BY DATE(c.started_at), c.channel
     """
     
-    daily_data = []
-    for row in norm_conn.execute(daily_query):
-        daily_data.append(tuple(row))
-    
-    denorm_conn.executemany("""
-        INSERT INTO daily_deflection_metrics VALUES 
-        (?,?,?,?,?,?,?,?,?)
-    """, daily_data)
+        materialize(denorm_conn, "daily_deflection_metrics", daily_query)
     
-    print("Building intent performance metrics...")
-    # Build intent_performance
-    intent_query = """
+        print("Building intent performance metrics...")
+        # Build intent_performance
+        intent_query = """
     SELECT 
         ic.name as intent_name,
         strftime('%Y-%m', c.started_at) as month,
@@ -120,27 +101,17 @@ def main() -> None:
     GROUP BY ic.name, strftime('%Y-%m', c.started_at)
     """
     
-    intent_data = []
-    for row in norm_conn.execute(intent_query):
-        intent_data.append(tuple(row))
-    
-    denorm_conn.executemany("""
-        INSERT INTO intent_performance VALUES 
-        (?,?,?,?,?,?,?)
-    """, intent_data)
+        materialize(denorm_conn, "intent_performance", intent_query)
     
-    # Create indexes
-    print("Creating indexes...")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_conv_analytics_status ON conversation_analytics(status)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_conv_analytics_date ON conversation_analytics(started_at)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_conv_analytics_intent ON conversation_analytics(primary_intent)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_metrics_date ON daily_deflection_metrics(date)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_intent_perf_month ON intent_performance(month)")
+        # Create indexes
+        print("Creating indexes...")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_conv_analytics_status ON conversation_analytics(status)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_conv_analytics_date ON conversation_analytics(started_at)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_conv_analytics_intent ON conversation_analytics(primary_intent)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_metrics_date ON daily_deflection_metrics(date)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_intent_perf_month ON intent_performance(month)")
     
-    denorm_conn.commit()
-    denorm_conn.close()
-    norm_conn.close()
-    print("Done!")
+        print("Done!")
 
 if __name__ == "__main__":
     main()
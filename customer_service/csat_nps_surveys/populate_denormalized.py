@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 from common.utils import batch
+from common.bulkload import bulk_load
+from common.denormalize import attach, materialize
 
 def determine_sentiment(comment):
     """Simple sentiment analysis based on keywords."""
@@ -63,11 +65,11 @@ def main() -> None:
     # Connect to both databases
     norm_conn = sqlite3.connect(args.normalized_db)
     norm_conn.row_factory = sqlite3.Row
-    denorm_conn = sqlite3.connect(args.denormalized_db)
+    with bulk_load(args.denormalized_db) as denorm_conn, attach(denorm_conn, args.normalized_db):
     
-    print("Building survey analytics...")
-    # Build survey_analytics table
-    analytics_query = """
+        print("Building survey analytics...")
+        # Build survey_analytics table
+        analytics_query = """
     SELECT 
         s.id as survey_id,
         c.email as customer_email,
@@ -94,40 +96,40 @@ def main() -> None:
     LEFT JOIN follow_ups f ON s.id = f.survey_id
     """
     
-    analytics_data = []
-    for row in norm_conn.execute(analytics_query):
-        score_category = get_score_category(row['score'], row['survey_type'])
-        comment_sentiment = determine_sentiment(row['comment'])
+        analytics_data = []
+        for row in norm_conn.execute(analytics_query):
+            score_category = get_score_category(row['score'], row['survey_type'])
+            comment_sentiment = determine_sentiment(row['comment'])
         
-        analytics_data.append((
-            row['survey_id'],
-            row['customer_email'],
-            row['customer_segment'],
-            row['touchpoint_name'],
-            row['channel'],
-            row['survey_type'],
-            row['sent_at'],
-            row['responded_at'],
-            row['response_time_hours'],
-            row['score'],
-            score_category,
-            row['comment'],
-            comment_sentiment,
-            row['trigger_event'],
-            row['follow_up_action'],
-            row['follow_up_outcome']
-        ))
+            analytics_data.append((
+                row['survey_id'],
+                row['customer_email'],
+                row['customer_segment'],
+                row['touchpoint_name'],
+                row['channel'],
+                row['survey_type'],
+                row['sent_at'],
+                row['responded_at'],
+                row['response_time_hours'],
+                row['score'],
+                score_category,
+                row['comment'],
+                comment_sentiment,
+                row['trigger_event'],
+                row['follow_up_action'],
+                row['follow_up_outcome']
+            ))
     
-    # Insert in batches
-    for chunk in batch(analytics_data, 1000):
-        denorm_conn.executemany("""
+        # Insert in batches
+        for chunk in batch(analytics_data, 1000):
+            denorm_conn.executemany("""
             INSERT INTO survey_analytics VALUES 
             (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
         """, chunk)
     
-    print("Building daily metrics...")
-    # Build daily_metrics
-    daily_query = """
+        print("Building daily metrics...")
+        # Build daily_metrics
+        daily_query = """
     SELECT 
         DATE(s.sent_at) as date,
         s.survey_type,
@@ -139,15 +141,15 @@ def main() -> None:
     GROUP BY DATE(s.sent_at), s.survey_type
     """
     
-    daily_data = []
-    for row in norm_conn.execute(daily_query):
-        # Calculate NPS score if applicable
-        nps_score = None
-        csat_percentage = None
+        daily_data = []
+        for row in norm_conn.execute(daily_query):
+            # Calculate NPS score if applicable
+            nps_score = None
+            csat_percentage = None
         
-        if row['survey_type'] == 'NPS' and row['avg_score']:
-            # Get promoters and detractors for NPS calculation
-            nps_query = """
+            if row['survey_type'] == 'NPS' and row['avg_score']:
+                # Get promoters and detractors for NPS calculation
+                nps_query = """
             SELECT 
                 COUNT(CASE WHEN score >= 9 THEN 1 END) as promoters,
                 COUNT(CASE WHEN score <= 6 THEN 1 END) as detractors,
@@ -155,42 +157,42 @@ def main() -> None:
             FROM surveys
             WHERE DATE(sent_at) = ? AND survey_type = 'NPS'
             """
-            nps_row = norm_conn.execute(nps_query, (row['date'],)).fetchone()
-            if nps_row['total'] > 0:
-                nps_score = int(((nps_row['promoters'] - nps_row['detractors']) / nps_row['total']) * 100)
+                nps_row = norm_conn.execute(nps_query, (row['date'],)).fetchone()
+                if nps_row['total'] > 0:
+                    nps_score = int(((nps_row['promoters'] - nps_row['detractors']) / nps_row['total']) * 100)
         
-        elif row['survey_type'] == 'CSAT' and row['avg_score']:
-            # Calculate satisfaction percentage for CSAT
-            csat_query = """
+            elif row['survey_type'] == 'CSAT' and row['avg_score']:
+                # Calculate satisfaction percentage for CSAT
+                csat_query = """
             SELECT 
                 COUNT(CASE WHEN score >= 8 THEN 1 END) as satisfied,
                 COUNT(CASE WHEN score IS NOT NULL THEN 1 END) as total
             FROM surveys
             WHERE DATE(sent_at) = ? AND survey_type = 'CSAT'
             """
-            csat_row = norm_conn.execute(csat_query, (row['date'],)).fetchone()
-            if csat_row['total'] > 0:
-                csat_percentage = (csat_row['satisfied'] / csat_row['total']) * 100
+                csat_row = norm_conn.execute(csat_query, (row['date'],)).fetchone()
+                if csat_row['total'] > 0:
+                    csat_percentage = (csat_row['satisfied'] / csat_row['total']) * 100
         
-        daily_data.append((
-            row['date'],
-            row['survey_type'],
-            row['total_sent'],
-            row['total_responses'],
-            row['response_rate'],
-            row['avg_score'],
-            nps_score,
-            csat_percentage
-        ))
+            daily_data.append((
+                row['date'],
+                row['survey_type'],
+                row['total_sent'],
+                row['total_responses'],
+                row['response_rate'],
+                row['avg_score'],
+                nps_score,
+                csat_percentage
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO daily_metrics VALUES 
         (?,?,?,?,?,?,?,?)
     """, daily_data)
     
-    print("Building segment scores...")
-    # Build segment_scores
-    segment_query = """
+        print("Building segment scores...")
+        # Build segment_scores
+        segment_query = """
     SELECT 
         c.segment,
         s.survey_type,
@@ -203,21 +205,21 @@ def main() -> None:
     GROUP BY c.segment, s.survey_type, strftime('%Y-%m', s.sent_at)
     """
     
-    segment_data = []
-    prev_scores = {}  # Track previous month scores for trends
+        segment_data = []
+        prev_scores = {}  # Track previous month scores for trends
     
-    for row in norm_conn.execute(segment_query):
-        key = (row['segment'], row['survey_type'])
-        score_trend = None
+        for row in norm_conn.execute(segment_query):
+            key = (row['segment'], row['survey_type'])
+            score_trend = None
         
-        if key in prev_scores and row['avg_score']:
-            score_trend = row['avg_score'] - prev_scores[key]
+            if key in prev_scores and row['avg_score']:
+                score_trend = row['avg_score'] - prev_scores[key]
         
-        if row['avg_score']:
-            prev_scores[key] = row['avg_score']
+            if row['avg_score']:
+                prev_scores[key] = row['avg_score']
         
-        # Get top drivers (simplified - in real world would use text analytics)
-        drivers_query = """
+            # Get top drivers (simplified - in real world would use text analytics)
+            drivers_query = """
         SELECT 
             st.trigger_event,
             AVG(s.score) as avg_score,
@@ -231,30 +233,30 @@ def main() -> None:
         ORDER BY avg_score DESC
         """
         
-        drivers = list(norm_conn.execute(drivers_query, (row['segment'], row['survey_type'], row['month'])))
-        top_positive = drivers[0]['trigger_event'] if drivers and drivers[0]['avg_score'] >= 7 else None
-        top_negative = drivers[-1]['trigger_event'] if drivers and drivers[-1]['avg_score'] < 7 else None
+            drivers = list(norm_conn.execute(drivers_query, (row['segment'], row['survey_type'], row['month'])))
+            top_positive = drivers[0]['trigger_event'] if drivers and drivers[0]['avg_score'] >= 7 else None
+            top_negative = drivers[-1]['trigger_event'] if drivers and drivers[-1]['avg_score'] < 7 else None
         
-        segment_data.append((
-            row['segment'],
-            row['survey_type'],
-            row['month'],
-            row['total_surveys'],
-            row['responses'],
-            row['avg_score'],
-            score_trend,
-            top_positive,
-            top_negative
-        ))
+            segment_data.append((
+                row['segment'],
+                row['survey_type'],
+                row['month'],
+                row['total_surveys'],
+                row['responses'],
+                row['avg_score'],
+                score_trend,
+                top_positive,
+                top_negative
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO segment_scores VALUES 
         (?,?,?,?,?,?,?,?,?)
     """, segment_data)
     
-    print("Building touchpoint performance...")
-    # Build touchpoint_performance
-    touchpoint_query = """
+        print("Building touchpoint performance...")
+        # Build touchpoint_performance
+        touchpoint_query = """
     SELECT 
         t.name as touchpoint_name,
         printf('%04d-Q%d', 
@@ -274,27 +276,18 @@ def main() -> None:
     GROUP BY t.name, quarter
     """
     
-    touchpoint_data = []
-    for row in norm_conn.execute(touchpoint_query):
-        touchpoint_data.append(tuple(row))
-    
-    denorm_conn.executemany("""
-        INSERT INTO touchpoint_performance VALUES 
-        (?,?,?,?,?,?,?,?)
-    """, touchpoint_data)
+        materialize(denorm_conn, "touchpoint_performance", touchpoint_query)
     
-    # Create indexes
-    print("Creating indexes...")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_survey_analytics_date ON survey_analytics(sent_at)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_survey_analytics_type ON survey_analytics(survey_type)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_survey_analytics_segment ON survey_analytics(customer_segment)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_metrics_date ON daily_metrics(date)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_segment_scores_month ON segment_scores(month)")
+        # Create indexes
+        print("Creating indexes...")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_survey_analytics_date ON survey_analytics(sent_at)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_survey_analytics_type ON survey_analytics(survey_type)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_survey_analytics_segment ON survey_analytics(customer_segment)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_metrics_date ON daily_metrics(date)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_segment_scores_month ON segment_scores(month)")
     
-    denorm_conn.commit()
-    denorm_conn.close()
-    norm_conn.close()
-    print("Done!")
+        norm_conn.close()
+        print("Done!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,13 +3,13 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
 import json
 from pathlib import Path
 from datetime import datetime
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import batch
+from common.bulkload import bulk_load
+from common.denormalize import attach, materialize
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -17,14 +17,11 @@ def main() -> None:
     parser.add_argument("--denormalized-db", required=True)
     args = parser.parse_args()
     
-    # Connect to both databases
-    norm_conn = sqlite3.connect(args.normalized_db)
-    norm_conn.row_factory = sqlite3.Row
-    denorm_conn = sqlite3.connect(args.denormalized_db)
+    with bulk_load(args.denormalized_db) as denorm_conn, attach(denorm_conn, args.normalized_db):
     
-    print("Building issue analytics...")
-    # Build issue_analytics table with escalation chain
-    analytics_query = """
+        print("Building issue analytics...")
+        # Build issue_analytics table with escalation chain
+        analytics_query = """
     WITH escalation_chains AS (
         SELECT 
             e.issue_id,
@@ -75,20 +72,11 @@ def main() -> None:
     LEFT JOIN problem_records pr ON i.id = pr.root_issue_id
     """
     
-    analytics_data = []
-    for row in norm_conn.execute(analytics_query):
-        analytics_data.append(tuple(row))
+        materialize(denorm_conn, "issue_analytics", analytics_query)
     
-    # Insert in batches
-    for chunk in batch(analytics_data, 1000):
-        denorm_conn.executemany("""
-            INSERT INTO issue_analytics VALUES 
-            (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-        """, chunk)
-    
-    print("Building daily escalation metrics...")
-    # Build daily_escalation_metrics
-    daily_query = """
+        print("Building daily escalation metrics...")
+        # Build daily_escalation_metrics
+        daily_query = """
     WITH daily_issues AS (
         SELECT 
             DATE(i.created_at) as date,
@@ -119,27 +107,11 @@ def main() -> None:
     FROM daily_issues
     """
     
-    daily_data = []
-    for row in norm_conn.execute(daily_query):
-        daily_data.append((
-            row['date'],
-            row['department'],
-            row['total_issues'],
-            row['escalated_issues'],
-            row['escalation_rate'],
-            row['avg_escalations_per_issue'],
-            row['critical_issues'],
-            row['sla_breaches']
-        ))
-    
-    denorm_conn.executemany("""
-        INSERT INTO daily_escalation_metrics VALUES 
-        (?,?,?,?,?,?,?,?)
-    """, daily_data)
+        materialize(denorm_conn, "daily_escalation_metrics", daily_query)
     
-    print("Building agent performance metrics...")
-    # Build agent_performance
-    agent_query = """
+        print("Building agent performance metrics...")
+        # Build agent_performance
+        agent_query = """
     WITH agent_metrics AS (
         SELECT 
             a.id as agent_id,
@@ -191,30 +163,11 @@ def main() -> None:
     GROUP BY am.agent_id, am.month
     """
     
-    agent_data = []
-    for row in norm_conn.execute(agent_query):
-        agent_data.append((
-            row['agent_id'],
-            row['month'],
-            row['skill_level'],
-            row['issues_handled'],
-            row['issues_resolved'],
-            row['issues_escalated_up'],
-            row['issues_received_from_escalation'],
-            row['resolution_rate'],
-            row['avg_resolution_hours'],
-            row['customer_tier_distribution']
-        ))
+        materialize(denorm_conn, "agent_performance", agent_query)
     
-    for chunk in batch(agent_data, 500):
-        denorm_conn.executemany("""
-            INSERT INTO agent_performance VALUES 
-            (?,?,?,?,?,?,?,?,?,?)
-        """, chunk)
-    
-    print("Building problem impact summary...")
-    # Build problem_impact_summary
-    problem_query = """
+        print("Building problem impact summary...")
+        # Build problem_impact_summary
+        problem_query = """
     SELECT 
         pr.id as problem_id,
         pr.problem_statement,
@@ -247,27 +200,17 @@ def main() -> None:
     GROUP BY pr.id
     """
     
-    problem_data = []
-    for row in norm_conn.execute(problem_query):
-        problem_data.append(tuple(row))
-    
-    denorm_conn.executemany("""
-        INSERT INTO problem_impact_summary VALUES 
-        (?,?,?,?,?,?,?,?,?,?,?)
-    """, problem_data)
+        materialize(denorm_conn, "problem_impact_summary", problem_query)
     
-    # Create indexes
-    print("Creating indexes...")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_issue_analytics_date ON issue_analytics(created_at)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_issue_analytics_tier ON issue_analytics(customer_tier)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_metrics_date ON daily_escalation_metrics(date)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_performance_month ON agent_performance(month)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_problem_impact_customers ON problem_impact_summary(total_affected_customers DESC)")
+        # Create indexes
+        print("Creating indexes...")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_issue_analytics_date ON issue_analytics(created_at)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_issue_analytics_tier ON issue_analytics(customer_tier)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_metrics_date ON daily_escalation_metrics(date)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_performance_month ON agent_performance(month)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_problem_impact_customers ON problem_impact_summary(total_affected_customers DESC)")
     
-    denorm_conn.commit()
-    denorm_conn.close()
-    norm_conn.close()
-    print("Done!")
+        print("Done!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
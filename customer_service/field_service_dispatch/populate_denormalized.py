@@ -9,6 +9,7 @@ from pathlib import Path
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 from common.utils import batch
+from common.bulkload import bulk_load
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -18,10 +19,10 @@ def main() -> None:
     
     norm_conn = sqlite3.connect(args.normalized_db)
     norm_conn.row_factory = sqlite3.Row
-    denorm_conn = sqlite3.connect(args.denormalized_db)
+    with bulk_load(args.denormalized_db) as denorm_conn:
     
-    print("Building daily technician schedules...")
-    schedule_query = """
+        print("Building daily technician schedules...")
+        schedule_query = """
     SELECT 
         t.id as technician_id,
         t.name as technician_name,
@@ -47,34 +48,34 @@ def main() -> None:
     GROUP BY t.id, a.scheduled_date
     """
     
-    schedule_data = []
-    for row in norm_conn.execute(schedule_query):
-        utilization = min(100, (row['total_appointments'] / row['max_daily_jobs']) * 100)
-        avg_travel = row['total_travel_km'] / row['total_appointments'] if row['total_appointments'] > 1 else 0
+        schedule_data = []
+        for row in norm_conn.execute(schedule_query):
+            utilization = min(100, (row['total_appointments'] / row['max_daily_jobs']) * 100)
+            avg_travel = row['total_travel_km'] / row['total_appointments'] if row['total_appointments'] > 1 else 0
         
-        schedule_data.append((
-            row['technician_id'],
-            row['technician_name'],
-            row['schedule_date'],
-            row['total_appointments'],
-            row['total_travel_km'],
-            row['total_service_hours'],
-            utilization,
-            row['first_appointment_time'],
-            row['last_appointment_time'],
-            json.dumps(row['service_types'].split(',')),
-            row['completion_rate'],
-            avg_travel
-        ))
+            schedule_data.append((
+                row['technician_id'],
+                row['technician_name'],
+                row['schedule_date'],
+                row['total_appointments'],
+                row['total_travel_km'],
+                row['total_service_hours'],
+                utilization,
+                row['first_appointment_time'],
+                row['last_appointment_time'],
+                json.dumps(row['service_types'].split(',')),
+                row['completion_rate'],
+                avg_travel
+            ))
     
-    for chunk in batch(schedule_data, 500):
-        denorm_conn.executemany("""
+        for chunk in batch(schedule_data, 500):
+            denorm_conn.executemany("""
             INSERT INTO daily_technician_schedule VALUES 
             (?,?,?,?,?,?,?,?,?,?,?,?)
         """, chunk)
     
-    print("Building service metrics...")
-    metrics_query = """
+        print("Building service metrics...")
+        metrics_query = """
     SELECT 
         DATE(sr.created_at) as date,
         sr.request_type,
@@ -97,31 +98,31 @@ def main() -> None:
     GROUP BY DATE(sr.created_at), sr.request_type
     """
     
-    metrics_data = []
-    for row in norm_conn.execute(metrics_query):
-        # Simulate first-time fix rate
-        ftf_rate = 85 if row['request_type'] in ['MAINTENANCE', 'INSPECTION'] else 70
+        metrics_data = []
+        for row in norm_conn.execute(metrics_query):
+            # Simulate first-time fix rate
+            ftf_rate = 85 if row['request_type'] in ['MAINTENANCE', 'INSPECTION'] else 70
         
-        metrics_data.append((
-            row['date'],
-            row['request_type'],
-            row['total_requests'],
-            row['scheduled_count'],
-            row['completed_count'],
-            row['cancelled_count'],
-            row['avg_wait_time_hours'],
-            row['avg_completion_time_hours'],
-            row['on_time_rate'] or 0,
-            ftf_rate
-        ))
+            metrics_data.append((
+                row['date'],
+                row['request_type'],
+                row['total_requests'],
+                row['scheduled_count'],
+                row['completed_count'],
+                row['cancelled_count'],
+                row['avg_wait_time_hours'],
+                row['avg_completion_time_hours'],
+                row['on_time_rate'] or 0,
+                ftf_rate
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO service_metrics VALUES 
         (?,?,?,?,?,?,?,?,?,?)
     """, metrics_data)
     
-    print("Building geographic demand...")
-    geo_query = """
+        print("Building geographic demand...")
+        geo_query = """
     SELECT 
         ROUND(c.latitude, 1) as grid_latitude,
         ROUND(c.longitude, 1) as grid_longitude,
@@ -139,29 +140,29 @@ def main() -> None:
              strftime('%Y-%m-%d', sr.created_at, 'weekday 0', '-6 days')
     """
     
-    geo_data = []
-    for row in norm_conn.execute(geo_query):
-        # Calculate underserved score based on response time
-        underserved = min(10, int((row['avg_response_time_hours'] or 24) / 24 * 5))
+        geo_data = []
+        for row in norm_conn.execute(geo_query):
+            # Calculate underserved score based on response time
+            underserved = min(10, int((row['avg_response_time_hours'] or 24) / 24 * 5))
         
-        geo_data.append((
-            row['grid_latitude'],
-            row['grid_longitude'],
-            row['week_start'],
-            row['total_requests'],
-            row['emergency_requests'],
-            row['avg_response_time_hours'],
-            15.0,  # Simulated average distance
-            underserved
-        ))
+            geo_data.append((
+                row['grid_latitude'],
+                row['grid_longitude'],
+                row['week_start'],
+                row['total_requests'],
+                row['emergency_requests'],
+                row['avg_response_time_hours'],
+                15.0,  # Simulated average distance
+                underserved
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO geographic_demand VALUES 
         (?,?,?,?,?,?,?,?)
     """, geo_data)
     
-    print("Building technician performance...")
-    perf_query = """
+        print("Building technician performance...")
+        perf_query = """
     SELECT 
         t.id as technician_id,
         strftime('%Y-%m', a.scheduled_date) as month,
@@ -182,50 +183,48 @@ def main() -> None:
     GROUP BY t.id, strftime('%Y-%m', a.scheduled_date)
     """
     
-    perf_data = []
-    for row in norm_conn.execute(perf_query):
-        completion_rate = (row['jobs_completed'] / row['jobs_assigned']) * 100 if row['jobs_assigned'] > 0 else 0
+        perf_data = []
+        for row in norm_conn.execute(perf_query):
+            completion_rate = (row['jobs_completed'] / row['jobs_assigned']) * 100 if row['jobs_assigned'] > 0 else 0
         
-        # Count skills used
-        skills_used = {}
-        if row['job_types']:
-            for job_type in row['job_types'].split(','):
-                skills_used[job_type] = skills_used.get(job_type, 0) + 1
+            # Count skills used
+            skills_used = {}
+            if row['job_types']:
+                for job_type in row['job_types'].split(','):
+                    skills_used[job_type] = skills_used.get(job_type, 0) + 1
         
-        # Simulate revenue
-        revenue = row['jobs_completed'] * 150
+            # Simulate revenue
+            revenue = row['jobs_completed'] * 150
         
-        perf_data.append((
-            row['technician_id'],
-            row['month'],
-            row['jobs_completed'],
-            row['jobs_assigned'],
-            completion_rate,
-            row['avg_job_duration'],
-            row['total_distance'],
-            4.5,  # Simulated rating
-            row['on_time_rate'] or 0,
-            json.dumps(skills_used),
-            revenue
-        ))
+            perf_data.append((
+                row['technician_id'],
+                row['month'],
+                row['jobs_completed'],
+                row['jobs_assigned'],
+                completion_rate,
+                row['avg_job_duration'],
+                row['total_distance'],
+                4.5,  # Simulated rating
+                row['on_time_rate'] or 0,
+                json.dumps(skills_used),
+                revenue
+            ))
     
-    for chunk in batch(perf_data, 500):
-        denorm_conn.executemany("""
+        for chunk in batch(perf_data, 500):
+            denorm_conn.executemany("""
             INSERT INTO technician_performance VALUES 
             (?,?,?,?,?,?,?,?,?,?,?)
         """, chunk)
     
-    # Create indexes
-    print("Creating indexes...")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_schedule_date ON daily_technician_schedule(schedule_date)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_service_metrics_date ON service_metrics(date)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_geographic_week ON geographic_demand(week_start)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_tech_performance_month ON technician_performance(month)")
+        # Create indexes
+        print("Creating indexes...")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_schedule_date ON daily_technician_schedule(schedule_date)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_service_metrics_date ON service_metrics(date)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_geographic_week ON geographic_demand(week_start)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_tech_performance_month ON technician_performance(month)")
     
-    denorm_conn.commit()
-    denorm_conn.close()
-    norm_conn.close()
-    print("Done!")
+        norm_conn.close()
+        print("Done!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
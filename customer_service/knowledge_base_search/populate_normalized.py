@@ -1,34 +1,41 @@
 #!/usr/bin/env python3
 """Populate knowledge base search normalized schema deterministically."""
 from __future__ import annotations
-import argparse, sqlite3
+import argparse
 from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.bulkload import bulk_load
+from common.utils import require_unscaled
+
+def populate(db: str, seed: int = 42, scale: float = 1.0) -> None:
+    require_unscaled(scale, "knowledge_base_search")
+    with bulk_load(db, schema=Path('schema_normalized.sql').read_text()) as conn:
+        conn.executemany('INSERT INTO kb_articles VALUES (?,?,?)', [
+            (1,'Reset Password','steps to reset'),
+            (2,'Update Profile','profile instructions'),
+            (3,'Delete Account','how to delete')
+        ])
+        conn.executemany('INSERT INTO tags VALUES (?,?)', [
+            (1,'account'), (2,'security')
+        ])
+        conn.executemany('INSERT INTO article_tags VALUES (?,?)', [
+            (1,1),(1,2),(2,1)
+        ])
+        conn.executemany('INSERT INTO article_views VALUES (?,?,?)', [
+            (1,1,'2024-01-01'),
+            (2,1,'2024-01-02'),
+            (3,2,'2024-01-03')
+        ])
+        conn.executemany('INSERT INTO feedback VALUES (?,?,?)', [
+            (1,1,1),
+            (2,1,0),
+            (3,2,1)
+        ])
+
 
 def main()->None:
-    p=argparse.ArgumentParser(); p.add_argument('--db',required=True); args=p.parse_args()
-    conn=sqlite3.connect(args.db)
-    conn.executescript(Path('schema_normalized.sql').read_text())
-    conn.executemany('INSERT INTO kb_articles VALUES (?,?,?)', [
-        (1,'Reset Password','steps to reset'),
-        (2,'Update Profile','profile instructions'),
-        (3,'Delete Account','how to delete')
-    ])
-    conn.executemany('INSERT INTO tags VALUES (?,?)', [
-        (1,'account'), (2,'security')
-    ])
-    conn.executemany('INSERT INTO article_tags VALUES (?,?)', [
-        (1,1),(1,2),(2,1)
-    ])
-    conn.executemany('INSERT INTO article_views VALUES (?,?,?)', [
-        (1,1,'2024-01-01'),
-        (2,1,'2024-01-02'),
-        (3,2,'2024-01-03')
-    ])
-    conn.executemany('INSERT INTO feedback VALUES (?,?,?)', [
-        (1,1,1),
-        (2,1,0),
-        (3,2,1)
-    ])
-    conn.commit(); conn.close()
+    p=argparse.ArgumentParser(); p.add_argument('--db',required=True); p.add_argument('--scale',type=float,default=1.0); p.add_argument('--seed',type=int,default=42); args=p.parse_args()
+    populate(args.db, args.seed, args.scale)
 if __name__=='__main__':
     main()
@@ -9,7 +9,8 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import batch, get_rng
+from common.utils import batch, table_rng
+from common.bulkload import bulk_load
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -17,14 +18,12 @@ def main() -> None:
     parser.add_argument("--denormalized-db", required=True)
     args = parser.parse_args()
     
-    rng = get_rng(42)  # Add missing RNG initialization
-    
     norm_conn = sqlite3.connect(args.normalized_db)
     norm_conn.row_factory = sqlite3.Row
-    denorm_conn = sqlite3.connect(args.denormalized_db)
+    with bulk_load(args.denormalized_db) as denorm_conn:
     
-    print("Building customer training summary...")
-    summary_query = """
+        print("Building customer training summary...")
+        summary_query = """
     WITH customer_stats AS (
         SELECT 
             c.id as customer_id,
@@ -71,34 +70,34 @@ def main() -> None:
     LEFT JOIN onboarding_check oc ON cs.customer_id = oc.customer_id
     """
     
-    summary_data = []
-    for row in norm_conn.execute(summary_query):
-        completion_rate = row['programs_completed'] / row['total_programs_enrolled'] if row['total_programs_enrolled'] > 0 else 0
+        summary_data = []
+        for row in norm_conn.execute(summary_query):
+            completion_rate = row['programs_completed'] / row['total_programs_enrolled'] if row['total_programs_enrolled'] > 0 else 0
         
-        summary_data.append((
-            row['customer_id'],
-            row['customer_name'],
-            row['company_size'],
-            row['onboarding_tier'],
-            row['total_programs_enrolled'] or 0,
-            row['programs_completed'] or 0,
-            row['programs_in_progress'] or 0,
-            completion_rate,
-            row['total_training_hours'] or 0,
-            row['last_activity_date'],
-            row['onboarding_status'],
-            row['days_to_first_completion'],
-            row['certification_count'] or 0
-        ))
+            summary_data.append((
+                row['customer_id'],
+                row['customer_name'],
+                row['company_size'],
+                row['onboarding_tier'],
+                row['total_programs_enrolled'] or 0,
+                row['programs_completed'] or 0,
+                row['programs_in_progress'] or 0,
+                completion_rate,
+                row['total_training_hours'] or 0,
+                row['last_activity_date'],
+                row['onboarding_status'],
+                row['days_to_first_completion'],
+                row['certification_count'] or 0
+            ))
     
-    for chunk in batch(summary_data, 500):
-        denorm_conn.executemany("""
+        for chunk in batch(summary_data, 500):
+            denorm_conn.executemany("""
             INSERT INTO customer_training_summary VALUES 
             (?,?,?,?,?,?,?,?,?,?,?,?,?)
         """, chunk)
     
-    print("Building program effectiveness metrics...")
-    effectiveness_query = """
+        print("Building program effectiveness metrics...")
+        effectiveness_query = """
     SELECT 
         tp.id as program_id,
         tp.name as program_name,
@@ -120,33 +119,34 @@ def main() -> None:
     GROUP BY tp.id, strftime('%Y-%m', e.enrolled_at)
     """
     
-    effectiveness_data = []
-    for row in norm_conn.execute(effectiveness_query):
-        completion_rate = row['completions'] / row['total_enrollments'] if row['total_enrollments'] > 0 else 0
-        dropout_rate = row['dropouts'] / row['total_enrollments'] if row['total_enrollments'] > 0 else 0
-        satisfaction = 4.2 + rng.uniform(-0.5, 0.5)  # Simulated satisfaction
+        effectiveness_data = []
+        rng = table_rng(42, "program_effectiveness")
+        for row in norm_conn.execute(effectiveness_query):
+            completion_rate = row['completions'] / row['total_enrollments'] if row['total_enrollments'] > 0 else 0
+            dropout_rate = row['dropouts'] / row['total_enrollments'] if row['total_enrollments'] > 0 else 0
+            satisfaction = 4.2 + rng.uniform(-0.5, 0.5)  # Simulated satisfaction
         
-        effectiveness_data.append((
-            row['program_id'],
-            row['program_name'],
-            row['program_type'],
-            row['month'],
-            row['total_enrollments'],
-            row['completions'],
-            completion_rate,
-            row['avg_time_to_complete_days'],
-            row['avg_score'],
-            dropout_rate,
-            satisfaction
-        ))
+            effectiveness_data.append((
+                row['program_id'],
+                row['program_name'],
+                row['program_type'],
+                row['month'],
+                row['total_enrollments'],
+                row['completions'],
+                completion_rate,
+                row['avg_time_to_complete_days'],
+                row['avg_score'],
+                dropout_rate,
+                satisfaction
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO program_effectiveness VALUES 
         (?,?,?,?,?,?,?,?,?,?,?)
     """, effectiveness_data)
     
-    print("Building cohort analysis...")
-    cohort_query = """
+        print("Building cohort analysis...")
+        cohort_query = """
     WITH cohort_base AS (
         SELECT 
             strftime('%Y-%m', MIN(e.enrolled_at)) as cohort_month,
@@ -187,37 +187,38 @@ def main() -> None:
     GROUP BY cohort_month, onboarding_tier
     """
     
-    cohort_data = []
-    for row in norm_conn.execute(cohort_query):
-        # Simulate time to value
-        time_to_value = {
-            'SELF_SERVICE': 14,
-            'STANDARD': 10,
-            'PREMIUM': 7,
-            'WHITE_GLOVE': 3
-        }[row['onboarding_tier']] + rng.randint(-2, 2)
+        cohort_data = []
+        rng = table_rng(42, "cohort_analysis")
+        for row in norm_conn.execute(cohort_query):
+            # Simulate time to value
+            time_to_value = {
+                'SELF_SERVICE': 14,
+                'STANDARD': 10,
+                'PREMIUM': 7,
+                'WHITE_GLOVE': 3
+            }[row['onboarding_tier']] + rng.randint(-2, 2)
         
-        cohort_data.append((
-            row['cohort_month'],
-            row['onboarding_tier'],
-            row['cohort_size'],
-            row['day_1_active'],
-            row['day_7_active'],
-            row['day_30_active'],
-            row['day_90_active'],
-            row['onboarding_completed'],
-            row['avg_programs_completed'],
-            time_to_value
-        ))
+            cohort_data.append((
+                row['cohort_month'],
+                row['onboarding_tier'],
+                row['cohort_size'],
+                row['day_1_active'],
+                row['day_7_active'],
+                row['day_30_active'],
+                row['day_90_active'],
+                row['onboarding_completed'],
+                row['avg_programs_completed'],
+                time_to_value
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO cohort_analysis VALUES 
         (?,?,?,?,?,?,?,?,?,?)
     """, cohort_data)
     
-    print("Building learning path analytics...")
-    # Simplified learning paths - in practice would use graph algorithms
-    path_query = """
+        print("Building learning path analytics...")
+        # Simplified learning paths - in practice would use graph algorithms
+        path_query = """
     SELECT 
         c.id as customer_id,
         GROUP_CONCAT(tp.name, ' -> ') as learning_path,
@@ -230,51 +231,47 @@ def main() -> None:
     GROUP BY c.id
     """
     
-    import random
-    rng = random.Random(42)
-    
-    path_data = []
-    for row in norm_conn.execute(path_query):
-        # Estimate completion date
-        if row['current_position'] < row['path_length']:
-            days_remaining = (row['path_length'] - row['current_position']) * 21
-            est_completion = datetime.now() + timedelta(days=days_remaining)
-            est_completion_str = est_completion.strftime('%Y-%m-%d')
-        else:
-            est_completion_str = None
+        path_data = []
+        rng = table_rng(42, "learning_path_analytics")
+        for row in norm_conn.execute(path_query):
+            # Estimate completion date
+            if row['current_position'] < row['path_length']:
+                days_remaining = (row['path_length'] - row['current_position']) * 21
+                est_completion = datetime.now() + timedelta(days=days_remaining)
+                est_completion_str = est_completion.strftime('%Y-%m-%d')
+            else:
+                est_completion_str = None
         
-        # Mock recommendations
-        recommendations = ['Advanced Analytics', 'API Mastery', 'Best Practices']
-        blockers = [] if row['current_position'] > 0 else ['Complete Getting Started']
+            # Mock recommendations
+            recommendations = ['Advanced Analytics', 'API Mastery', 'Best Practices']
+            blockers = [] if row['current_position'] > 0 else ['Complete Getting Started']
         
-        path_data.append((
-            row['customer_id'],
-            json.dumps(row['learning_path'].split(' -> ')),
-            row['path_length'],
-            row['current_position'],
-            est_completion_str,
-            json.dumps(blockers),
-            json.dumps(rng.sample(recommendations, 2))
-        ))
+            path_data.append((
+                row['customer_id'],
+                json.dumps(row['learning_path'].split(' -> ')),
+                row['path_length'],
+                row['current_position'],
+                est_completion_str,
+                json.dumps(blockers),
+                json.dumps(rng.sample(recommendations, 2))
+            ))
     
-    for chunk in batch(path_data, 500):
-        denorm_conn.executemany("""
+        for chunk in batch(path_data, 500):
+            denorm_conn.executemany("""
             INSERT INTO learning_path_analytics VALUES 
             (?,?,?,?,?,?,?)
         """, chunk)
     
-    # Create indexes
-    print("Creating indexes...")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_training_summary_tier ON customer_training_summary(onboarding_tier)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_training_summary_status ON customer_training_summary(onboarding_status)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_program_effectiveness_type ON program_effectiveness(program_type)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_cohort_month ON cohort_analysis(cohort_month)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_learning_path_position ON learning_path_analytics(current_position)")
+        # Create indexes
+        print("Creating indexes...")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_training_summary_tier ON customer_training_summary(onboarding_tier)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_training_summary_status ON customer_training_summary(onboarding_status)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_program_effectiveness_type ON program_effectiveness(program_type)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_cohort_month ON cohort_analysis(cohort_month)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_learning_path_position ON learning_path_analytics(current_position)")
     
-    denorm_conn.commit()
-    denorm_conn.close()
-    norm_conn.close()
-    print("Done!")
+        norm_conn.close()
+        print("Done!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,12 +3,63 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
 from pathlib import Path
 from datetime import datetime
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import batch
+from common.bulkload import bulk_load
+from common.denormalize import attach, materialize, refresh
+
+# Incrementally refreshable tables (see common/denormalize.py).
+VIEWS = [
+    {
+        "table": "return_analytics",
+        "key": ("rma_id",),
+        "select": """
+        SELECT 
+            r.id as rma_id,
+            c.email as customer_email,
+            c.loyalty_tier,
+            p.sku as product_sku,
+            p.name as product_name,
+            p.category as product_category,
+            o.order_date,
+            r.request_date as return_request_date,
+            julianday(r.request_date) - julianday(o.order_date) as days_since_purchase,
+            r.reason as return_reason,
+            r.status as current_status,
+            i.recommendation as inspection_result,
+            CASE 
+                WHEN i.recommendation = 'FULL_REFUND' THEN oi.unit_price * oi.quantity - oi.discount_amount
+                WHEN i.recommendation = 'PARTIAL_REFUND' THEN 
+                    (oi.unit_price * oi.quantity - oi.discount_amount) * (100 - i.deduction_percentage) / 100
+                ELSE 0
+            END as refund_amount,
+            oi.unit_price * oi.quantity - oi.discount_amount as original_amount,
+            CASE 
+                WHEN r.status = 'CLOSED' THEN
+                    julianday(DATE('now')) - julianday(r.request_date)
+                ELSE NULL
+            END as processing_days,
+            CASE 
+                WHEN julianday(r.request_date) - julianday(o.order_date) <= p.warranty_days 
+                THEN 1 ELSE 0 
+            END as is_warranty_return
+        FROM rma_requests r
+        JOIN order_items oi ON r.order_item_id = oi.id
+        JOIN orders o ON oi.order_id = o.id
+        JOIN customers c ON r.customer_id = c.id
+        JOIN products p ON oi.product_id = p.id
+        LEFT JOIN rma_inspections i ON r.id = i.rma_id
+        WHERE {partitions}
+        """,
+        "partitions": "r.id IN (SELECT rma_id FROM temp.refresh_keys)",
+        "sources": [
+            {"table": "rma_requests", "watermark": "id", "keys": "id AS rma_id"},
+            {"table": "rma_inspections", "watermark": "id", "keys": "rma_id"},
+        ],
+    },
+]
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -16,61 +67,13 @@ def main() -> None:
     parser.add_argument("--denormalized-db", required=True)
     args = parser.parse_args()
     
-    norm_conn = sqlite3.connect(args.normalized_db)
-    norm_conn.row_factory = sqlite3.Row
-    denorm_conn = sqlite3.connect(args.denormalized_db)
-    
-    print("Building return analytics...")
-    analytics_query = """
-    SELECT 
-        r.id as rma_id,
-        c.email as customer_email,
-        c.loyalty_tier,
-        p.sku as product_sku,
-        p.name as product_name,
-        p.category as product_category,
-        o.order_date,
-        r.request_date as return_request_date,
-        julianday(r.request_date) - julianday(o.order_date) as days_since_purchase,
-        r.reason as return_reason,
-        r.status as current_status,
-        i.recommendation as inspection_result,
-        CASE 
-            WHEN i.recommendation = 'FULL_REFUND' THEN oi.unit_price * oi.quantity - oi.discount_amount
-            WHEN i.recommendation = 'PARTIAL_REFUND' THEN 
-                (oi.unit_price * oi.quantity - oi.discount_amount) * (100 - i.deduction_percentage) / 100
-            ELSE 0
-        END as refund_amount,
-        oi.unit_price * oi.quantity - oi.discount_amount as original_amount,
-        CASE 
-            WHEN r.status = 'CLOSED' THEN
-                julianday(DATE('now')) - julianday(r.request_date)
-            ELSE NULL
-        END as processing_days,
-        CASE 
-            WHEN julianday(r.request_date) - julianday(o.order_date) <= p.warranty_days 
-            THEN 1 ELSE 0 
-        END as is_warranty_return
-    FROM rma_requests r
-    JOIN order_items oi ON r.order_item_id = oi.id
-    JOIN orders o ON oi.order_id = o.id
-    JOIN customers c ON r.customer_id = c.id
-    JOIN products p ON oi.product_id = p.id
-    LEFT JOIN rma_inspections i ON r.id = i.rma_id
-    """
-    
-    analytics_data = []
-    for row in norm_conn.execute(analytics_query):
-        analytics_data.append(tuple(row))
+    with bulk_load(args.denormalized_db) as denorm_conn, attach(denorm_conn, args.normalized_db):
     
-    for chunk in batch(analytics_data, 500):
-        denorm_conn.executemany("""
-            INSERT INTO return_analytics VALUES 
-            (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-        """, chunk)
+        print("Building return analytics...")
+        refresh(denorm_conn, VIEWS, full=True)
     
-    print("Building daily return metrics...")
-    daily_query = """
+        print("Building daily return metrics...")
+        daily_query = """
     WITH daily_stats AS (
         SELECT 
             DATE(r.request_date) as date,
@@ -114,26 +117,10 @@ def main() -> None:
     LEFT JOIN order_stats os ON DATE(ds.date, '-30 days') = os.date
     """
     
-    daily_data = []
-    for row in norm_conn.execute(daily_query):
-        daily_data.append((
-            row['date'],
-            row['total_requests'],
-            row['approved_count'],
-            row['rejected_count'],
-            row['pending_count'],
-            row['total_refund_amount'] or 0,
-            row['avg_processing_days'],
-            row['return_rate'] or 0
-        ))
+        materialize(denorm_conn, "daily_return_metrics", daily_query)
     
-    denorm_conn.executemany("""
-        INSERT INTO daily_return_metrics VALUES 
-        (?,?,?,?,?,?,?,?)
-    """, daily_data)
-    
-    print("Building product return analysis...")
-    product_query = """
+        print("Building product return analysis...")
+        product_query = """
     WITH monthly_sales AS (
         SELECT 
             p.sku as product_sku,
@@ -183,18 +170,10 @@ def main() -> None:
     LEFT JOIN monthly_returns mr ON ms.product_sku = mr.product_sku AND ms.month = mr.month
     """
     
-    product_data = []
-    for row in norm_conn.execute(product_query):
-        product_data.append(tuple(row))
-    
-    for chunk in batch(product_data, 500):
-        denorm_conn.executemany("""
-            INSERT INTO product_return_analysis VALUES 
-            (?,?,?,?,?,?,?,?,?)
-        """, chunk)
+        materialize(denorm_conn, "product_return_analysis", product_query)
     
-    print("Building customer return behavior...")
-    behavior_query = """
+        print("Building customer return behavior...")
+        behavior_query = """
     WITH customer_stats AS (
         SELECT 
             c.id as customer_id,
@@ -233,28 +212,17 @@ def main() -> None:
     WHERE total_orders > 0
     """
     
-    behavior_data = []
-    for row in norm_conn.execute(behavior_query):
-        behavior_data.append(tuple(row))
-    
-    for chunk in batch(behavior_data, 500):
-        denorm_conn.executemany("""
-            INSERT INTO customer_return_behavior VALUES 
-            (?,?,?,?,?,?,?,?,?,?)
-        """, chunk)
+        materialize(denorm_conn, "customer_return_behavior", behavior_query)
     
-    # Create indexes
-    print("Creating indexes...")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_return_analytics_date ON return_analytics(return_request_date)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_return_analytics_category ON return_analytics(product_category)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_return_analytics_reason ON return_analytics(return_reason)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_metrics_date ON daily_return_metrics(date)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_product_analysis_rate ON product_return_analysis(return_rate DESC)")
+        # Create indexes
+        print("Creating indexes...")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_return_analytics_date ON return_analytics(return_request_date)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_return_analytics_category ON return_analytics(product_category)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_return_analytics_reason ON return_analytics(return_reason)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_metrics_date ON daily_return_metrics(date)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_product_analysis_rate ON product_return_analysis(return_rate DESC)")
     
-    denorm_conn.commit()
-    denorm_conn.close()
-    norm_conn.close()
-    print("Done!")
+        print("Done!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,13 +3,16 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
 import random
+from functools import partial
 from pathlib import Path
 from datetime import datetime, timedelta
+from typing import Iterator
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import get_rng, batch
+from common.utils import batch, scaled, table_rng, DEFAULT_SCALE
+from common.bulkload import bulk_load
+from common.sharding import sharded_insert
 
 # Scale constants
 CUSTOMERS = 4000
@@ -17,6 +20,11 @@ PRODUCTS = 500
 ORDERS = 40000
 ITEMS_PER_ORDER = 3
 RETURN_RATE = 0.08
+# Orders and their items are generated in fixed-size chunks, each from its own
+# stream, so they can be sharded across worker processes.
+ORDER_CHUNK = 5000
+# Dates count back from here rather than from the build's wall clock.
+REFERENCE_DATE = datetime(2024, 7, 1)
 
 # Product catalog
 PRODUCT_TEMPLATES = {
@@ -65,7 +73,7 @@ PRODUCT_TEMPLATES = {
     ]
 }
 
-def get_return_reason(product_category, days_since_purchase):
+def get_return_reason(rng, product_category, days_since_purchase):
     """Determine return reason based on product and timing."""
     if days_since_purchase <= 1:
         reasons = ['WRONG_ITEM', 'DAMAGED', 'NOT_AS_DESCRIBED']
@@ -84,13 +92,13 @@ def get_return_reason(product_category, days_since_purchase):
         reasons = ['DEFECTIVE', 'OTHER']
         weights = [0.7, 0.3]
     
-    return random.choices(reasons, weights=weights)[0]
+    return rng.choices(reasons, weights=weights)[0]
 
-def get_inspection_result(return_reason, days_since_purchase, product_category):
+def get_inspection_result(rng, return_reason, days_since_purchase, product_category):
     """Determine inspection outcome based on return details."""
     if return_reason in ['DEFECTIVE', 'DAMAGED']:
-        condition = random.choice(['POOR', 'DAMAGED', 'FAIR'])
-        functionality = random.choice(['NOT_WORKING', 'PARTIALLY_WORKING'])
+        condition = rng.choice(['POOR', 'DAMAGED', 'FAIR'])
+        functionality = rng.choice(['NOT_WORKING', 'PARTIALLY_WORKING'])
         recommendation = 'FULL_REFUND' if functionality == 'NOT_WORKING' else 'EXCHANGE'
         deduction = 0
     elif return_reason == 'WRONG_ITEM':
@@ -100,125 +108,56 @@ def get_inspection_result(return_reason, days_since_purchase, product_category):
         deduction = 0
     elif return_reason == 'CHANGED_MIND':
         if days_since_purchase <= 14:
-            condition = random.choice(['NEW', 'LIKE_NEW'])
+            condition = rng.choice(['NEW', 'LIKE_NEW'])
             functionality = 'WORKING'
             recommendation = 'FULL_REFUND'
             deduction = 0 if condition == 'NEW' else 10
         else:
-            condition = random.choice(['GOOD', 'FAIR'])
+            condition = rng.choice(['GOOD', 'FAIR'])
             functionality = 'WORKING'
             recommendation = 'PARTIAL_REFUND'
-            deduction = random.choice([15, 20, 25])
+            deduction = rng.choice([15, 20, 25])
     else:
-        condition = random.choice(['GOOD', 'FAIR', 'POOR'])
-        functionality = random.choice(['WORKING', 'PARTIALLY_WORKING'])
-        recommendation = random.choice(['PARTIAL_REFUND', 'EXCHANGE', 'REJECT'])
-        deduction = random.choice([0, 10, 20, 30])
+        condition = rng.choice(['GOOD', 'FAIR', 'POOR'])
+        functionality = rng.choice(['WORKING', 'PARTIALLY_WORKING'])
+        recommendation = rng.choice(['PARTIAL_REFUND', 'EXCHANGE', 'REJECT'])
+        deduction = rng.choice([0, 10, 20, 30])
     
     return condition, functionality, recommendation, deduction
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--db", required=True)
-    parser.add_argument("--seed", type=int, default=42)
-    args = parser.parse_args()
+def order_rows(rng: random.Random, start: int, stop: int, n_customers: int, products_data: list) -> Iterator[tuple[str, tuple]]:
+    """Yield ``(table, row)`` orders ``start..stop-1`` and their order items.
 
-    rng = get_rng(args.seed)
-    random.seed(args.seed)
-    
-    conn = sqlite3.connect(args.db)
-    conn.execute("PRAGMA foreign_keys=ON")
-    
-    # Insert customers
-    print(f"Inserting {CUSTOMERS} customers...")
-    customers_data = []
-    tiers = ['BASIC', 'SILVER', 'GOLD', 'PLATINUM']
-    tier_weights = [0.50, 0.30, 0.15, 0.05]
-    
-    for i in range(1, CUSTOMERS + 1):
-        tier = rng.choices(tiers, weights=tier_weights)[0]
-        # Lifetime value correlates with tier
-        ltv_ranges = {
-            'BASIC': (100, 1000),
-            'SILVER': (1000, 5000),
-            'GOLD': (5000, 20000),
-            'PLATINUM': (20000, 100000)
-        }
-        lifetime_value = rng.randint(*ltv_ranges[tier])
-        
-        customers_data.append((
-            i,
-            f'customer{i}@example.com',
-            f'Customer {i}',
-            tier,
-            lifetime_value
-        ))
-    
-    for chunk in batch(customers_data, 1000):
-        conn.executemany("INSERT INTO customers VALUES (?,?,?,?,?)", chunk)
-    
-    # Insert products
-    print(f"Inserting products...")
-    products_data = []
-    product_id = 1
-    
-    for category, items in PRODUCT_TEMPLATES.items():
-        for base_name, base_price, warranty in items:
-            # Create variants
-            variants = ['Standard', 'Pro', 'Plus', 'Premium'] if category == 'ELECTRONICS' else ['S', 'M', 'L', 'XL']
-            for variant in variants[:rng.randint(1, len(variants))]:
-                name = f'{base_name} {variant}'
-                sku = f'{category[:3]}-{product_id:04d}'
-                price = base_price * (1 + rng.uniform(-0.2, 0.3))
-                returnable = 0 if rng.random() < 0.05 else 1  # 5% non-returnable
-                
-                products_data.append((
-                    product_id,
-                    sku,
-                    name,
-                    category,
-                    round(price, 2),
-                    warranty,
-                    returnable
-                ))
-                product_id += 1
-    
-    conn.executemany("INSERT INTO products VALUES (?,?,?,?,?,?,?)", products_data)
-    
-    # Insert orders and order items
-    print(f"Inserting {ORDERS} orders...")
-    orders_data = []
-    order_items_data = []
-    
-    order_id = 1
-    item_id = 1
+    Item ids are derived from the order id so each chunk is self-contained.
+    """
     base_date = datetime(2023, 1, 1)
-    
-    for _ in range(ORDERS):
-        customer_id = rng.randint(1, CUSTOMERS)
+    for order_id in range(start, stop):
+        customer_id = rng.randint(1, n_customers)
         order_date = base_date + timedelta(days=rng.randint(0, 365))
-        
+    
         # Order status based on age
-        days_old = (datetime.now() - order_date).days
+        days_old = (REFERENCE_DATE - order_date).days
         if days_old < 3:
             status = rng.choice(['PENDING', 'SHIPPED'])
         elif days_old < 7:
             status = rng.choice(['SHIPPED', 'DELIVERED'])
         else:
             status = 'DELIVERED'
-        
+    
         # Generate order items
         num_items = rng.randint(1, ITEMS_PER_ORDER)
         selected_products = rng.sample(products_data, num_items)
-        
+    
+        items = []
         total_amount = 0
+        item_id = (order_id - 1) * ITEMS_PER_ORDER + 1
         for product in selected_products:
             quantity = rng.randint(1, 3)
             unit_price = product[4]
             discount = rng.choice([0, 0, 0, 5, 10, 15])  # Most items no discount
             discount_amount = unit_price * quantity * discount / 100
-            
-            order_items_data.append((
+        
+            items.append((
                 item_id,
                 order_id,
                 product[0],  # product_id
@@ -226,148 +165,220 @@ def main() -> None:
                 unit_price,
                 discount_amount
             ))
-            
+        
             total_amount += (unit_price * quantity - discount_amount)
             item_id += 1
-        
-        orders_data.append((
+    
+        yield 'orders', (
             order_id,
             customer_id,
             order_date.strftime('%Y-%m-%d'),
             round(total_amount, 2),
             f'{rng.randint(100, 9999)} Main St, City {rng.randint(10000, 99999)}',
             status
-        ))
-        order_id += 1
+        )
+        for item in items:
+            yield 'order_items', item
+
+def populate(db: str, seed: int = 42, scale: float = DEFAULT_SCALE, jobs: int = 1) -> None:
+    n_customers = scaled(CUSTOMERS, scale)
+    n_orders = scaled(ORDERS, scale)
+
+    with bulk_load(db) as conn:
+        # Insert customers
+        print(f"Inserting {n_customers} customers...")
+        rng = table_rng(seed, "customers")
+        customers_data = []
+        tiers = ['BASIC', 'SILVER', 'GOLD', 'PLATINUM']
+        tier_weights = [0.50, 0.30, 0.15, 0.05]
     
-    for chunk in batch(orders_data, 1000):
-        conn.executemany("INSERT INTO orders VALUES (?,?,?,?,?,?)", chunk)
+        for i in range(1, n_customers + 1):
+            tier = rng.choices(tiers, weights=tier_weights)[0]
+            # Lifetime value correlates with tier
+            ltv_ranges = {
+                'BASIC': (100, 1000),
+                'SILVER': (1000, 5000),
+                'GOLD': (5000, 20000),
+                'PLATINUM': (20000, 100000)
+            }
+            lifetime_value = rng.randint(*ltv_ranges[tier])
+        
+            customers_data.append((
+                i,
+                f'customer{i}@example.com',
+                f'Customer {i}',
+                tier,
+                lifetime_value
+            ))
     
-    for chunk in batch(order_items_data, 1000):
-        conn.executemany("INSERT INTO order_items VALUES (?,?,?,?,?,?)", chunk)
+        for chunk in batch(customers_data, 1000):
+            conn.executemany("INSERT INTO customers VALUES (?,?,?,?,?)", chunk)
     
-    # Insert RMA requests and inspections
-    print("Inserting RMA requests...")
-    rma_data = []
-    inspection_data = []
+        # Insert products
+        print(f"Inserting products...")
+        rng = table_rng(seed, "products")
+        products_data = []
+        product_id = 1
     
-    rma_id = 1
-    inspection_id = 1
+        for category, items in PRODUCT_TEMPLATES.items():
+            for base_name, base_price, warranty in items:
+                # Create variants
+                variants = ['Standard', 'Pro', 'Plus', 'Premium'] if category == 'ELECTRONICS' else ['S', 'M', 'L', 'XL']
+                for variant in variants[:rng.randint(1, len(variants))]:
+                    name = f'{base_name} {variant}'
+                    sku = f'{category[:3]}-{product_id:04d}'
+                    price = base_price * (1 + rng.uniform(-0.2, 0.3))
+                    returnable = 0 if rng.random() < 0.05 else 1  # 5% non-returnable
+                
+                    products_data.append((
+                        product_id,
+                        sku,
+                        name,
+                        category,
+                        round(price, 2),
+                        warranty,
+                        returnable
+                    ))
+                    product_id += 1
     
-    # Select items to return based on return rate
-    returnable_items = [
-        item for item in order_items_data
-        if rng.random() < RETURN_RATE
-    ]
+        conn.executemany("INSERT INTO products VALUES (?,?,?,?,?,?,?)", products_data)
     
-    for item in returnable_items:
-        item_id = item[0]
-        order_id = item[1]
-        product_id = item[2]
+        # Insert orders and order items
+        print(f"Inserting {n_orders} orders...")
+        make_orders = partial(order_rows, n_customers=n_customers, products_data=products_data)
+        sharded_insert(conn, ["orders", "order_items"], make_orders, seed, n_orders, ORDER_CHUNK, jobs)
+        orders_data = conn.execute("SELECT * FROM orders ORDER BY id").fetchall()
+        order_items_data = conn.execute("SELECT * FROM order_items ORDER BY id").fetchall()
+    
+        # Insert RMA requests and inspections
+        print("Inserting RMA requests...")
+        rng = table_rng(seed, "rma_requests")
+        rma_data = []
+        inspection_data = []
+    
+        rma_id = 1
+        inspection_id = 1
+    
+        # Select items to return based on return rate
+        returnable_items = [
+            item for item in order_items_data
+            if rng.random() < RETURN_RATE
+        ]
+    
+        for item in returnable_items:
+            item_id = item[0]
+            order_id = item[1]
+            product_id = item[2]
         
-        # Get order and product details
-        order = orders_data[order_id-1]
-        product = products_data[product_id-1]
+            # Get order and product details
+            order = orders_data[order_id-1]
+            product = products_data[product_id-1]
         
-        # Skip if order not delivered or product not returnable
-        if order[5] != 'DELIVERED' or not product[6]:
-            continue
+            # Skip if order not delivered or product not returnable
+            if order[5] != 'DELIVERED' or not product[6]:
+                continue
         
-        customer_id = order[1]
-        order_date = datetime.strptime(order[2], '%Y-%m-%d')
+            customer_id = order[1]
+            order_date = datetime.strptime(order[2], '%Y-%m-%d')
         
-        # Return timing
-        days_to_return = rng.randint(1, min(90, product[5]))  # Within warranty
-        request_date = order_date + timedelta(days=days_to_return)
+            # Return timing
+            days_to_return = rng.randint(1, min(90, product[5]))  # Within warranty
+            request_date = order_date + timedelta(days=days_to_return)
         
-        # Skip future dates
-        if request_date > datetime.now():
-            continue
+            # Skip future dates
+            if request_date > REFERENCE_DATE:
+                continue
         
-        return_reason = get_return_reason(product[3], days_to_return)
+            return_reason = get_return_reason(rng, product[3], days_to_return)
         
-        # RMA workflow status
-        if (datetime.now() - request_date).days < 2:
-            status = 'PENDING'
-        elif (datetime.now() - request_date).days < 4:
-            status = rng.choice(['APPROVED', 'REJECTED'])
-        elif (datetime.now() - request_date).days < 7:
-            status = rng.choice(['SHIPPED', 'RECEIVED'])
-        else:
-            status = rng.choice(['INSPECTED', 'PROCESSED', 'CLOSED'])
+            # RMA workflow status
+            if (REFERENCE_DATE - request_date).days < 2:
+                status = 'PENDING'
+            elif (REFERENCE_DATE - request_date).days < 4:
+                status = rng.choice(['APPROVED', 'REJECTED'])
+            elif (REFERENCE_DATE - request_date).days < 7:
+                status = rng.choice(['SHIPPED', 'RECEIVED'])
+            else:
+                status = rng.choice(['INSPECTED', 'PROCESSED', 'CLOSED'])
         
-        # Return method based on tier
-        customer_tier = customers_data[customer_id-1][3]
-        if customer_tier in ['GOLD', 'PLATINUM']:
-            return_method = rng.choice(['PREPAID_LABEL', 'PICKUP'])
-        else:
-            return_method = rng.choice(['PREPAID_LABEL', 'CUSTOMER_SHIP', 'DROP_OFF'])
+            # Return method based on tier
+            customer_tier = customers_data[customer_id-1][3]
+            if customer_tier in ['GOLD', 'PLATINUM']:
+                return_method = rng.choice(['PREPAID_LABEL', 'PICKUP'])
+            else:
+                return_method = rng.choice(['PREPAID_LABEL', 'CUSTOMER_SHIP', 'DROP_OFF'])
         
-        tracking = f'RMA{rma_id:06d}' if status not in ['PENDING', 'REJECTED'] else None
+            tracking = f'RMA{rma_id:06d}' if status not in ['PENDING', 'REJECTED'] else None
         
-        rma_data.append((
-            rma_id,
-            item_id,
-            customer_id,
-            request_date.strftime('%Y-%m-%d'),
-            return_reason,
-            status,
-            return_method if status != 'REJECTED' else None,
-            tracking,
-            f'Return reason: {return_reason}'
-        ))
-        
-        # Create inspection if item was received
-        if status in ['INSPECTED', 'PROCESSED', 'CLOSED']:
-            inspection_date = request_date + timedelta(days=rng.randint(5, 10))
-            condition, functionality, recommendation, deduction = get_inspection_result(
-                return_reason, days_to_return, product[3]
-            )
-            
-            inspection_data.append((
-                inspection_id,
+            rma_data.append((
                 rma_id,
-                inspection_date.strftime('%Y-%m-%d'),
-                f'Inspector_{rng.randint(1, 20)}',
-                condition,
-                functionality,
-                recommendation,
-                deduction
+                item_id,
+                customer_id,
+                request_date.strftime('%Y-%m-%d'),
+                return_reason,
+                status,
+                return_method if status != 'REJECTED' else None,
+                tracking,
+                f'Return reason: {return_reason}'
             ))
-            inspection_id += 1
         
-        rma_id += 1
+            # Create inspection if item was received
+            if status in ['INSPECTED', 'PROCESSED', 'CLOSED']:
+                inspection_date = request_date + timedelta(days=rng.randint(5, 10))
+                condition, functionality, recommendation, deduction = get_inspection_result(
+                    rng, return_reason, days_to_return, product[3]
+                )
+            
+                inspection_data.append((
+                    inspection_id,
+                    rma_id,
+                    inspection_date.strftime('%Y-%m-%d'),
+                    f'Inspector_{rng.randint(1, 20)}',
+                    condition,
+                    functionality,
+                    recommendation,
+                    deduction
+                ))
+                inspection_id += 1
+        
+            rma_id += 1
     
-    for chunk in batch(rma_data, 1000):
-        conn.executemany("INSERT INTO rma_requests VALUES (?,?,?,?,?,?,?,?,?)", chunk)
+        for chunk in batch(rma_data, 1000):
+            conn.executemany("INSERT INTO rma_requests VALUES (?,?,?,?,?,?,?,?,?)", chunk)
     
-    for chunk in batch(inspection_data, 500):
-        conn.executemany("INSERT INTO rma_inspections VALUES (?,?,?,?,?,?,?,?)", chunk)
+        for chunk in batch(inspection_data, 500):
+            conn.executemany("INSERT INTO rma_inspections VALUES (?,?,?,?,?,?,?,?)", chunk)
     
-    # Create evidence table
-    conn.execute("""
+        # Create evidence table
+        conn.execute("""
         CREATE TABLE IF NOT EXISTS evidence_kv (
             key TEXT PRIMARY KEY,
             value TEXT NOT NULL
         )
     """)
     
-    conn.commit()
-    
-    # Create indexes after bulk loading
-    print("Creating indexes...")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_customers_tier ON customers(loyalty_tier)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_products_category ON products(category)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders(customer_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_date ON orders(order_date)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_rma_customer ON rma_requests(customer_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_rma_status ON rma_requests(status)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_rma_date ON rma_requests(request_date)")
+        # Create indexes after bulk loading
+        print("Creating indexes...")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_customers_tier ON customers(loyalty_tier)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_products_category ON products(category)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders(customer_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_date ON orders(order_date)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_rma_customer ON rma_requests(customer_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_rma_status ON rma_requests(status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_rma_date ON rma_requests(request_date)")
     
-    conn.commit()
-    conn.close()
-    print("Done!")
+        print("Done!")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE)
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for sharded fact tables")
+    args = parser.parse_args()
+    populate(args.db, args.seed, args.scale, args.jobs)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,8 +3,11 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
 from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.bulkload import bulk_load
+from common.denormalize import attach, materialize
 
 
 def main() -> None:
@@ -13,20 +16,13 @@ def main() -> None:
     parser.add_argument("--source", default="ticketing_sla_normalized.db")
     args = parser.parse_args()
 
-    src = sqlite3.connect(args.source)
-    dst = sqlite3.connect(args.db)
-    dst.executescript(Path("schema_denormalized.sql").read_text())
-    rows = src.execute(
-        """
-        SELECT substr(opened_at,1,10) day, status, COUNT(*)
-        FROM tickets
-        GROUP BY day, status
-        """
-    ).fetchall()
-    dst.executemany("INSERT INTO ticket_daily_counts VALUES (?,?,?)", rows)
-    dst.commit()
-    src.close()
-    dst.close()
+    with bulk_load(args.db, schema=Path("schema_denormalized.sql").read_text()) as dst:
+        with attach(dst, args.source):
+            materialize(dst, "ticket_daily_counts", """
+            SELECT substr(opened_at,1,10) day, status, COUNT(*)
+            FROM tickets
+            GROUP BY day, status
+            """)
 
 
 if __name__ == "__main__":
@@ -9,6 +9,7 @@ from datetime import datetime
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 from common.utils import batch
+from common.bulkload import bulk_load
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -18,10 +19,10 @@ def main() -> None:
     
     norm_conn = sqlite3.connect(args.normalized_db)
     norm_conn.row_factory = sqlite3.Row
-    denorm_conn = sqlite3.connect(args.denormalized_db)
+    with bulk_load(args.denormalized_db) as denorm_conn:
     
-    print("Building agent performance summary...")
-    summary_query = """
+        print("Building agent performance summary...")
+        summary_query = """
     SELECT 
         a.id as agent_id,
         a.employee_id,
@@ -43,34 +44,34 @@ def main() -> None:
     GROUP BY a.id
     """
     
-    summary_data = []
-    for row in norm_conn.execute(summary_query):
-        attendance_rate = row['shifts_completed'] / row['total_shifts_scheduled'] if row['total_shifts_scheduled'] > 0 else 0
-        time_off_days = row['time_off_requests'] * 3  # Simplified calculation
+        summary_data = []
+        for row in norm_conn.execute(summary_query):
+            attendance_rate = row['shifts_completed'] / row['total_shifts_scheduled'] if row['total_shifts_scheduled'] > 0 else 0
+            time_off_days = row['time_off_requests'] * 3  # Simplified calculation
         
-        summary_data.append((
-            row['agent_id'],
-            row['employee_id'],
-            row['name'],
-            row['department'],
-            row['skill_level'],
-            row['total_shifts_scheduled'] or 0,
-            row['shifts_completed'] or 0,
-            attendance_rate,
-            row['avg_overtime_minutes'] or 0,
-            time_off_days,
-            row['skill_count'] or 0,
-            row['avg_skill_proficiency'] or 0,
-            row['last_shift_date']
-        ))
+            summary_data.append((
+                row['agent_id'],
+                row['employee_id'],
+                row['name'],
+                row['department'],
+                row['skill_level'],
+                row['total_shifts_scheduled'] or 0,
+                row['shifts_completed'] or 0,
+                attendance_rate,
+                row['avg_overtime_minutes'] or 0,
+                time_off_days,
+                row['skill_count'] or 0,
+                row['avg_skill_proficiency'] or 0,
+                row['last_shift_date']
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO agent_performance_summary VALUES 
         (?,?,?,?,?,?,?,?,?,?,?,?,?)
     """, summary_data)
     
-    print("Building daily staffing metrics...")
-    staffing_query = """
+        print("Building daily staffing metrics...")
+        staffing_query = """
     SELECT 
         sh.shift_date as date,
         a.department,
@@ -89,32 +90,32 @@ def main() -> None:
     GROUP BY sh.shift_date, a.department
     """
     
-    staffing_data = []
-    for row in norm_conn.execute(staffing_query):
-        variance = (row['actual_agents'] or 0) - (row['required_agents'] or 0)
-        understaffed = max(0, -variance) * 8  # Hours understaffed
-        utilization = (row['actual_agents'] or 0) / (row['required_agents'] or 1) * 100
+        staffing_data = []
+        for row in norm_conn.execute(staffing_query):
+            variance = (row['actual_agents'] or 0) - (row['required_agents'] or 0)
+            understaffed = max(0, -variance) * 8  # Hours understaffed
+            utilization = (row['actual_agents'] or 0) / (row['required_agents'] or 1) * 100
         
-        staffing_data.append((
-            row['date'],
-            row['department'] or 'UNKNOWN',
-            row['scheduled_agents'] or 0,
-            row['actual_agents'] or 0,
-            int(row['required_agents'] or 0),
-            variance,
-            row['total_hours'] or 0,
-            row['overtime_hours'] or 0,
-            understaffed,
-            utilization
-        ))
+            staffing_data.append((
+                row['date'],
+                row['department'] or 'UNKNOWN',
+                row['scheduled_agents'] or 0,
+                row['actual_agents'] or 0,
+                int(row['required_agents'] or 0),
+                variance,
+                row['total_hours'] or 0,
+                row['overtime_hours'] or 0,
+                understaffed,
+                utilization
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO daily_staffing_metrics VALUES 
         (?,?,?,?,?,?,?,?,?,?)
     """, staffing_data)
     
-    print("Building shift coverage analysis...")
-    coverage_query = """
+        print("Building shift coverage analysis...")
+        coverage_query = """
     SELECT 
         sh.shift_date,
         sh.shift_type,
@@ -128,29 +129,29 @@ def main() -> None:
     GROUP BY sh.shift_date, sh.shift_type
     """
     
-    coverage_data = []
-    for row in norm_conn.execute(coverage_query):
-        coverage_pct = (row['scheduled_agents'] or 0) / (row['required_agents'] or 1) * 100
-        skill_score = 80 + (row['avg_experience_days'] or 0) / 100  # Simplified
+        coverage_data = []
+        for row in norm_conn.execute(coverage_query):
+            coverage_pct = (row['scheduled_agents'] or 0) / (row['required_agents'] or 1) * 100
+            skill_score = 80 + (row['avg_experience_days'] or 0) / 100  # Simplified
         
-        coverage_data.append((
-            row['shift_date'],
-            row['shift_type'],
-            row['required_agents'],
-            row['scheduled_agents'] or 0,
-            row['confirmed_agents'] or 0,
-            coverage_pct,
-            min(100, skill_score),
-            int(row['avg_experience_days'] or 0)
-        ))
+            coverage_data.append((
+                row['shift_date'],
+                row['shift_type'],
+                row['required_agents'],
+                row['scheduled_agents'] or 0,
+                row['confirmed_agents'] or 0,
+                coverage_pct,
+                min(100, skill_score),
+                int(row['avg_experience_days'] or 0)
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO shift_coverage_analysis VALUES 
         (?,?,?,?,?,?,?,?)
     """, coverage_data)
     
-    print("Building skill demand forecast...")
-    forecast_query = """
+        print("Building skill demand forecast...")
+        forecast_query = """
     SELECT 
         s.name as skill_name,
         strftime('%Y-%W', 'now') as week_start,
@@ -164,39 +165,37 @@ def main() -> None:
     GROUP BY s.name
     """
     
-    forecast_data = []
-    for row in norm_conn.execute(forecast_query):
-        # Simplified demand projection
-        projected_demand = (row['current_certified'] or 0) + 5
-        gap = projected_demand - (row['current_certified'] or 0) + (row['expiring_soon'] or 0)
-        priority = min(100, gap * 10)
+        forecast_data = []
+        for row in norm_conn.execute(forecast_query):
+            # Simplified demand projection
+            projected_demand = (row['current_certified'] or 0) + 5
+            gap = projected_demand - (row['current_certified'] or 0) + (row['expiring_soon'] or 0)
+            priority = min(100, gap * 10)
         
-        forecast_data.append((
-            row['skill_name'],
-            row['week_start'],
-            row['current_certified'] or 0,
-            row['expiring_soon'] or 0,
-            projected_demand,
-            gap,
-            priority
-        ))
+            forecast_data.append((
+                row['skill_name'],
+                row['week_start'],
+                row['current_certified'] or 0,
+                row['expiring_soon'] or 0,
+                projected_demand,
+                gap,
+                priority
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO skill_demand_forecast VALUES 
         (?,?,?,?,?,?,?)
     """, forecast_data)
     
-    # Create indexes
-    print("Creating indexes...")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_performance_department ON agent_performance_summary(department)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_staffing_date ON daily_staffing_metrics(date)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_coverage_date ON shift_coverage_analysis(shift_date)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_skill_forecast_week ON skill_demand_forecast(week_start)")
+        # Create indexes
+        print("Creating indexes...")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_performance_department ON agent_performance_summary(department)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_staffing_date ON daily_staffing_metrics(date)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_coverage_date ON shift_coverage_analysis(shift_date)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_skill_forecast_week ON skill_demand_forecast(week_start)")
     
-    denorm_conn.commit()
-    denorm_conn.close()
-    norm_conn.close()
-    print("Done!")
+        norm_conn.close()
+        print("Done!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,52 +3,49 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
-import random
 from pathlib import Path
 from datetime import datetime, timedelta
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import get_rng, batch
+from common.utils import batch, scaled, require_unscaled, DEFAULT_SCALE
+from common.bulkload import bulk_load
 
 # Scale constants
 PRIMARY_ENTITIES = 1000
 SECONDARY_ENTITIES = 5000
 FACT_RECORDS = 50000
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--db", required=True)
-    parser.add_argument("--seed", type=int, default=42)
-    args = parser.parse_args()
+def populate(db: str, seed: int = 42, scale: float = DEFAULT_SCALE) -> None:
+    require_unscaled(scale, "inventory_bom_work_orders")
+    n_primary_entities = scaled(PRIMARY_ENTITIES, scale)
 
-    rng = get_rng(args.seed)
-    random.seed(args.seed)
-    
-    conn = sqlite3.connect(args.db)
-    conn.execute("PRAGMA foreign_keys=ON")
-    
-    print("Inserting primary entities...")
-    # Create synthetic data appropriate for inventory_bom_work_orders
-    primary_data = []
-    for i in range(1, PRIMARY_ENTITIES + 1):
-        primary_data.append((i, f'ENTITY{i:05d}', f'Entity {i}', 'ACTIVE'))
-    
-    # Insert into first table (adapt table name and columns as needed)
-    # conn.executemany("INSERT INTO main_table VALUES (?,?,?,?)", primary_data)
+    with bulk_load(db) as conn:
+        print("Inserting primary entities...")
+        # Create synthetic data appropriate for inventory_bom_work_orders
+        primary_data = []
+        for i in range(1, n_primary_entities + 1):
+            primary_data.append((i, f'ENTITY{i:05d}', f'Entity {i}', 'ACTIVE'))
     
-    # Create evidence table
-    conn.execute("CREATE TABLE IF NOT EXISTS evidence_kv (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        # Insert into first table (adapt table name and columns as needed)
+        # conn.executemany("INSERT INTO main_table VALUES (?,?,?,?)", primary_data)
     
-    conn.commit()
+        # Create evidence table
+        conn.execute("CREATE TABLE IF NOT EXISTS evidence_kv (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
     
-    # Create indexes
-    print("Creating indexes...")
-    # Add appropriate indexes
+        # Create indexes
+        print("Creating indexes...")
+        # Add appropriate indexes
     
-    conn.commit()
-    conn.close()
-    print("Done!")
+        print("Done!")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE)
+    args = parser.parse_args()
+    populate(args.db, args.seed, args.scale)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,21 +1,23 @@
 #!/usr/bin/env python3
 """Populate production line OEE normalized schema."""
 from __future__ import annotations
-import argparse, sqlite3
+import argparse
 from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.bulkload import bulk_load
+from common.utils import require_unscaled
 SCALE_LINES=20
 SCALE_RUNS=10000
 
+def populate(db: str, seed: int = 42, scale: float = 1.0) -> None:
+    require_unscaled(scale, "production_line_oee")
+    with bulk_load(db, schema=Path('schema_normalized.sql').read_text()):
+        pass  # TODO populate
+
+
 def main()->None:
-    p=argparse.ArgumentParser(); p.add_argument('--db',required=True); args=p.parse_args()
-    conn=sqlite3.connect(args.db)
-    conn.executescript(Path('schema_normalized.sql').read_text())
-    # TODO populate
-    conn.executescript('''
-    CREATE INDEX idx_run_line_date ON line_runs(line_id, run_date);
-    CREATE INDEX idx_down_run ON downtime_events(line_run_id);
-    CREATE INDEX idx_ncr_run ON ncrs(line_run_id);
-    ''')
-    conn.commit(); conn.close()
+    p=argparse.ArgumentParser(); p.add_argument('--db',required=True); p.add_argument('--scale',type=float,default=1.0); p.add_argument('--seed',type=int,default=42); args=p.parse_args()
+    populate(args.db, args.seed, args.scale)
 if __name__=='__main__':
     main()
@@ -3,8 +3,32 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
 from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.bulkload import bulk_load
+from common.denormalize import attach, refresh
+
+# Incrementally refreshable tables (see common/denormalize.py).
+VIEWS = [
+    {
+        "table": "sensor_daily_avg",
+        "key": ("day", "sensor_id"),
+        "select": """
+        SELECT substr(reading_time,1,10) AS day, sensor_id, AVG(value)
+        FROM readings
+        WHERE {partitions}
+        GROUP BY day, sensor_id
+        """,
+        # Range-probe idx_readings_sensor_time per touched (sensor, day).
+        "partitions": """id IN (
+            SELECT r.id FROM temp.refresh_keys k
+            JOIN readings r ON r.sensor_id = k.sensor_id
+             AND r.reading_time >= k.day AND r.reading_time < date(k.day, '+1 day')
+        )""",
+        "sources": [{"table": "readings", "watermark": "id", "keys": "substr(reading_time,1,10) AS day, sensor_id"}],
+    },
+]
 
 
 def main() -> None:
@@ -13,19 +37,10 @@ def main() -> None:
     p.add_argument("--source", default="siemens_scada_historian_normalized.db")
     args = p.parse_args()
 
-    src = sqlite3.connect(args.source)
-    dst = sqlite3.connect(args.db)
     ddl_path = Path(__file__).with_name("schema_denormalized.sql")
-    dst.executescript(ddl_path.read_text())
-    rows = src.execute("""
-        SELECT substr(reading_time,1,10) AS day, sensor_id, AVG(value)
-        FROM readings
-        GROUP BY day, sensor_id
-        """).fetchall()
-    dst.executemany("INSERT INTO sensor_daily_avg VALUES (?,?,?)", rows)
-    dst.commit()
-    src.close()
-    dst.close()
+    with bulk_load(args.db, schema=ddl_path.read_text()) as dst:
+        with attach(dst, args.source):
+            refresh(dst, VIEWS, full=True)
 
 
 if __name__ == "__main__":
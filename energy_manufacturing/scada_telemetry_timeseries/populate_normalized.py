@@ -3,56 +3,58 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
 from pathlib import Path
 import sys
+
+import numpy as np
+
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import get_rng
+from common.utils import get_np_rng, choice_column, uniform_column, scaled, DEFAULT_SCALE
+from common.bulkload import bulk_load
 
 SITES = 2
 SENSORS_PER_SITE = 3
 READINGS_PER_SENSOR = 10
+UNIT_RANGES = {'C': (20, 80), 'psi': (100, 450), 'kW': (10, 90)}
+
+
+def populate(db: str, seed: int = 0, scale: float = DEFAULT_SCALE) -> None:
+    n_sites = scaled(SITES, scale)
+
+    nrng = get_np_rng(seed)
+    with bulk_load(db) as conn:
+        sites = [(i, f'Plant {i}') for i in range(1, n_sites + 1)]
+        conn.executemany("INSERT INTO sites VALUES (?,?)", sites)
+
+        sensors = []
+        sid = 1
+        for site_id in range(1, n_sites + 1):
+            sensors.append((sid, site_id, f'Temp{site_id}', 'C', 'ACTIVE')); sid += 1
+            sensors.append((sid, site_id, f'Pressure{site_id}', 'psi', 'ACTIVE')); sid += 1
+            sensors.append((sid, site_id, f'Power{site_id}', 'kW', 'INACTIVE')); sid += 1
+        conn.executemany("INSERT INTO sensors VALUES (?,?,?,?,?)", sensors)
+
+        # Readings are drawn column-wise: one vector per attribute for all sensors.
+        n_readings = len(sensors) * READINGS_PER_SENSOR
+        sensor_ids = np.repeat([s[0] for s in sensors], READINGS_PER_SENSOR).tolist()
+        times = [f"2024-01-{(i % 5) + 1:02d}T{(i % 24):02d}:00" for i in range(READINGS_PER_SENSOR)] * len(sensors)
+        lows = np.repeat([UNIT_RANGES[s[3]][0] for s in sensors], READINGS_PER_SENSOR)
+        highs = np.repeat([UNIT_RANGES[s[3]][1] for s in sensors], READINGS_PER_SENSOR)
+        values = uniform_column(nrng, lows, highs, n_readings, ndigits=2)
+        quality = choice_column(nrng, ['GOOD', 'BAD'], n_readings)
+        conn.executemany(
+            "INSERT INTO readings VALUES (?,?,?,?,?)",
+            zip(range(1, n_readings + 1), sensor_ids, times, values, quality),
+        )
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--db", required=True)
     parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE)
     args = parser.parse_args()
-
-    rng = get_rng(args.seed)
-    conn = sqlite3.connect(args.db)
-    conn.execute("PRAGMA foreign_keys=ON")
-
-    sites = [(i, f'Plant {i}') for i in range(1, SITES + 1)]
-    conn.executemany("INSERT INTO sites VALUES (?,?)", sites)
-
-    sensors = []
-    sid = 1
-    for site_id in range(1, SITES + 1):
-        sensors.append((sid, site_id, f'Temp{site_id}', 'C', 'ACTIVE')); sid += 1
-        sensors.append((sid, site_id, f'Pressure{site_id}', 'psi', 'ACTIVE')); sid += 1
-        sensors.append((sid, site_id, f'Power{site_id}', 'kW', 'INACTIVE')); sid += 1
-    conn.executemany("INSERT INTO sensors VALUES (?,?,?,?,?)", sensors)
-
-    readings = []
-    rid = 1
-    for sensor_id, site_id, name, unit, status in sensors:
-        for i in range(READINGS_PER_SENSOR):
-            time = f"2024-01-{(i % 5) + 1:02d}T{(i % 24):02d}:00"
-            if unit == 'C':
-                value = rng.uniform(20, 80)
-            elif unit == 'psi':
-                value = rng.uniform(100, 450)
-            else:
-                value = rng.uniform(10, 90)
-            quality = rng.choice(['GOOD', 'BAD'])
-            readings.append((rid, sensor_id, time, round(value, 2), quality))
-            rid += 1
-    conn.executemany("INSERT INTO readings VALUES (?,?,?,?,?)", readings)
-
-    conn.commit()
-    conn.close()
+    populate(args.db, args.seed, args.scale)
 
 
 if __name__ == "__main__":
@@ -5,29 +5,36 @@ import subprocess
 import os
 import sys
 
+from common.steps import run_script
+
 def execute_step(description, command, cwd='.'):
     """Execute a step and report results."""
     print(f"\n🔧 {description}")
     print("-" * 50)
     
     try:
-        if isinstance(command, str):
+        if isinstance(command, list) and command[0] == "python3" and command[1].endswith(".py"):
+            # Python steps run in this interpreter instead of a fresh python3
+            returncode, _, stdout, stderr = run_script(os.path.join(cwd, command[1]), command[2:], cwd=cwd)
+        elif isinstance(command, str):
             result = subprocess.run(command, shell=True, capture_output=True, text=True, cwd=cwd)
+            returncode, stdout, stderr = result.returncode, result.stdout, result.stderr
         else:
             result = subprocess.run(command, capture_output=True, text=True, cwd=cwd)
+            returncode, stdout, stderr = result.returncode, result.stdout, result.stderr
         
-        if result.returncode == 0:
+        if returncode == 0:
             print("✅ SUCCESS")
-            if result.stdout.strip():
-                print(result.stdout)
+            if stdout.strip():
+                print(stdout)
         else:
             print("❌ ERROR")
-            if result.stderr.strip():
-                print("STDERR:", result.stderr)
-            if result.stdout.strip():
-                print("STDOUT:", result.stdout)
+            if stderr.strip():
+                print("STDERR:", stderr)
+            if stdout.strip():
+                print("STDOUT:", stdout)
         
-        return result.returncode == 0
+        return returncode == 0
         
     except Exception as e:
         print(f"❌ EXCEPTION: {e}")
@@ -3,19 +3,12 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.bulkload import bulk_load
 
-
-def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--db", required=True)
-    parser.add_argument("--source", default=None)
-    args = parser.parse_args()
-
-    conn = sqlite3.connect(args.db)
-    conn.execute("PRAGMA foreign_keys=ON")
-    cur = conn.cursor()
-    cur.executescript("""
+SCHEMA = """
 DROP TABLE IF EXISTS trade_facts;
 CREATE TABLE trade_facts (
     id INTEGER PRIMARY KEY,
@@ -27,9 +20,19 @@ CREATE TABLE trade_facts (
     price NUMERIC NOT NULL,
     exec_time TEXT NOT NULL
 );
-""")
-    cur.execute(
-        """
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--source", default=None)
+    args = parser.parse_args()
+
+    with bulk_load(args.db, schema=SCHEMA) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
         INSERT INTO trade_facts (id, order_id, instrument_symbol, venue_name, side, quantity, price, exec_time)
         SELECT t.id, o.id, i.symbol, v.name, o.side, t.quantity, t.price, t.trade_time
         FROM trades t
@@ -38,11 +41,9 @@ CREATE TABLE trade_facts (
         JOIN instruments i ON o.instrument_id=i.id
         JOIN venues v ON o.venue_id=v.id
         """
-    )
-    conn.commit()
-    # Heavy index build after insert
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_tf_instr_time ON trade_facts(instrument_symbol, exec_time)")
-    conn.close()
+        )
+        # Heavy index build after insert
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tf_instr_time ON trade_facts(instrument_symbol, exec_time)")
 
 
 if __name__ == "__main__":
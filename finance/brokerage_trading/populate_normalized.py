@@ -3,60 +3,75 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
-import random
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.utils import scaled, table_rng, DEFAULT_SCALE
+from common.bulkload import bulk_load
 
+INSTRUMENTS = 5
+VENUES = 2
+ORDERS = 20
+EXECUTIONS = 40
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--db", required=True)
-    parser.add_argument("--seed", type=int, default=0)
-    args = parser.parse_args()
 
-    random.seed(args.seed)
-    conn = sqlite3.connect(args.db)
-    conn.execute("PRAGMA foreign_keys=ON")
-    cur = conn.cursor()
+def populate(db: str, seed: int = 0, scale: float = DEFAULT_SCALE) -> None:
+    n_instruments = scaled(INSTRUMENTS, scale)
+    n_orders = scaled(ORDERS, scale)
+    n_executions = scaled(EXECUTIONS, scale)
+
+    with bulk_load(db) as conn:
+        cur = conn.cursor()
+
+        rng = table_rng(seed, "instruments")
+        instruments = [(i, f"SYM{i}", f"Instrument {i}", rng.choice(["STOCK","BOND"]))
+                       for i in range(1, n_instruments + 1)]
+        cur.executemany("INSERT INTO instruments VALUES (?,?,?,?)", instruments)
 
-    instruments = [(i, f"SYM{i}", f"Instrument {i}", random.choice(["STOCK","BOND"]))
-                   for i in range(1, 6)]
-    cur.executemany("INSERT INTO instruments VALUES (?,?,?,?)", instruments)
+        venues = [(i, f"VENUE{i}", f"Country {i}") for i in range(1, VENUES + 1)]
+        cur.executemany("INSERT INTO venues VALUES (?,?,?)", venues)
 
-    venues = [(i, f"VENUE{i}", f"Country {i}") for i in range(1, 3)]
-    cur.executemany("INSERT INTO venues VALUES (?,?,?)", venues)
+        rng = table_rng(seed, "orders")
+        orders = []
+        for i in range(1, n_orders + 1):
+            instr = rng.randint(1, n_instruments)
+            venue = rng.randint(1, VENUES)
+            side = rng.choice(["BUY","SELL"])
+            otype = rng.choice(["MARKET","LIMIT"])
+            status = rng.choice(["OPEN","FILLED","CANCELLED"])
+            qty = rng.randint(1, 100)
+            price = rng.randint(10, 100)
+            created = f"2024-01-{rng.randint(1,5):02d}"
+            orders.append((i, instr, venue, side, otype, status, qty, price, created))
+        cur.executemany("INSERT INTO orders VALUES (?,?,?,?,?,?,?,?,?)", orders)
 
-    orders = []
-    for i in range(1, 21):
-        instr = random.randint(1, 5)
-        venue = random.randint(1, 2)
-        side = random.choice(["BUY","SELL"])
-        otype = random.choice(["MARKET","LIMIT"])
-        status = random.choice(["OPEN","FILLED","CANCELLED"])
-        qty = random.randint(1, 100)
-        price = random.randint(10, 100)
-        created = f"2024-01-{random.randint(1,5):02d}"
-        orders.append((i, instr, venue, side, otype, status, qty, price, created))
-    cur.executemany("INSERT INTO orders VALUES (?,?,?,?,?,?,?,?,?)", orders)
+        rng = table_rng(seed, "executions")
+        execs = []
+        trade_id = 1
+        trades = []
+        for i in range(1, n_executions + 1):
+            order = rng.randint(1, n_orders)
+            time = f"2024-01-{rng.randint(1,5):02d}"
+            qty = rng.randint(1, 50)
+            price = rng.randint(10, 100)
+            execs.append((i, order, time, qty, price))
+            instr = orders[order-1][1]
+            trades.append((trade_id, i, instr, time, qty, price))
+            trade_id += 1
+        cur.executemany("INSERT INTO executions VALUES (?,?,?,?,?)", execs)
+        cur.executemany("INSERT INTO trades VALUES (?,?,?,?,?,?)", trades)
 
-    execs = []
-    trade_id = 1
-    trades = []
-    for i in range(1, 41):
-        order = random.randint(1, 20)
-        time = f"2024-01-{random.randint(1,5):02d}"
-        qty = random.randint(1, 50)
-        price = random.randint(10, 100)
-        execs.append((i, order, time, qty, price))
-        instr = orders[order-1][1]
-        trades.append((trade_id, i, instr, time, qty, price))
-        trade_id += 1
-    cur.executemany("INSERT INTO executions VALUES (?,?,?,?,?)", execs)
-    cur.executemany("INSERT INTO trades VALUES (?,?,?,?,?,?)", trades)
 
-    conn.commit()
-    # Heavy indexes could be created after inserts in larger builds
-    # cur.execute("CREATE INDEX IF NOT EXISTS idx_orders_instr_time ON orders(instrument_id, created_at)")
-    conn.close()
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE)
+    args = parser.parse_args()
+    populate(args.db, args.seed, args.scale)
+
+        # Heavy indexes could be created after inserts in larger builds
+        # cur.execute("CREATE INDEX IF NOT EXISTS idx_orders_instr_time ON orders(instrument_id, created_at)")
 
 
 if __name__ == "__main__":
@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
 from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.bulkload import bulk_load
 
 
 def main() -> None:
@@ -12,14 +14,10 @@ def main() -> None:
     parser.add_argument("--db", required=True)
     args = parser.parse_args()
 
-    conn = sqlite3.connect(args.db)
-    conn.execute("PRAGMA foreign_keys=ON")
-
     schema = Path(__file__).with_name("schema_denormalized.sql").read_text(encoding="utf-8")
-    conn.executescript(schema)
-
-    conn.execute(
-        """
+    with bulk_load(args.db, schema=schema) as conn:
+        conn.execute(
+            """
         INSERT INTO wallet_daily_balances
         SELECT wallet_id,
                substr(transfer_ts,1,10) AS balance_date,
@@ -29,9 +27,7 @@ def main() -> None:
         WHERE status='COMPLETED'
         GROUP BY wallet_id, balance_date;
         """
-    )
-    conn.commit()
-    conn.close()
+        )
 
 
 if __name__ == "__main__":
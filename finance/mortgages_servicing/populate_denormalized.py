@@ -8,7 +8,8 @@ from pathlib import Path
 from datetime import datetime
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import get_rng, batch
+from common.utils import batch
+from common.bulkload import bulk_load
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -18,10 +19,10 @@ def main() -> None:
     
     norm_conn = sqlite3.connect(args.normalized_db)
     norm_conn.row_factory = sqlite3.Row
-    denorm_conn = sqlite3.connect(args.denormalized_db)
+    with bulk_load(args.denormalized_db) as denorm_conn:
     
-    print("Building loan servicing summary...")
-    servicing_query = """
+        print("Building loan servicing summary...")
+        servicing_query = """
     SELECT
         ml.id as loan_id,
         ml.loan_number,
@@ -47,37 +48,37 @@ def main() -> None:
     GROUP BY ml.id
     """
     
-    servicing_data = []
-    for row in norm_conn.execute(servicing_query):
-        # Determine payment status
-        last_payment = row['last_payment_date']
-        if last_payment:
-            days_since_payment = (datetime.now() - datetime.strptime(last_payment, '%Y-%m-%d')).days
-            if days_since_payment <= 30:
+        servicing_data = []
+        for row in norm_conn.execute(servicing_query):
+            # Determine payment status
+            last_payment = row['last_payment_date']
+            if last_payment:
+                days_since_payment = (datetime.now() - datetime.strptime(last_payment, '%Y-%m-%d')).days
+                if days_since_payment <= 30:
+                    payment_status = 'CURRENT'
+                    days_delinquent = 0
+                elif days_since_payment <= 60:
+                    payment_status = 'DELINQUENT_30'
+                    days_delinquent = days_since_payment - 30
+                elif days_since_payment <= 90:
+                    payment_status = 'DELINQUENT_60'
+                    days_delinquent = days_since_payment - 30
+                else:
+                    payment_status = 'DELINQUENT_90_PLUS'
+                    days_delinquent = days_since_payment - 30
+            else:
                 payment_status = 'CURRENT'
                 days_delinquent = 0
-            elif days_since_payment <= 60:
-                payment_status = 'DELINQUENT_30'
-                days_delinquent = days_since_payment - 30
-            elif days_since_payment <= 90:
-                payment_status = 'DELINQUENT_60'
-                days_delinquent = days_since_payment - 30
-            else:
-                payment_status = 'DELINQUENT_90_PLUS'
-                days_delinquent = days_since_payment - 30
-        else:
-            payment_status = 'CURRENT'
-            days_delinquent = 0
         
-        servicing_data.append(tuple(row) + (payment_status, days_delinquent))
+            servicing_data.append(tuple(row) + (payment_status, days_delinquent))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO loan_servicing_summary VALUES 
         (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
     """, servicing_data)
     
-    print("Building portfolio performance metrics...")
-    portfolio_query = """
+        print("Building portfolio performance metrics...")
+        portfolio_query = """
     SELECT
         DATE('now', '-' || (row_number() OVER (ORDER BY ml.id) % 30) || ' days') as date,
         ml.loan_type,
@@ -93,29 +94,29 @@ def main() -> None:
     GROUP BY date, ml.loan_type
     """
     
-    portfolio_data = []
-    for row in norm_conn.execute(portfolio_query):
-        # Simulate delinquency counts
-        total_loans = row['total_loans']
-        delinq_30 = int(total_loans * 0.05)  # 5% delinquent 30+
-        delinq_60 = int(total_loans * 0.02)  # 2% delinquent 60+
-        delinq_90 = int(total_loans * 0.01)  # 1% delinquent 90+
-        foreclosure = int(total_loans * 0.002)  # 0.2% in foreclosure
+        portfolio_data = []
+        for row in norm_conn.execute(portfolio_query):
+            # Simulate delinquency counts
+            total_loans = row['total_loans']
+            delinq_30 = int(total_loans * 0.05)  # 5% delinquent 30+
+            delinq_60 = int(total_loans * 0.02)  # 2% delinquent 60+
+            delinq_90 = int(total_loans * 0.01)  # 1% delinquent 90+
+            foreclosure = int(total_loans * 0.002)  # 0.2% in foreclosure
         
-        portfolio_data.append((
-            row['date'], row['loan_type'], total_loans, row['total_upb'] or 0,
-            delinq_30, delinq_60, delinq_90, foreclosure,
-            row['total_payments'] or 0, row['escrow_collections'] or 0,
-            row['late_fees_collected'] or 0
-        ))
+            portfolio_data.append((
+                row['date'], row['loan_type'], total_loans, row['total_upb'] or 0,
+                delinq_30, delinq_60, delinq_90, foreclosure,
+                row['total_payments'] or 0, row['escrow_collections'] or 0,
+                row['late_fees_collected'] or 0
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO portfolio_performance_daily VALUES 
         (?,?,?,?,?,?,?,?,?,?,?)
     """, portfolio_data)
     
-    print("Building escrow analysis...")
-    escrow_query = """
+        print("Building escrow analysis...")
+        escrow_query = """
     SELECT
         ea.id as escrow_account_id,
         ml.loan_number,
@@ -130,77 +131,75 @@ def main() -> None:
     JOIN borrowers b ON ml.borrower_id = b.id
     """
     
-    escrow_analysis_data = []
-    for row in norm_conn.execute(escrow_query):
-        current_balance = row['current_balance']
-        annual_estimate = row['annual_disbursement_estimate']
+        escrow_analysis_data = []
+        for row in norm_conn.execute(escrow_query):
+            current_balance = row['current_balance']
+            annual_estimate = row['annual_disbursement_estimate']
         
-        # Calculate projected shortage/surplus
-        monthly_collection = row['monthly_escrow_payment']
-        projected_12_month_collections = monthly_collection * 12
-        projected_shortage = max(0, annual_estimate - projected_12_month_collections - current_balance)
-        projected_surplus = max(0, projected_12_month_collections + current_balance - annual_estimate)
+            # Calculate projected shortage/surplus
+            monthly_collection = row['monthly_escrow_payment']
+            projected_12_month_collections = monthly_collection * 12
+            projected_shortage = max(0, annual_estimate - projected_12_month_collections - current_balance)
+            projected_surplus = max(0, projected_12_month_collections + current_balance - annual_estimate)
         
-        cushion = monthly_collection * 2  # 2-month cushion
+            cushion = monthly_collection * 2  # 2-month cushion
         
-        if projected_shortage > 0:
-            analysis_status = 'SHORTAGE'
-        elif projected_surplus > cushion:
-            analysis_status = 'SURPLUS'
-        else:
-            analysis_status = 'CURRENT'
+            if projected_shortage > 0:
+                analysis_status = 'SHORTAGE'
+            elif projected_surplus > cushion:
+                analysis_status = 'SURPLUS'
+            else:
+                analysis_status = 'CURRENT'
         
-        escrow_analysis_data.append((
-            row['escrow_account_id'], row['loan_number'], row['borrower_name'],
-            current_balance, annual_estimate, monthly_collection,
-            projected_shortage if projected_shortage > 0 else None,
-            projected_surplus if projected_surplus > 0 else None,
-            row['last_analysis_date'], cushion, analysis_status
-        ))
+            escrow_analysis_data.append((
+                row['escrow_account_id'], row['loan_number'], row['borrower_name'],
+                current_balance, annual_estimate, monthly_collection,
+                projected_shortage if projected_shortage > 0 else None,
+                projected_surplus if projected_surplus > 0 else None,
+                row['last_analysis_date'], cushion, analysis_status
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO escrow_analysis_summary VALUES 
         (?,?,?,?,?,?,?,?,?,?,?)
     """, escrow_analysis_data)
     
-    print("Building delinquency roll rates...")
-    # Simplified roll rate calculation
-    roll_rates_data = []
-    for month_offset in range(12):
-        analysis_month = (datetime.now() - timedelta(days=month_offset * 30)).strftime('%Y-%m')
+        print("Building delinquency roll rates...")
+        # Simplified roll rate calculation
+        roll_rates_data = []
+        for month_offset in range(12):
+            analysis_month = (datetime.now() - timedelta(days=month_offset * 30)).strftime('%Y-%m')
         
-        for loan_type in ['CONVENTIONAL', 'FHA', 'VA']:
-            # Simulate roll rates
-            current_30 = 50 + month_offset * 2
-            roll_to_60 = int(current_30 * 0.4)
-            roll_to_90 = int(current_30 * 0.2)
-            roll_to_foreclosure = int(current_30 * 0.05)
-            cure_to_current = int(current_30 * 0.35)
+            for loan_type in ['CONVENTIONAL', 'FHA', 'VA']:
+                # Simulate roll rates
+                current_30 = 50 + month_offset * 2
+                roll_to_60 = int(current_30 * 0.4)
+                roll_to_90 = int(current_30 * 0.2)
+                roll_to_foreclosure = int(current_30 * 0.05)
+                cure_to_current = int(current_30 * 0.35)
             
-            roll_rate_60 = roll_to_60 / current_30 if current_30 > 0 else 0
-            roll_rate_90 = roll_to_90 / current_30 if current_30 > 0 else 0
-            cure_rate = cure_to_current / current_30 if current_30 > 0 else 0
+                roll_rate_60 = roll_to_60 / current_30 if current_30 > 0 else 0
+                roll_rate_90 = roll_to_90 / current_30 if current_30 > 0 else 0
+                cure_rate = cure_to_current / current_30 if current_30 > 0 else 0
             
-            roll_rates_data.append((
-                analysis_month, loan_type, current_30, roll_to_60, roll_to_90,
-                roll_to_foreclosure, cure_to_current, roll_rate_60, roll_rate_90, cure_rate
-            ))
+                roll_rates_data.append((
+                    analysis_month, loan_type, current_30, roll_to_60, roll_to_90,
+                    roll_to_foreclosure, cure_to_current, roll_rate_60, roll_rate_90, cure_rate
+                ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO delinquency_roll_rates VALUES 
         (?,?,?,?,?,?,?,?,?,?)
     """, roll_rates_data)
     
-    # Create indexes
-    print("Creating indexes...")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_servicing_summary_status ON loan_servicing_summary(payment_status)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_daily_date ON portfolio_performance_daily(date)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_escrow_analysis_status ON escrow_analysis_summary(analysis_status)")
+        # Create indexes
+        print("Creating indexes...")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_servicing_summary_status ON loan_servicing_summary(payment_status)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_daily_date ON portfolio_performance_daily(date)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_escrow_analysis_status ON escrow_analysis_summary(analysis_status)")
     
-    denorm_conn.commit()
-    denorm_conn.close()
-    norm_conn.close()
-    print("Done!")
+        norm_conn.close()
+        print("Done!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,68 +3,84 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
+import random
 from pathlib import Path
+from typing import Iterator
 
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import get_rng, batch
+from common.utils import scaled, table_rng, DEFAULT_SCALE
+from common.bulkload import bulk_load
+from common.sharding import sharded_insert
 
 MERCHANTS = 50
 TERMINALS_PER_MERCHANT = 2
 TXNS_PER_TERMINAL = 100
+BATCH_DAYS = 3
+# Card transactions and chargebacks are generated per chunk of merchants, each
+# chunk from its own stream, so they can be sharded across worker processes.
+MERCHANT_CHUNK = 10
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--db", required=True)
-    parser.add_argument("--seed", type=int, default=42)
-    args = parser.parse_args()
+def transaction_rows(rng: random.Random, start: int, stop: int) -> Iterator[tuple[str, tuple]]:
+    """Yield ``(table, row)`` transactions and chargebacks of merchants ``start..stop-1``.
 
-    rng = get_rng(args.seed)
-    conn = sqlite3.connect(args.db)
-    conn.execute("PRAGMA foreign_keys=ON")
-
-    merchants = []
-    for mid in range(1, MERCHANTS + 1):
-        merchants.append((mid, f"Merchant {mid}", f"M{mid:05d}", rng.choice(['BASIC','STANDARD','GOLD']), rng.randint(1000,9999), 'US'))
-    conn.executemany("INSERT INTO merchants VALUES (?,?,?,?,?,?)", merchants)
-
-    terminals = []
-    tid = 1
-    for m in merchants:
-        for _ in range(TERMINALS_PER_MERCHANT):
-            terminals.append((tid, m[0], f"SN{tid:06d}", 'ACTIVE'))
-            tid += 1
-    conn.executemany("INSERT INTO terminals VALUES (?,?,?,?)", terminals)
-
-    batches = []
-    txns = []
-    cbks = []
-    batch_id = 1
-    txn_id = 1
-    cb_id = 1
-    for m in merchants:
-        for d in range(3):
-            batches.append((batch_id, m[0], f"2024-01-{d+1:02d}", 'CLOSED'))
-            for t in [t for t in terminals if t[1]==m[0]]:
+    Ids follow the merchant -> batch day -> terminal nesting, so every chunk
+    knows its id range without seeing the others. A chargeback shares its
+    transaction's id.
+    """
+    per_batch = TERMINALS_PER_MERCHANT * TXNS_PER_TERMINAL
+    for mid in range(start, stop):
+        for d in range(BATCH_DAYS):
+            batch_id = (mid - 1) * BATCH_DAYS + d + 1
+            txn_id = (batch_id - 1) * per_batch + 1
+            for k in range(TERMINALS_PER_MERCHANT):
+                tid = (mid - 1) * TERMINALS_PER_MERCHANT + k + 1
                 for _ in range(TXNS_PER_TERMINAL):
                     ts = f"2024-01-{d+1:02d}T12:{rng.randint(0,59):02d}:00"
                     amount = rng.randint(100,2000)
-                    txns.append((txn_id, m[0], t[0], batch_id, ts, amount, 'USD', rng.choice(['AUTH','REFUND']), rng.choice(['APPROVED','DECLINED'])))
+                    yield "card_transactions", (txn_id, mid, tid, batch_id, ts, amount, 'USD', rng.choice(['AUTH','REFUND']), rng.choice(['APPROVED','DECLINED']))
                     if rng.random() < 0.02:
-                        cbks.append((cb_id, txn_id, 'RETRIEVAL', 'FRAUD', ts, amount))
-                        cb_id += 1
+                        yield "chargebacks", (txn_id, txn_id, 'RETRIEVAL', 'FRAUD', ts, amount)
                     txn_id += 1
-            batch_id += 1
-    conn.executemany("INSERT INTO settlement_batches VALUES (?,?,?,?)", batches)
-    for chunk in batch(txns, 500):
-        conn.executemany("INSERT INTO card_transactions VALUES (?,?,?,?,?,?,?,?,?)", chunk)
-    if cbks:
-        conn.executemany("INSERT INTO chargebacks VALUES (?,?,?,?,?,?)", cbks)
-    conn.commit()
-    print("rows", len(merchants), len(terminals), len(txns))
-    conn.close()
+
+
+def populate(db: str, seed: int = 42, scale: float = DEFAULT_SCALE, jobs: int = 1) -> None:
+    n_merchants = scaled(MERCHANTS, scale)
+
+    rng = table_rng(seed, "merchants")
+    with bulk_load(db) as conn:
+        merchants = []
+        for mid in range(1, n_merchants + 1):
+            merchants.append((mid, f"Merchant {mid}", f"M{mid:05d}", rng.choice(['BASIC','STANDARD','GOLD']), rng.randint(1000,9999), 'US'))
+        conn.executemany("INSERT INTO merchants VALUES (?,?,?,?,?,?)", merchants)
+
+        terminals = []
+        tid = 1
+        for m in merchants:
+            for _ in range(TERMINALS_PER_MERCHANT):
+                terminals.append((tid, m[0], f"SN{tid:06d}", 'ACTIVE'))
+                tid += 1
+        conn.executemany("INSERT INTO terminals VALUES (?,?,?,?)", terminals)
+
+        batches = []
+        for m in merchants:
+            for d in range(BATCH_DAYS):
+                batches.append(((m[0] - 1) * BATCH_DAYS + d + 1, m[0], f"2024-01-{d+1:02d}", 'CLOSED'))
+        conn.executemany("INSERT INTO settlement_batches VALUES (?,?,?,?)", batches)
+
+        counts = sharded_insert(conn, ["card_transactions", "chargebacks"], transaction_rows, seed, n_merchants, MERCHANT_CHUNK, jobs)
+        print("rows", len(merchants), len(terminals), counts["card_transactions"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE)
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for sharded fact tables")
+    args = parser.parse_args()
+    populate(args.db, args.seed, args.scale, args.jobs)
 
 
 if __name__ == "__main__":
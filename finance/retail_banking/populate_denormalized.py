@@ -3,8 +3,27 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
 from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.bulkload import bulk_load
+from common.denormalize import attach, refresh
+
+# Incrementally refreshable tables (see common/denormalize.py).
+VIEWS = [
+    {
+        "table": "account_daily_balances",
+        "key": ("account_id", "balance_date"),
+        "select": """
+        SELECT account_id, txn_date, SUM(amount_cents)
+        FROM transactions
+        WHERE {partitions}
+        GROUP BY account_id, txn_date
+        """,
+        "partitions": "(account_id, txn_date) IN (SELECT account_id, balance_date FROM temp.refresh_keys)",
+        "sources": [{"table": "transactions", "watermark": "id", "keys": "account_id, txn_date AS balance_date"}],
+    },
+]
 
 
 def main() -> None:
@@ -13,20 +32,9 @@ def main() -> None:
     parser.add_argument("--source", default="retail_banking_normalized.db")
     args = parser.parse_args()
 
-    src = sqlite3.connect(args.source)
-    dst = sqlite3.connect(args.db)
-    dst.executescript(Path("schema_denormalized.sql").read_text())
-    rows = src.execute(
-        """
-        SELECT account_id, txn_date, SUM(amount_cents)
-        FROM transactions
-        GROUP BY account_id, txn_date
-        """
-    ).fetchall()
-    dst.executemany("INSERT INTO account_daily_balances VALUES (?,?,?)", rows)
-    dst.commit()
-    src.close()
-    dst.close()
+    with bulk_load(args.db, schema=Path("schema_denormalized.sql").read_text()) as dst:
+        with attach(dst, args.source):
+            refresh(dst, VIEWS, full=True)
 
 
 if __name__ == "__main__":
@@ -3,55 +3,71 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
+import random
+from functools import partial
 from pathlib import Path
+from typing import Iterator
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import get_rng, batch
+from common.utils import stream_insert, scaled, table_rng, DEFAULT_SCALE
+from common.bulkload import bulk_load
+from common.sharding import sharded_insert
 
 CUSTOMERS = 5
 ACCOUNTS = 10
 TRANSACTIONS = 50
+# Transactions are generated in fixed-size chunks, each from its own stream,
+# so they can be sharded across worker processes.
+TRANSACTION_CHUNK = 10000
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--db", required=True)
-    parser.add_argument("--seed", type=int, default=0)
-    args = parser.parse_args()
+def customer_rows(rng: random.Random, n_customers: int) -> Iterator[tuple]:
+    for i in range(1, n_customers+1):
+        yield (i, f'Customer {i}', rng.choice(['LOW','MED','HIGH']))
 
-    rng = get_rng(args.seed)
-    conn = sqlite3.connect(args.db)
-    conn.execute("PRAGMA foreign_keys=ON")
 
-    customers = [(i, f'Customer {i}', rng.choice(['LOW','MED','HIGH'])) for i in range(1, CUSTOMERS+1)]
-    conn.executemany("INSERT INTO customers VALUES (?,?,?)", customers)
-
-    branches = [(i, f'Branch {i}', f'City {i}') for i in range(1, 4)]
-    conn.executemany("INSERT INTO branches VALUES (?,?,?)", branches)
-
-    accounts = []
-    for i in range(1, ACCOUNTS+1):
-        cust = rng.randint(1, CUSTOMERS)
+def account_rows(rng: random.Random, n_accounts: int, n_customers: int) -> Iterator[tuple]:
+    for i in range(1, n_accounts+1):
+        cust = rng.randint(1, n_customers)
         branch = rng.randint(1, 3)
         acct_num = f'ACCT{i:06d}'
         acct_type = rng.choice(['CHECKING','SAVINGS'])
         opened = f"2024-01-{rng.randint(1,5):02d}"
-        accounts.append((i, cust, branch, acct_num, acct_type, opened))
-    conn.executemany("INSERT INTO accounts VALUES (?,?,?,?,?,?)", accounts)
+        yield (i, cust, branch, acct_num, acct_type, opened)
+
 
-    txns = []
-    for i in range(1, TRANSACTIONS+1):
-        acct = rng.randint(1, ACCOUNTS)
+def transaction_rows(rng: random.Random, start: int, stop: int, n_accounts: int) -> Iterator[tuple]:
+    for i in range(start, stop):
+        acct = rng.randint(1, n_accounts)
         date = f"2024-01-{rng.randint(1,5):02d}"
         amt = rng.randint(-50000, 50000)
         status = rng.choice(['PENDING','POSTED'])
-        txns.append((i, acct, date, amt, status))
-    for chunk in batch(txns, 500):
-        conn.executemany("INSERT INTO transactions VALUES (?,?,?,?,?)", chunk)
+        yield (i, acct, date, amt, status)
+
+
+def populate(db: str, seed: int = 0, scale: float = DEFAULT_SCALE, jobs: int = 1) -> None:
+    n_customers = scaled(CUSTOMERS, scale)
+    n_accounts = scaled(ACCOUNTS, scale)
+    n_transactions = scaled(TRANSACTIONS, scale)
 
-    conn.commit()
-    conn.close()
+    with bulk_load(db) as conn:
+        stream_insert(conn, "INSERT INTO customers VALUES (?,?,?)", customer_rows(table_rng(seed, "customers"), n_customers))
+
+        branches = [(i, f'Branch {i}', f'City {i}') for i in range(1, 4)]
+        conn.executemany("INSERT INTO branches VALUES (?,?,?)", branches)
+
+        stream_insert(conn, "INSERT INTO accounts VALUES (?,?,?,?,?,?)", account_rows(table_rng(seed, "accounts"), n_accounts, n_customers))
+        sharded_insert(conn, "transactions", partial(transaction_rows, n_accounts=n_accounts), seed, n_transactions, TRANSACTION_CHUNK, jobs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE)
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for sharded fact tables")
+    args = parser.parse_args()
+    populate(args.db, args.seed, args.scale, args.jobs)
 
 
 if __name__ == "__main__":
@@ -1,16 +1,17 @@
 #!/usr/bin/env python3
 """Populate denormalized table for treasury risk."""
 from __future__ import annotations
-import argparse, sqlite3
+import argparse
 from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.bulkload import bulk_load
 
 def main() -> None:
     p = argparse.ArgumentParser()
     p.add_argument('--db', required=True)
     args = p.parse_args()
-    conn = sqlite3.connect(args.db)
-    conn.executescript(Path('schema_denormalized.sql').read_text())
-    conn.commit()
-    conn.close()
+    with bulk_load(args.db, schema=Path('schema_denormalized.sql').read_text()):
+        pass  # schema only for now
 if __name__ == '__main__':
     main()
@@ -1,24 +1,27 @@
 #!/usr/bin/env python3
 """Populate treasury risk normalized schema."""
 from __future__ import annotations
-import argparse, sqlite3
+import argparse
 from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.bulkload import bulk_load
+from common.utils import require_unscaled
 SCALE_DESKS = 10
 SCALE_EXPOSURES = 1000
 
+def populate(db: str, seed: int = 42, scale: float = 1.0) -> None:
+    require_unscaled(scale, "treasury_risk")
+    with bulk_load(db, schema=Path('schema_normalized.sql').read_text()):
+        pass  # TODO: populate tables with SCALE_* constants
+
+
 def main() -> None:
     p = argparse.ArgumentParser()
     p.add_argument('--db', required=True)
+    p.add_argument('--scale', type=float, default=1.0)
+    p.add_argument('--seed', type=int, default=42)
     args = p.parse_args()
-    conn = sqlite3.connect(args.db)
-    conn.executescript(Path('schema_normalized.sql').read_text())
-    # TODO: populate tables with SCALE_* constants
-    # heavy indexes created after bulk insert
-    conn.executescript('''
-    CREATE INDEX idx_exposure_asof_desk ON exposures(as_of, desk_id);
-    CREATE INDEX idx_breach_limit_date ON breaches(limit_id, breached_on);
-    ''')
-    conn.commit()
-    conn.close()
+    populate(args.db, args.seed, args.scale)
 if __name__ == '__main__':
     main()
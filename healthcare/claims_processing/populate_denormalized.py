@@ -8,7 +8,8 @@ from pathlib import Path
 from datetime import datetime
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import batch
+from common.bulkload import bulk_load
+from common.denormalize import attach, materialize
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -18,10 +19,10 @@ def main() -> None:
     
     norm_conn = sqlite3.connect(args.normalized_db)
     norm_conn.row_factory = sqlite3.Row
-    denorm_conn = sqlite3.connect(args.denormalized_db)
+    with bulk_load(args.denormalized_db) as denorm_conn, attach(denorm_conn, args.normalized_db):
     
-    print("Building claims analytics...")
-    analytics_query = """
+        print("Building claims analytics...")
+        analytics_query = """
     SELECT
         mc.id as claim_id,
         mc.claim_number,
@@ -55,18 +56,10 @@ def main() -> None:
     GROUP BY mc.id
     """
     
-    analytics_data = []
-    for row in norm_conn.execute(analytics_query):
-        analytics_data.append(tuple(row))
+        materialize(denorm_conn, "claims_analytics", analytics_query)
     
-    for chunk in batch(analytics_data, 500):
-        denorm_conn.executemany("""
-            INSERT INTO claims_analytics VALUES 
-            (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-        """, chunk)
-    
-    print("Building daily metrics...")
-    daily_query = """
+        print("Building daily metrics...")
+        daily_query = """
     SELECT
         DATE(mc.submission_date) as date,
         ip.plan_type,
@@ -85,18 +78,18 @@ def main() -> None:
     GROUP BY DATE(mc.submission_date), ip.plan_type
     """
     
-    daily_data = []
-    for row in norm_conn.execute(daily_query):
-        denial_rate = row['claims_denied'] / row['claims_received'] if row['claims_received'] > 0 else 0
-        daily_data.append(tuple(row) + (denial_rate,))
+        daily_data = []
+        for row in norm_conn.execute(daily_query):
+            denial_rate = row['claims_denied'] / row['claims_received'] if row['claims_received'] > 0 else 0
+            daily_data.append(tuple(row) + (denial_rate,))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO daily_claims_metrics VALUES 
         (?,?,?,?,?,?,?,?,?,?,?)
     """, daily_data)
     
-    print("Building provider performance...")
-    provider_query = """
+        print("Building provider performance...")
+        provider_query = """
     SELECT
         p.id as provider_id,
         p.npi,
@@ -117,28 +110,26 @@ def main() -> None:
     GROUP BY p.id, strftime('%Y-%m', mc.service_date)
     """
     
-    provider_data = []
-    for row in norm_conn.execute(provider_query):
-        denial_rate = row['claims_denied'] / row['claims_submitted'] if row['claims_submitted'] > 0 else 0
-        clean_claim_rate = 1 - denial_rate
+        provider_data = []
+        for row in norm_conn.execute(provider_query):
+            denial_rate = row['claims_denied'] / row['claims_submitted'] if row['claims_submitted'] > 0 else 0
+            clean_claim_rate = 1 - denial_rate
         
-        provider_data.append(tuple(row) + (denial_rate, clean_claim_rate))
+            provider_data.append(tuple(row) + (denial_rate, clean_claim_rate))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO provider_performance VALUES 
         (?,?,?,?,?,?,?,?,?,?,?,?,?)
     """, provider_data)
     
-    # Create indexes
-    print("Creating indexes...")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_claims_analytics_member ON claims_analytics(member_id)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_metrics_date ON daily_claims_metrics(date)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_provider_performance_month ON provider_performance(month)")
+        # Create indexes
+        print("Creating indexes...")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_claims_analytics_member ON claims_analytics(member_id)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_metrics_date ON daily_claims_metrics(date)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_provider_performance_month ON provider_performance(month)")
     
-    denorm_conn.commit()
-    denorm_conn.close()
-    norm_conn.close()
-    print("Done!")
+        norm_conn.close()
+        print("Done!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -8,7 +8,9 @@ from pathlib import Path
 from datetime import datetime
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import batch, get_rng
+from common.utils import table_rng
+from common.bulkload import bulk_load
+from common.denormalize import attach, materialize
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -16,14 +18,12 @@ def main() -> None:
     parser.add_argument("--denormalized-db", required=True)
     args = parser.parse_args()
     
-    rng = get_rng(42)
-    
     norm_conn = sqlite3.connect(args.normalized_db)
     norm_conn.row_factory = sqlite3.Row
-    denorm_conn = sqlite3.connect(args.denormalized_db)
+    with bulk_load(args.denormalized_db) as denorm_conn, attach(denorm_conn, args.normalized_db):
     
-    print("Building encounter summary...")
-    encounter_query = """
+        print("Building encounter summary...")
+        encounter_query = """
     SELECT
         e.id as encounter_id,
         p.first_name || ' ' || p.last_name as patient_name,
@@ -53,17 +53,10 @@ def main() -> None:
     GROUP BY e.id
     """
     
-    encounter_summary_data = []
-    for row in norm_conn.execute(encounter_query):
-        encounter_summary_data.append(tuple(row))
-    
-    denorm_conn.executemany("""
-        INSERT INTO encounter_summary VALUES 
-        (?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-    """, encounter_summary_data)
+        materialize(denorm_conn, "encounter_summary", encounter_query)
     
-    print("Building provider productivity...")
-    productivity_query = """
+        print("Building provider productivity...")
+        productivity_query = """
     SELECT
         pr.id as provider_id,
         DATE(e.encounter_date) as date,
@@ -82,27 +75,26 @@ def main() -> None:
     GROUP BY pr.id, DATE(e.encounter_date)
     """
     
-    productivity_data = []
-    for row in norm_conn.execute(productivity_query):
-        stat_completion_rate = 0.95 + rng.uniform(-0.1, 0.05)  # High stat completion rate
-        patient_satisfaction = rng.uniform(3.5, 5.0)
+        productivity_data = []
+        rng = table_rng(42, "provider_productivity")
+        for row in norm_conn.execute(productivity_query):
+            stat_completion_rate = 0.95 + rng.uniform(-0.1, 0.05)  # High stat completion rate
+            patient_satisfaction = rng.uniform(3.5, 5.0)
         
-        productivity_data.append(tuple(row) + (stat_completion_rate, patient_satisfaction))
+            productivity_data.append(tuple(row) + (stat_completion_rate, patient_satisfaction))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO provider_productivity VALUES 
         (?,?,?,?,?,?,?,?,?)
     """, productivity_data)
     
-    # Create indexes
-    print("Creating indexes...")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_encounter_summary_date ON encounter_summary(encounter_date)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_provider_productivity_date ON provider_productivity(date)")
+        # Create indexes
+        print("Creating indexes...")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_encounter_summary_date ON encounter_summary(encounter_date)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_provider_productivity_date ON provider_productivity(date)")
     
-    denorm_conn.commit()
-    denorm_conn.close()
-    norm_conn.close()
-    print("Done!")
+        norm_conn.close()
+        print("Done!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
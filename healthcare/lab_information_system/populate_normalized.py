@@ -3,19 +3,25 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
 import random
-import json
+from functools import partial
 from pathlib import Path
 from datetime import datetime, timedelta
+from typing import Iterator
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import get_rng, batch
+from common.utils import batch, stream_insert, scaled, table_rng, DEFAULT_SCALE
+from common.bulkload import bulk_load
+from common.sharding import sharded_insert
 
 # Scale constants
 PATIENTS = 7000
 LAB_ORDERS = 80000
-LAB_RESULTS = 150000
+# Lab orders, specimens and results are generated per chunk of orders, each
+# chunk from its own stream, so they can be sharded across worker processes.
+LAB_ORDER_CHUNK = 10000
+# Dates count back from here rather than from the build's wall clock.
+REFERENCE_DATE = datetime(2024, 7, 1)
 
 # Lab test definitions
 LAB_TESTS = [
@@ -29,67 +35,36 @@ LAB_TESTS = [
     ('COVID', 'COVID-19 PCR', 'MOLECULAR', 'SWAB', 24, 'Negative', None, None)
 ]
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--db", required=True)
-    parser.add_argument("--seed", type=int, default=42)
-    args = parser.parse_args()
-
-    rng = get_rng(args.seed)
-    random.seed(args.seed)
-    
-    conn = sqlite3.connect(args.db)
-    conn.execute("PRAGMA foreign_keys=ON")
-    
-    # Insert patients
-    print(f"Inserting {PATIENTS} patients...")
-    patients_data = []
-    
-    for i in range(1, PATIENTS + 1):
-        birth_date = (datetime.now() - timedelta(days=rng.randint(1*365, 90*365))).strftime('%Y-%m-%d')
+def patient_rows(rng: random.Random, n_patients: int) -> Iterator[tuple]:
+    for i in range(1, n_patients + 1):
+        birth_date = (REFERENCE_DATE - timedelta(days=rng.randint(1*365, 90*365))).strftime('%Y-%m-%d')
         
-        patients_data.append((
+        yield (
             i, f'PAT{i:07d}', f'Patient{i}', f'LastName{i}',
             birth_date, rng.choice(['M', 'F', 'OTHER']),
             f'MRN{i:08d}', 'ACTIVE'
-        ))
-    
-    for chunk in batch(patients_data, 1000):
-        conn.executemany("INSERT INTO patients VALUES (?,?,?,?,?,?,?,?)", chunk)
-    
-    # Insert lab tests
-    print("Inserting lab tests...")
-    lab_tests_data = []
-    for i, (code, name, category, specimen, turnaround, ref_range, crit_low, crit_high) in enumerate(LAB_TESTS, 1):
-        lab_tests_data.append((i, code, name, category, specimen, turnaround, ref_range, crit_low, crit_high, 1))
-    
-    conn.executemany("INSERT INTO lab_tests VALUES (?,?,?,?,?,?,?,?,?,?)", lab_tests_data)
-    
-    # Insert lab orders
-    print(f"Inserting {LAB_ORDERS} lab orders...")
-    orders_data = []
-    specimens_data = []
-    results_data = []
-    qc_data = []
-    
-    order_id = 1
-    specimen_id = 1
-    result_id = 1
-    qc_id = 1
-    
-    for _ in range(LAB_ORDERS):
-        patient_id = rng.randint(1, PATIENTS)
+        )
+
+def lab_order_rows(rng: random.Random, start: int, stop: int, n_patients: int) -> Iterator[tuple[str, tuple]]:
+    """Yield ``(table, row)`` lab orders ``start..stop-1`` with their specimens and results.
+
+    A specimen and its result share their order's id, so every chunk knows its
+    id range without seeing the others; cancelled orders leave gaps.
+    """
+    for order_id in range(start, stop):
+        patient_id = rng.randint(1, n_patients)
         test_id = rng.randint(1, len(LAB_TESTS))
         test_info = LAB_TESTS[test_id - 1]
         
-        order_datetime = (datetime.now() - timedelta(days=rng.randint(1, 180))).strftime('%Y-%m-%d %H:%M:%S')
+        order_datetime = (REFERENCE_DATE - timedelta(days=rng.randint(1, 180))).strftime('%Y-%m-%d %H:%M:%S')
         priority = rng.choices(['ROUTINE', 'URGENT', 'STAT'], weights=[0.7, 0.2, 0.1])[0]
         status = rng.choices(['COMPLETED', 'IN_PROGRESS', 'CANCELLED'], weights=[0.85, 0.10, 0.05])[0]
         
-        orders_data.append((
+        yield 'lab_orders', (
             order_id, f'ORD{order_id:09d}', patient_id, f'Dr. Provider {rng.randint(1, 100)}',
             test_id, order_datetime, priority, f'Clinical indication {order_id}', status
-        ))
+        )
+        specimen_id = order_id
         
         # Create specimen if order is processed
         if status != 'CANCELLED':
@@ -99,11 +74,11 @@ def main() -> None:
             specimen_condition = rng.choices(['ACCEPTABLE', 'HEMOLYZED', 'CLOTTED'], weights=[0.9, 0.05, 0.05])[0]
             processing_status = 'COMPLETED' if status == 'COMPLETED' else 'PROCESSING'
             
-            specimens_data.append((
+            yield 'specimens', (
                 specimen_id, f'SPEC{specimen_id:09d}', order_id, collection_datetime,
                 'Venipuncture', f'Tech{rng.randint(1, 20)}', rng.uniform(1.0, 10.0),
                 specimen_condition, collection_datetime, processing_status
-            ))
+            )
             
             # Create results for completed specimens
             if status == 'COMPLETED' and specimen_condition == 'ACCEPTABLE':
@@ -127,68 +102,87 @@ def main() -> None:
                     units = test_info[5].split()[-1] if ' ' in test_info[5] else 'units'
                 else:
                     result_str = rng.choice(['Negative', 'Positive', 'Normal', 'Abnormal'])
-                    abnormal_flag = 'NORMAL' if result_str in ['Negative', 'Normal'] else 'ABNORMAL'
+                    abnormal_flag = 'NORMAL' if result_str in ['Negative', 'Normal'] else 'HIGH'  # the schema has no ABNORMAL
                     units = None
                 
-                results_data.append((
-                    result_id, specimen_id, test_id, result_datetime, result_str, units,
+                yield 'lab_results', (
+                    specimen_id, specimen_id, test_id, result_datetime, result_str, units,
                     abnormal_flag, f'Tech{rng.randint(1, 30)}', 
                     f'Path{rng.randint(1, 10)}' if abnormal_flag.startswith('CRITICAL') else None,
                     'FINAL'
-                ))
-                result_id += 1
-            
-            specimen_id += 1
-        
-        order_id += 1
-    
-    # Batch insert all data
-    for chunk in batch(orders_data, 1000):
-        conn.executemany("INSERT INTO lab_orders VALUES (?,?,?,?,?,?,?,?,?)", chunk)
-    
-    for chunk in batch(specimens_data, 1000):
-        conn.executemany("INSERT INTO specimens VALUES (?,?,?,?,?,?,?,?,?,?)", chunk)
-    
-    for chunk in batch(results_data, 1000):
-        conn.executemany("INSERT INTO lab_results VALUES (?,?,?,?,?,?,?,?,?,?)", chunk)
-    
-    # Insert quality controls
-    print("Inserting quality controls...")
-    for test_id in range(1, len(LAB_TESTS) + 1):
-        for day in range(30):  # 30 days of QC
-            qc_date = (datetime.now() - timedelta(days=day)).strftime('%Y-%m-%d %H:%M:%S')
-            expected_value = rng.uniform(50, 150)
-            actual_value = expected_value * rng.uniform(0.95, 1.05)
-            variance = abs((actual_value - expected_value) / expected_value * 100)
+                )
+
+def populate(db: str, seed: int = 42, scale: float = DEFAULT_SCALE, jobs: int = 1) -> None:
+    n_patients = scaled(PATIENTS, scale)
+    n_lab_orders = scaled(LAB_ORDERS, scale)
+
+    with bulk_load(db) as conn:
+        # Insert patients
+        print(f"Inserting {n_patients} patients...")
+        stream_insert(conn, "INSERT INTO patients VALUES (?,?,?,?,?,?,?,?)", patient_rows(table_rng(seed, "patients"), n_patients))
+    
+        # Insert lab tests
+        print("Inserting lab tests...")
+        lab_tests_data = []
+        for i, (code, name, category, specimen, turnaround, ref_range, crit_low, crit_high) in enumerate(LAB_TESTS, 1):
+            lab_tests_data.append((i, code, name, category, specimen, turnaround, ref_range, crit_low, crit_high, 1))
+    
+        conn.executemany("INSERT INTO lab_tests VALUES (?,?,?,?,?,?,?,?,?,?)", lab_tests_data)
+    
+        # Insert lab orders with their specimens and results
+        print(f"Inserting {n_lab_orders} lab orders...")
+        sharded_insert(
+            conn, ["lab_orders", "specimens", "lab_results"],
+            partial(lab_order_rows, n_patients=n_patients), seed, n_lab_orders, LAB_ORDER_CHUNK, jobs,
+        )
+    
+        rng = table_rng(seed, "quality_controls")
+        qc_data = []
+        qc_id = 1
+    
+        # Insert quality controls
+        print("Inserting quality controls...")
+        for test_id in range(1, len(LAB_TESTS) + 1):
+            for day in range(30):  # 30 days of QC
+                qc_date = (REFERENCE_DATE - timedelta(days=day)).strftime('%Y-%m-%d %H:%M:%S')
+                expected_value = rng.uniform(50, 150)
+                actual_value = expected_value * rng.uniform(0.95, 1.05)
+                variance = abs((actual_value - expected_value) / expected_value * 100)
             
-            qc_status = 'PASSED' if variance < 5 else 'OUT_OF_RANGE'
+                qc_status = 'PASSED' if variance < 5 else 'OUT_OF_RANGE'
             
-            qc_data.append((
-                qc_id, f'QC{qc_id:06d}', test_id, qc_date,
-                expected_value, actual_value, variance, qc_status,
-                f'Tech{rng.randint(1, 10)}'
-            ))
-            qc_id += 1
-    
-    for chunk in batch(qc_data, 1000):
-        conn.executemany("INSERT INTO quality_controls VALUES (?,?,?,?,?,?,?,?,?)", chunk)
+                qc_data.append((
+                    qc_id, f'QC{qc_id:06d}', test_id, qc_date,
+                    expected_value, actual_value, variance, qc_status,
+                    f'Tech{rng.randint(1, 10)}'
+                ))
+                qc_id += 1
     
-    # Create evidence table
-    conn.execute("CREATE TABLE IF NOT EXISTS evidence_kv (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        for chunk in batch(qc_data, 1000):
+            conn.executemany("INSERT INTO quality_controls VALUES (?,?,?,?,?,?,?,?,?)", chunk)
     
-    conn.commit()
+        # Create evidence table
+        conn.execute("CREATE TABLE IF NOT EXISTS evidence_kv (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
     
-    # Create indexes
-    print("Creating indexes...")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_patients_mrn ON patients(medical_record_number)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_lab_orders_patient ON lab_orders(patient_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_lab_orders_datetime ON lab_orders(order_datetime)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_specimens_order ON specimens(order_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_lab_results_specimen ON lab_results(specimen_id)")
+        # Create indexes
+        print("Creating indexes...")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_patients_mrn ON patients(medical_record_number)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_lab_orders_patient ON lab_orders(patient_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_lab_orders_datetime ON lab_orders(order_datetime)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_specimens_order ON specimens(order_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_lab_results_specimen ON lab_results(specimen_id)")
     
-    conn.commit()
-    conn.close()
-    print("Done!")
+        print("Done!")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE)
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for sharded fact tables")
+    args = parser.parse_args()
+    populate(args.db, args.seed, args.scale, args.jobs)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,7 +7,8 @@ import sqlite3
 from pathlib import Path
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import batch, get_rng
+from common.utils import batch
+from common.bulkload import bulk_load
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -15,14 +16,12 @@ def main() -> None:
     parser.add_argument("--denormalized-db", required=True)
     args = parser.parse_args()
     
-    rng = get_rng(42)
-    
     norm_conn = sqlite3.connect(args.normalized_db)
     norm_conn.row_factory = sqlite3.Row
-    denorm_conn = sqlite3.connect(args.denormalized_db)
+    with bulk_load(args.denormalized_db) as denorm_conn:
     
-    print("Building prescription analytics...")
-    analytics_query = """
+        print("Building prescription analytics...")
+        analytics_query = """
     SELECT
         p.id as prescription_id,
         pat.patient_id,
@@ -47,32 +46,30 @@ def main() -> None:
     GROUP BY p.id
     """
     
-    analytics_data = []
-    for row in norm_conn.execute(analytics_query):
-        # Calculate adherence metrics
-        days_supply = row['days_supply'] or 30
-        fill_count = row['fill_count'] or 0
+        analytics_data = []
+        for row in norm_conn.execute(analytics_query):
+            # Calculate adherence metrics
+            days_supply = row['days_supply'] or 30
+            fill_count = row['fill_count'] or 0
         
-        if fill_count > 0:
-            adherence_rate = min(1.0, fill_count / max(1, days_supply / 30))
-        else:
-            adherence_rate = 0.0
+            if fill_count > 0:
+                adherence_rate = min(1.0, fill_count / max(1, days_supply / 30))
+            else:
+                adherence_rate = 0.0
         
-        analytics_data.append(tuple(row) + (adherence_rate,))
+            analytics_data.append(tuple(row) + (adherence_rate,))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO prescription_analytics VALUES 
         (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
     """, analytics_data)
     
-    # Create indexes
-    print("Creating indexes...")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_prescription_analytics_patient ON prescription_analytics(patient_id)")
+        # Create indexes
+        print("Creating indexes...")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_prescription_analytics_patient ON prescription_analytics(patient_id)")
     
-    denorm_conn.commit()
-    denorm_conn.close()
-    norm_conn.close()
-    print("Done!")
+        norm_conn.close()
+        print("Done!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,23 +1,30 @@
 #!/usr/bin/env python3
 """Populate telehealth scheduling sessions schema."""
 from __future__ import annotations
-import argparse, sqlite3, random
+import argparse
 from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.bulkload import bulk_load
+from common.utils import require_unscaled
+
+def populate(db: str, seed: int = 0, scale: float = 1.0) -> None:
+    require_unscaled(scale, "telehealth_scheduling_sessions")
+    with bulk_load(db) as conn:
+        providers=[(1,'ProvA'),(2,'ProvB')]
+        patients=[(i,f'Patient{i}') for i in range(1,6)]
+        conn.executemany('INSERT INTO providers VALUES (?,?)',providers)
+        conn.executemany('INSERT INTO patients VALUES (?,?)',patients)
+        appts=[(i,providers[0][0],patients[i-1][0],f'2024-01-{i:02d}T10:00') for i in range(1,6)]
+        conn.executemany('INSERT INTO appointments(id,provider_id,patient_id,appt_time) VALUES (?,?,?,?)',appts)
+        sessions=[(i,appts[i-1][0],f'2024-01-{i:02d}T10:00','COMPLETED') for i in range(1,4)]
+        conn.executemany('INSERT INTO sessions(id,appointment_id,start_time,status) VALUES (?,?,?,?)',sessions)
+        feedback=[(i,sessions[i-1][0],5-i) for i in range(1,4)]
+        conn.executemany('INSERT INTO feedback(id,session_id,rating) VALUES (?,?,?)',feedback)
+
 
 def main()->None:
-    p=argparse.ArgumentParser(); p.add_argument('--db',required=True); args=p.parse_args()
-    random.seed(0)
-    conn=sqlite3.connect(args.db)
-    providers=[(1,'ProvA'),(2,'ProvB')]
-    patients=[(i,f'Patient{i}') for i in range(1,6)]
-    conn.executemany('INSERT INTO providers VALUES (?,?)',providers)
-    conn.executemany('INSERT INTO patients VALUES (?,?)',patients)
-    appts=[(i,providers[0][0],patients[i-1][0],f'2024-01-{i:02d}T10:00') for i in range(1,6)]
-    conn.executemany('INSERT INTO appointments(id,provider_id,patient_id,appt_time) VALUES (?,?,?,?)',appts)
-    sessions=[(i,appts[i-1][0],f'2024-01-{i:02d}T10:00','COMPLETED') for i in range(1,4)]
-    conn.executemany('INSERT INTO sessions(id,appointment_id,start_time,status) VALUES (?,?,?,?)',sessions)
-    feedback=[(i,sessions[i-1][0],5-i) for i in range(1,4)]
-    conn.executemany('INSERT INTO feedback(id,session_id,rating) VALUES (?,?,?)',feedback)
-    conn.commit(); conn.close()
+    p=argparse.ArgumentParser(); p.add_argument('--db',required=True); p.add_argument('--scale',type=float,default=1.0); p.add_argument('--seed',type=int,default=0); args=p.parse_args()
+    populate(args.db, args.seed, args.scale)
 if __name__=='__main__':
     main()
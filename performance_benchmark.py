@@ -1,226 +1,503 @@
 #!/usr/bin/env python3
-"""Performance benchmarking suite for SQLGym corpus."""
+"""Performance benchmarking suite for SQLGym corpus.
+
+Discovers every business database (``business_database_names.json``, falling
+back to ``<subdomain>_normalized.db``) and benchmarks every SQL block of the
+subdomain's ``sample_text_to_sql_tasks.md`` (query classes ``gold``, ``fast``,
+``slow``) and every workflow of its ``workflow_tasks.md`` (``workflow``), read
+from the task catalog. Results are grouped by domain, subdomain and class::
+
+    python3 performance_benchmark.py                      # whole corpus
+    python3 performance_benchmark.py finance healthcare/claims_processing
+    python3 performance_benchmark.py --mode cold --iterations 50 --output - | jq .summary
+
+Each query runs in ``warm`` mode (pooled connection, hot page cache and mmap,
+after ``--warmup`` untimed runs) and ``cold`` mode (a fresh connection per run
+with ``cache_size=0`` and ``mmap_size=0``), up to ``--iterations`` times or
+until ``--time-budget`` seconds are spent. Every query reports p50/p95/p99 with
+distribution-free 95% confidence intervals and the samples outside Tukey's
+fences; ``summary`` in the JSON aggregates them per domain, subdomain, class
+and mode. ``--jobs N`` spreads the databases over N worker processes (each
+database's queries still run one at a time; ``--pin-cpus`` binds every worker to
+its own CPU), and the report does not depend on which job finishes first. Every
+run is also appended to the benchmark history
+(``common/bench_history.py``); ``python3 -m scripts.bench_history compare``
+flags per-query regressions against an earlier run.
+"""
 from __future__ import annotations
 
-import sqlite3
+import argparse
+import hashlib
+import math
+import multiprocessing
+import os
+import sys
 import time
 import json
 import statistics
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
-# Business systems to benchmark
-BENCHMARK_SYSTEMS = [
-    ('customer_service/chatbot_deflection', 'zendesk_ai_support'),
-    ('healthcare/claims_processing', 'anthem_claims_system'),
-    ('finance/consumer_lending_loans_cards', 'chase_consumer_banking'),
-    ('retail_cpg/customer_360_segmentation', 'amazon_customer_insights'),
-    ('energy_manufacturing/carbon_accounting_emissions', 'exxon_carbon_tracking')
-]
-
-# Benchmark queries for different complexity levels
-BENCHMARK_QUERIES = {
-    'simple_lookup': {
-        'zendesk_ai_support': "SELECT * FROM conversations WHERE id = 1000;",
-        'anthem_claims_system': "SELECT * FROM medical_claims WHERE claim_number = 'CLM000001000';",
-        'chase_consumer_banking': "SELECT * FROM customers WHERE customer_id = 'CUST01000';",
-        'amazon_customer_insights': "SELECT * FROM customers WHERE customer_id = 'customer1000';",
-        'exxon_carbon_tracking': "SELECT * FROM facilities WHERE facility_code = 'FAC010';"
-    },
-    'aggregation': {
-        'zendesk_ai_support': "SELECT channel, COUNT(*) FROM conversations GROUP BY channel;",
-        'anthem_claims_system': "SELECT status, COUNT(*) FROM medical_claims GROUP BY status;", 
-        'chase_consumer_banking': "SELECT status, COUNT(*) FROM loans GROUP BY status;",
-        'amazon_customer_insights': "SELECT acquisition_channel, COUNT(*) FROM customers GROUP BY acquisition_channel;",
-        'exxon_carbon_tracking': "SELECT facility_type, COUNT(*) FROM facilities GROUP BY facility_type;"
-    },
-    'complex_join': {
-        'zendesk_ai_support': """
-            SELECT c.channel, COUNT(DISTINCT conv.id) as conversations, COUNT(e.id) as escalations
-            FROM conversations conv 
-            JOIN customers c ON conv.customer_id = c.id
-            LEFT JOIN escalations e ON conv.id = e.conversation_id
-            GROUP BY c.channel;
-        """,
-        'anthem_claims_system': """
-            SELECT p.specialty, COUNT(mc.id) as claims, AVG(cli.paid_amount) as avg_payment
-            FROM medical_claims mc
-            JOIN providers p ON mc.provider_id = p.id  
-            JOIN claim_line_items cli ON mc.id = cli.claim_id
-            WHERE mc.service_date >= DATE('now', '-90 days')
-            GROUP BY p.specialty;
-        """,
-        'chase_consumer_banking': """
-            SELECT lp.product_type, COUNT(l.id) as loans, AVG(l.current_balance) as avg_balance
-            FROM loans l
-            JOIN loan_products lp ON l.loan_product_id = lp.id
-            JOIN customers c ON l.customer_id = c.id
-            WHERE l.status = 'ACTIVE'
-            GROUP BY lp.product_type;
-        """,
-        'amazon_customer_insights': """
-            SELECT cs.name as segment, COUNT(DISTINCT c.id) as customers, AVG(t.total_amount) as avg_transaction
-            FROM customers c
-            JOIN customer_segment_assignments csa ON c.id = csa.customer_id
-            JOIN customer_segments cs ON csa.segment_id = cs.id  
-            LEFT JOIN transactions t ON c.id = t.customer_id
-            GROUP BY cs.name;
-        """,
-        'exxon_carbon_tracking': """
-            SELECT f.facility_type, SUM(ec.co2_equivalent_kg)/1000 as total_co2_tonnes
-            FROM facilities f
-            JOIN emission_sources es ON f.id = es.facility_id
-            JOIN emissions_calculations ec ON es.id = ec.source_id
-            WHERE ec.reporting_period >= '2024-01'
-            GROUP BY f.facility_type;
-        """
+from common.bench_history import DEFAULT_HISTORY, BenchHistory
+from common.catalog import TaskCatalog
+from common.executor import Executor
+from common.workflows import WorkflowExecutor
+
+# Read-only pooled connections; a runaway query fails after 30s instead of hanging
+EXECUTOR = Executor(timeout=30.0, max_rows=None)
+# Cold runs: a fresh connection per run with no mmap and a minimal page cache,
+# so every page goes through the VFS (the OS page cache is not dropped)
+COLD_EXECUTOR = Executor(timeout=30.0, max_rows=None, mmap_size=0, cache_size=0)
+
+DEFAULT_ITERATIONS = 20
+DEFAULT_TIME_BUDGET = 2.0  # seconds of timed runs per query and mode
+MIN_SAMPLES = 3
+PERCENTILES = (50, 95, 99)
+Z_95 = 1.959964
+LOG = sys.stdout
+
+ROOT = Path(__file__).resolve().parent
+BUSINESS_NAMES = ROOT / 'business_database_names.json'
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+# Query classes: plain gold blocks of the task files, the fast/slow rewrites,
+# and whole workflows from a subdomain's workflow_tasks.md
+QUERY_CLASSES = {'': 'gold', 'fast': 'fast', 'slow': 'slow'}
+
+
+def load_business_names() -> dict:
+    """``{domain: {subdomain: business_name}}``; empty if the file is missing or an LFS pointer."""
+    try:
+        with open(BUSINESS_NAMES) as f:
+            return json.load(f)['business_database_names']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def is_built(db_path: Path) -> bool:
+    """True for a real SQLite file (not missing, not an LFS pointer)."""
+    try:
+        with open(db_path, 'rb') as f:
+            return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    except OSError:
+        return False
+
+
+def discover_systems(catalog: TaskCatalog) -> list[dict]:
+    """Every business database: the named ones plus any subdomain with tasks.
+
+    A subdomain whose ``<business_name>_normalized.db`` is not built falls back
+    to ``<subdomain>_normalized.db``, the name ``make build`` writes.
+    """
+    names = {f"{domain}/{sub}": name for domain, subs in load_business_names().items() for sub, name in subs.items()}
+    # <domain>/<subdomain> only; the catalog also holds the sqlgym_production/ copy
+    scopes = sorted(set(names) | {s for s in catalog.scopes('tasks') if s.count('/') == 1})
+    systems = []
+    for scope in scopes:
+        domain, subdomain = scope.split('/')
+        candidates = [names[scope]] if scope in names else []
+        candidates.append(subdomain)
+        db_path = next((ROOT / scope / f"{c}_normalized.db" for c in candidates
+                        if is_built(ROOT / scope / f"{c}_normalized.db")), None)
+        systems.append({
+            'domain': domain,
+            'subdomain': subdomain,
+            'business_name': names.get(scope, subdomain),
+            'db_path': db_path,
+        })
+    return systems
+
+
+def sql_hash(sql: str) -> str:
+    return hashlib.sha256(sql.encode()).hexdigest()[:16]
+
+def discover_workload(scope: str, catalog: TaskCatalog) -> list[dict]:
+    """Every SQL block and workflow of a subdomain's task files."""
+    workload = []
+    for q in catalog.queries(scope):
+        query_class = QUERY_CLASSES.get(q['tag'], q['tag'])
+        workload.append({
+            'class': query_class,
+            'name': f"task{q['task']}.{q['turn']}_{query_class}",
+            'sql': q['sql'],
+            'sql_hash': sql_hash(q['sql']),
+        })
+    steps = catalog.workflow_steps(scope)
+    for workflow in dict.fromkeys(s['workflow'] for s in steps):
+        workflow_steps = [s for s in steps if s['workflow'] == workflow]
+        workload.append({
+            'class': 'workflow',
+            'name': f"workflow_{workflow or 'main'}",
+            'steps': workflow_steps,
+            'sql_hash': sql_hash('\n'.join(s['sql'] for s in workflow_steps)),
+        })
+    return workload
+
+def percentile(sorted_times: list[float], q: float) -> float:
+    """``q``-quantile of sorted samples, linearly interpolated."""
+    pos = (len(sorted_times) - 1) * q
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(sorted_times) - 1)
+    return sorted_times[lo] + (sorted_times[hi] - sorted_times[lo]) * (pos - lo)
+
+def percentile_ci(sorted_times: list[float], q: float) -> list[float]:
+    """Distribution-free ~95% confidence interval of the ``q``-quantile.
+
+    Bounds are the order statistics around rank ``n*q`` given by the normal
+    approximation of the binomial; with few samples they widen to min/max.
+    """
+    n = len(sorted_times)
+    half = Z_95 * math.sqrt(n * q * (1 - q))
+    lo = min(max(math.floor(n * q - half), 1), n)
+    hi = min(max(math.ceil(n * q + half) + 1, 1), n)
+    return [round(sorted_times[lo - 1], 3), round(sorted_times[hi - 1], 3)]
+
+def latency_stats(times: list[float]) -> dict:
+    """Percentiles with confidence intervals; outliers lie beyond Tukey's 1.5 IQR fences."""
+    
+    s = sorted(times)
+    q1, q3 = percentile(s, 0.25), percentile(s, 0.75)
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    stats = {
+        'samples': len(s),
+        'mean_ms': round(statistics.mean(s), 3),
+        'stdev_ms': round(statistics.stdev(s) if len(s) > 1 else 0, 3),
+        'min_ms': round(s[0], 3),
+        'max_ms': round(s[-1], 3),
     }
-}
+    for q in PERCENTILES:
+        stats[f'p{q}_ms'] = round(percentile(s, q / 100), 3)
+        stats[f'p{q}_ci_ms'] = percentile_ci(s, q / 100)
+    stats['outliers_ms'] = [round(t, 3) for t in times if t < low or t > high]
+    stats['samples_ms'] = [round(t, 3) for t in times]  # raw, for regression tests against history
+    return stats
+
+def collect(run_once, iterations: int, time_budget: float, warmup: int) -> tuple[list[float], str | None]:
+    """Timed samples of ``run_once() -> (elapsed_ms, error)``.
+
+    After ``warmup`` untimed calls, runs until ``iterations`` samples are taken
+    or ``time_budget`` seconds are spent, but at least ``MIN_SAMPLES`` times.
+    Stops at the first error.
+    """
+    for _ in range(warmup):
+        _, error = run_once()
+        if error:
+            return [], error
+    times = []
+    deadline = time.perf_counter() + time_budget
+    while len(times) < iterations and (len(times) < MIN_SAMPLES or time.perf_counter() < deadline):
+        elapsed, error = run_once()
+        if error:
+            return times, error
+        times.append(elapsed)
+    return times, None
+
+def _error_text(result: dict) -> str | None:
+    return None if result['ok'] else f"{result['error']['type']}: {result['error']['message']}"
 
-def benchmark_query(db_path: Path, query: str, query_name: str) -> dict:
-    """Benchmark a single query and return performance metrics."""
+def benchmark_query(db_path: Path, query: str, query_name: str, config: dict) -> dict:
+    """Benchmark a single query in each mode and return performance metrics."""
+    
+    last = {}
+    
+    def warm_run():
+        # Pooled connection: page cache and mmap stay hot between runs
+        last['result'] = result = EXECUTOR.execute(db_path, query)
+        return result['elapsed_ms'], _error_text(result)
+    
+    def cold_run():
+        conn = COLD_EXECUTOR.connect(db_path)
+        try:
+            last['result'] = result = COLD_EXECUTOR.run(conn, query)
+        finally:
+            conn.close()
+        return result['elapsed_ms'], _error_text(result)
     
+    metrics = {'query_name': query_name}
+    for mode in config['modes']:
+        run_once = warm_run if mode == 'warm' else cold_run
+        warmup = config['warmup'] if mode == 'warm' else 0
+        times, error = collect(run_once, config['iterations'], config['time_budget'], warmup)
+        if error:
+            return {'query_name': query_name, 'error': f"{mode}: {error}", 'p50_ms': None}
+        metrics[mode] = latency_stats(times)
+    metrics['p50_ms'] = metrics[config['modes'][0]]['p50_ms']
+    
+    # Get query plan
+    query_plan = EXECUTOR.execute(db_path, f"EXPLAIN QUERY PLAN {query}")['rows']
+    
+    metrics.update({
+        'result_count': last['result']['row_count'],
+        'uses_index': any('USING INDEX' in str(step) for step in query_plan),
+        'query_plan': [str(step) for step in query_plan]
+    })
+    return metrics
+
+def benchmark_workflow(db_path: Path, steps: list[dict], query_name: str, config: dict) -> dict:
+    """Benchmark one workflow end to end, with intermediate-table caching off.
+    
+    Warm runs reuse one in-memory copy of the database; cold runs start a
+    fresh ``WorkflowExecutor`` each time, so they include loading the copy.
+    """
+    
+    def run(workflows: WorkflowExecutor) -> tuple[float, str | None]:
+        start = time.perf_counter()
+        result = workflows.run(db_path, steps)
+        if not result['ok']:
+            failed = next(name for name, r in result['steps'].items() if r['status'] == 'error')
+            return 0.0, f"step {failed}: {_error_text(result['steps'][failed])}"
+        return (time.perf_counter() - start) * 1000, None
+    
+    def cold_run():
+        workflows = WorkflowExecutor(max_cached=0)
+        try:
+            start = time.perf_counter()
+            workflows.load(db_path)
+            load_ms = (time.perf_counter() - start) * 1000
+            elapsed, error = run(workflows)
+            return load_ms + elapsed, error
+        finally:
+            workflows.close()
+    
+    metrics = {'query_name': query_name, 'steps': len(steps)}
+    warm = WorkflowExecutor(max_cached=0)
     try:
-        conn = sqlite3.connect(db_path)
-        
-        # Warm up query (run once to load into cache)
-        conn.execute(query).fetchall()
-        
-        # Benchmark runs
-        times = []
-        for _ in range(5):
-            start_time = time.perf_counter()
-            result = conn.execute(query).fetchall()
-            end_time = time.perf_counter()
-            times.append((end_time - start_time) * 1000)  # Convert to milliseconds
-        
-        # Get query plan
-        explain_query = f"EXPLAIN QUERY PLAN {query}"
-        query_plan = conn.execute(explain_query).fetchall()
-        
-        conn.close()
-        
-        return {
-            'query_name': query_name,
-            'avg_time_ms': round(statistics.mean(times), 2),
-            'min_time_ms': round(min(times), 2),
-            'max_time_ms': round(max(times), 2),
-            'std_dev_ms': round(statistics.stdev(times) if len(times) > 1 else 0, 2),
-            'result_count': len(result),
-            'uses_index': any('USING INDEX' in str(step) for step in query_plan),
-            'query_plan': [str(step) for step in query_plan]
-        }
-        
-    except Exception as e:
-        return {
-            'query_name': query_name,
-            'error': str(e),
-            'avg_time_ms': None
-        }
-
-def benchmark_business_system(domain_subdir: str, business_name: str) -> dict:
-    """Benchmark all query types for a business system."""
-    
-    db_path = Path(domain_subdir) / f"{business_name}_normalized.db"
-    
-    if not db_path.exists():
-        return {'error': f'Database not found: {db_path}'}
-    
-    print(f"🔍 Benchmarking {business_name}...")
+        warm.load(db_path)
+        for mode in config['modes']:
+            if mode == 'warm':
+                times, error = collect(lambda: run(warm), config['iterations'], config['time_budget'], config['warmup'])
+            else:
+                times, error = collect(cold_run, config['iterations'], config['time_budget'], 0)
+            if error:
+                return {'query_name': query_name, 'error': f"{mode}: {error}", 'p50_ms': None}
+            metrics[mode] = latency_stats(times)
+    except ValueError as e:  # malformed DAG
+        return {'query_name': query_name, 'error': f"workflow: {e}", 'p50_ms': None}
+    finally:
+        warm.close()
+    metrics['p50_ms'] = metrics[config['modes'][0]]['p50_ms']
+    return metrics
+
+def benchmark_business_system(system: dict, catalog: TaskCatalog, config: dict) -> dict:
+    """Benchmark every discovered query of a business system, grouped by query class."""
+    
+    scope = f"{system['domain']}/{system['subdomain']}"
+    db_path = system['db_path']
+    
+    if db_path is None:
+        return {**system, 'error': f'Database not built: {scope}'}
     
     system_results = {
-        'business_name': business_name,
-        'domain_subdir': domain_subdir,
+        **system,
+        'db_path': str(db_path.relative_to(ROOT)),
         'database_size_mb': round(db_path.stat().st_size / (1024 * 1024), 2),
-        'benchmarks': {}
+        'benchmarks': defaultdict(list)
     }
     
-    for complexity, queries in BENCHMARK_QUERIES.items():
-        if business_name in queries:
-            query = queries[business_name]
-            result = benchmark_query(db_path, query, f"{complexity}_{business_name}")
-            system_results['benchmarks'][complexity] = result
-            
-            if 'error' not in result:
-                print(f"  {complexity}: {result['avg_time_ms']}ms (index: {result['uses_index']})")
-            else:
-                print(f"  {complexity}: ERROR - {result['error']}")
+    for item in discover_workload(scope, catalog):
+        if item['class'] == 'workflow':
+            result = benchmark_workflow(db_path, item['steps'], item['name'], config)
+        else:
+            result = benchmark_query(db_path, item['sql'], item['name'], config)
+        result['sql_hash'] = item['sql_hash']
+        system_results['benchmarks'][item['class']].append(result)
     
+    system_results['benchmarks'] = dict(system_results['benchmarks'])
     return system_results
 
+def log_system(result: dict) -> None:
+    if 'error' in result:
+        log(f"⚠️  {result['error']}")
+        return
+    for query_class, results in result['benchmarks'].items():
+        times = [r['p50_ms'] for r in results if r['p50_ms'] is not None]
+        errors = len(results) - len(times)
+        total = f"{sum(times):.1f}ms total p50" if times else "no successful runs"
+        log(f"  {query_class}: {len(results)} queries, {total}" + (f", {errors} errors" if errors else ""))
+
+def _init_worker(cpus) -> None:
+    """Pin this worker process to the next free CPU of the shared queue."""
+    os.sched_setaffinity(0, {cpus.get()})
+
+def _benchmark_job(system: dict, config: dict) -> dict:
+    # The parent compiled the catalog already; workers only read it
+    catalog = TaskCatalog(refresh=False)
+    try:
+        return benchmark_business_system(system, catalog, config)
+    finally:
+        catalog.close()
+
+def benchmark_parallel(systems: list[dict], config: dict, jobs: int, pin_cpus: bool = False) -> list[dict]:
+    """Benchmark ``systems`` in ``jobs`` worker processes, one database per job.
+    
+    A database's queries always run serially inside one worker, so no two
+    queries share its page cache; different databases run side by side. The
+    largest databases are dispatched first to keep the pool busy until the
+    end, and results come back in the order of ``systems`` however the jobs
+    finish. With ``pin_cpus`` every worker is bound to its own CPU.
+    """
+    
+    initializer, initargs = None, ()
+    ctx = multiprocessing.get_context('spawn')  # no SQLite handles inherited across fork
+    if pin_cpus:
+        cpus = sorted(os.sched_getaffinity(0))
+        jobs = min(jobs, len(cpus))
+        queue = ctx.Queue()
+        for cpu in cpus[:jobs]:
+            queue.put(cpu)
+        initializer, initargs = _init_worker, (queue,)
+    
+    order = sorted(range(len(systems)), key=lambda i: -(systems[i]['db_path'].stat().st_size if systems[i]['db_path'] else 0))
+    results: list = [None] * len(systems)
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=ctx, initializer=initializer, initargs=initargs) as pool:
+        futures = {pool.submit(_benchmark_job, systems[i], config): i for i in order}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            system = systems[i]
+            results[i] = future.result()
+            log(f"🔍 [{done}/{len(systems)}] {system['domain']}/{system['subdomain']}")
+            log_system(results[i])
+    return results
+
+def summarize(all_results: list[dict], modes: list[str]) -> dict:
+    """``{domain: {subdomain: {class: {"queries", "errors", mode: {...}}}}}``.
+    
+    Per mode: the sum and p50/p95/max of the queries' p50 latencies, the
+    slowest query, and how many samples were flagged as outliers.
+    """
+    
+    summary: dict = {}
+    for r in all_results:
+        for query_class, results in r.get('benchmarks', {}).items():
+            ok = [q for q in results if q['p50_ms'] is not None]
+            entry = {'queries': len(results), 'errors': len(results) - len(ok)}
+            for mode in modes:
+                if not ok:
+                    break
+                p50s = sorted(q[mode]['p50_ms'] for q in ok)
+                entry[mode] = {
+                    'total_p50_ms': round(sum(p50s), 3),
+                    'p50_ms': round(percentile(p50s, 0.5), 3),
+                    'p95_ms': round(percentile(p50s, 0.95), 3),
+                    'max_p50_ms': p50s[-1],
+                    'slowest': max(ok, key=lambda q: q[mode]['p50_ms'])['query_name'],
+                    'outlier_samples': sum(len(q[mode]['outliers_ms']) for q in ok)
+                }
+            summary.setdefault(r['domain'], {}).setdefault(r['subdomain'], {})[query_class] = entry
+    return summary
+
+def log(message: str = "") -> None:
+    print(message, file=LOG)
+
 def main():
-    """Run comprehensive performance benchmarks across the corpus."""
+    """Run performance benchmarks across every business database in the corpus."""
+    
+    global LOG
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('scopes', nargs='*', help='Limit to <domain> or <domain>/<subdomain> (default: all)')
+    parser.add_argument('--output', default='performance_benchmark_results.json', help="JSON results file ('-' for stdout)")
+    parser.add_argument('--mode', choices=['warm', 'cold', 'both'], default='both')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='Timed runs per query and mode')
+    parser.add_argument('--time-budget', type=float, default=DEFAULT_TIME_BUDGET,
+                        help=f'Seconds of timed runs per query and mode (at least {MIN_SAMPLES} runs)')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed warm-mode runs per query')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Worker processes; each benchmarks whole databases serially (default: 1, in-process)')
+    parser.add_argument('--pin-cpus', action='store_true', help='Bind each worker to its own CPU (Linux)')
+    parser.add_argument('--top', type=int, default=10, help='Slowest subdomains to list')
+    parser.add_argument('--history', type=Path, default=DEFAULT_HISTORY, help='Benchmark history database')
+    parser.add_argument('--no-history', action='store_true', help='Do not record this run')
+    args = parser.parse_args()
+    if args.output == '-':
+        LOG = sys.stderr  # keep stdout for the JSON
+    if args.pin_cpus and not hasattr(os, 'sched_setaffinity'):
+        parser.error('--pin-cpus needs os.sched_setaffinity (Linux)')
+    config = {
+        'modes': ['warm', 'cold'] if args.mode == 'both' else [args.mode],
+        'iterations': args.iterations,
+        'time_budget': args.time_budget,
+        'warmup': args.warmup,
+        'jobs': max(args.jobs, 1),
+        'pin_cpus': args.pin_cpus,
+    }
     
-    print("📊 SQLGYM PERFORMANCE BENCHMARK SUITE")
-    print("=" * 50)
+    log("📊 SQLGYM PERFORMANCE BENCHMARK SUITE")
+    log("=" * 50)
     
-    all_results = []
+    catalog = TaskCatalog()
+    systems = discover_systems(catalog)
+    if args.scopes:
+        systems = [s for s in systems
+                   if s['domain'] in args.scopes or f"{s['domain']}/{s['subdomain']}" in args.scopes]
     
-    for domain_subdir, business_name in BENCHMARK_SYSTEMS:
-        result = benchmark_business_system(domain_subdir, business_name)
-        all_results.append(result)
+    if config['jobs'] > 1:
+        catalog.close()
+        all_results = benchmark_parallel(systems, config, config['jobs'], config['pin_cpus'])
+    else:
+        all_results = []
+        for system in systems:
+            if system['db_path']:
+                log(f"🔍 Benchmarking {system['domain']}/{system['subdomain']} ({system['db_path'].name})...")
+            result = benchmark_business_system(system, catalog, config)
+            log_system(result)
+            all_results.append(result)
+        catalog.close()
     
     # Generate performance report
-    print("\\n📈 PERFORMANCE SUMMARY")
-    print("=" * 30)
+    log("\n📈 PERFORMANCE SUMMARY")
+    log("=" * 30)
     
+    summary = summarize(all_results, config['modes'])
+    query_classes = sorted({c for subs in summary.values() for classes in subs.values() for c in classes})
     performance_summary = {
+        'schema_version': 2,
         'benchmark_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-        'systems_tested': len(BENCHMARK_SYSTEMS),
-        'query_types': list(BENCHMARK_QUERIES.keys()),
-        'results': all_results,
-        'summary_stats': {}
+        'config': config,
+        'systems_tested': sum(1 for r in all_results if 'benchmarks' in r),
+        'systems_skipped': [f"{r['domain']}/{r['subdomain']}" for r in all_results if 'benchmarks' not in r],
+        'query_classes': query_classes,
+        'summary': summary,
+        'results': all_results
     }
     
-    # Calculate summary statistics
-    simple_times = [r['benchmarks'].get('simple_lookup', {}).get('avg_time_ms') for r in all_results if 'benchmarks' in r]
-    simple_times = [t for t in simple_times if t is not None]
-    
-    aggregation_times = [r['benchmarks'].get('aggregation', {}).get('avg_time_ms') for r in all_results if 'benchmarks' in r]
-    aggregation_times = [t for t in aggregation_times if t is not None]
-    
-    complex_times = [r['benchmarks'].get('complex_join', {}).get('avg_time_ms') for r in all_results if 'benchmarks' in r]
-    complex_times = [t for t in complex_times if t is not None]
-    
-    if simple_times:
-        performance_summary['summary_stats']['simple_lookup'] = {
-            'avg_ms': round(statistics.mean(simple_times), 2),
-            'min_ms': round(min(simple_times), 2),
-            'max_ms': round(max(simple_times), 2)
-        }
-        print(f"Simple Lookups: {statistics.mean(simple_times):.2f}ms avg ({min(simple_times):.2f}-{max(simple_times):.2f}ms)")
-    
-    if aggregation_times:
-        performance_summary['summary_stats']['aggregation'] = {
-            'avg_ms': round(statistics.mean(aggregation_times), 2),
-            'min_ms': round(min(aggregation_times), 2),
-            'max_ms': round(max(aggregation_times), 2)
-        }
-        print(f"Aggregations: {statistics.mean(aggregation_times):.2f}ms avg ({min(aggregation_times):.2f}-{max(aggregation_times):.2f}ms)")
-    
-    if complex_times:
-        performance_summary['summary_stats']['complex_join'] = {
-            'avg_ms': round(statistics.mean(complex_times), 2),
-            'min_ms': round(min(complex_times), 2),
-            'max_ms': round(max(complex_times), 2)
-        }
-        print(f"Complex Joins: {statistics.mean(complex_times):.2f}ms avg ({min(complex_times):.2f}-{max(complex_times):.2f}ms)")
+    for domain, subdomains in sorted(summary.items()):
+        log(f"\n🏢 {domain}")
+        for query_class in query_classes:
+            for mode in config['modes']:
+                groups = [c[query_class][mode] for c in subdomains.values() if mode in c.get(query_class, {})]
+                if groups:
+                    total = sum(g['total_p50_ms'] for g in groups)
+                    worst = max(g['max_p50_ms'] for g in groups)
+                    log(f"  {query_class:<8} {mode}: {total:.1f}ms p50 total, worst query {worst:.1f}ms, "
+                        f"{len(groups)} subdomains")
     
-    # Save detailed results
-    with open('performance_benchmark_results.json', 'w') as f:
-        json.dump(performance_summary, f, indent=2)
-    
-    print(f"\\n✅ Benchmark completed!")
-    print(f"📊 Detailed results saved to: performance_benchmark_results.json")
+    # The subdomains training jobs will feel first
+    mode = config['modes'][0]
+    ranking = sorted(((sum(c[mode]['total_p50_ms'] for c in classes.values() if mode in c), f"{domain}/{sub}", classes)
+                      for domain, subs in summary.items() for sub, classes in subs.items()), reverse=True)
+    if ranking:
+        log(f"\n🐢 SLOWEST SUBDOMAINS ({mode} p50)")
+        for total, scope, classes in ranking[:args.top]:
+            worst = max((c[mode] for c in classes.values() if mode in c), key=lambda g: g['max_p50_ms'], default=None)
+            if worst:
+                log(f"  {scope}: {total:.1f}ms (slowest: {worst['slowest']}, {worst['max_p50_ms']}ms)")
     
-    # Performance rating
-    if simple_times and statistics.mean(simple_times) < 10:
-        print(f"🏆 EXCELLENT: Simple queries under 10ms average")
-    if aggregation_times and statistics.mean(aggregation_times) < 100:
-        print(f"🏆 EXCELLENT: Aggregation queries under 100ms average")
-    if complex_times and statistics.mean(complex_times) < 500:
-        print(f"🏆 EXCELLENT: Complex joins under 500ms average")
+    # Save detailed results
+    if args.output == '-':
+        json.dump(performance_summary, sys.stdout, indent=2, default=str)
+        print()
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(performance_summary, f, indent=2, default=str)
+        log(f"\n✅ Benchmark completed!")
+        log(f"📊 Detailed results saved to: {args.output}")
     
-    print(f"\\n🎯 SQLGym Performance: PRODUCTION READY!")
+    if not args.no_history:
+        history = BenchHistory(args.history)
+        run_id = history.record(performance_summary)
+        history.close()
+        log(f"🗂️  Recorded as run {run_id} in {args.history}; compare with `python3 -m scripts.bench_history compare`")
     
     return performance_summary
 
@@ -10,6 +10,8 @@ import subprocess
 import sys
 from pathlib import Path
 
+from common.steps import run_script
+
 def load_business_names():
     """Load business database name mappings."""
     with open('business_database_names.json', 'r') as f:
@@ -76,17 +78,11 @@ def create_database(domain, subdomain, business_name, db_type):
         if os.path.exists(populate_script):
             print(f"  📊 Populating data...")
             
-            # Make script executable
-            os.chmod(populate_script, 0o755)
-            
-            # Run population script
-            result = subprocess.run([
-                'python3', populate_script, 
-                '--db', db_file
-            ], capture_output=True, text=True, cwd='.')
+            # Run population script in this interpreter
+            returncode, _, _, stderr = run_script(populate_script, ['--db', db_file])
             
-            if result.returncode != 0:
-                print(f"  ⚠️  Population script had issues: {result.stderr}")
+            if returncode != 0:
+                print(f"  ⚠️  Population script had issues: {stderr}")
                 # Don't return False here - database still exists with schema
             else:
                 print(f"  ✅ Data populated successfully")
@@ -1,8 +1,27 @@
 #!/usr/bin/env python3
 """Build denormalized product_catalog from normalized tables."""
 from __future__ import annotations
-import argparse, sqlite3
+import argparse
 from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.bulkload import bulk_load
+from common.denormalize import attach, materialize
+
+SCHEMA = """
+DROP TABLE IF EXISTS product_catalog;
+CREATE TABLE product_catalog (
+    product_id INTEGER PRIMARY KEY,
+    sku TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    category_name TEXT NOT NULL,
+    supplier_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    price_cents INTEGER NOT NULL
+);
+CREATE INDEX idx_pc_category ON product_catalog(category_name);
+CREATE INDEX idx_pc_supplier ON product_catalog(supplier_name);
+"""
 
 
 def main() -> None:
@@ -10,35 +29,14 @@ def main() -> None:
     p.add_argument('--db', required=True)
     p.add_argument('--source', default=str(Path(__file__).with_name('assortment_catalog_normalized.db')))
     args = p.parse_args()
-    src = sqlite3.connect(args.source)
-    dst = sqlite3.connect(args.db)
-    dst.executescript("""
-    DROP TABLE IF EXISTS product_catalog;
-    CREATE TABLE product_catalog (
-        product_id INTEGER PRIMARY KEY,
-        sku TEXT NOT NULL,
-        product_name TEXT NOT NULL,
-        category_name TEXT NOT NULL,
-        supplier_name TEXT NOT NULL,
-        status TEXT NOT NULL,
-        price_cents INTEGER NOT NULL
-    );
-    """)
-    rows = src.execute(
-        """
-        SELECT p.id, p.sku, p.name, c.name, s.name, p.status, p.price_cents
-        FROM products p
-        JOIN categories c ON p.category_id=c.id
-        JOIN suppliers s ON p.supplier_id=s.id
-        """
-    ).fetchall()
-    dst.executemany("INSERT INTO product_catalog VALUES (?,?,?,?,?,?,?)", rows)
-    dst.executescript("""
-    CREATE INDEX idx_pc_category ON product_catalog(category_name);
-    CREATE INDEX idx_pc_supplier ON product_catalog(supplier_name);
-    """)
-    dst.commit()
-    src.close(); dst.close()
+    with bulk_load(args.db, schema=SCHEMA) as dst:
+        with attach(dst, args.source):
+            materialize(dst, "product_catalog", """
+            SELECT p.id, p.sku, p.name, c.name, s.name, p.status, p.price_cents
+            FROM products p
+            JOIN categories c ON p.category_id=c.id
+            JOIN suppliers s ON p.supplier_id=s.id
+            """)
 
 
 if __name__ == '__main__':
@@ -3,13 +3,13 @@
 from __future__ import annotations
 
 import argparse
-import sqlite3
 import json
 from pathlib import Path
 from datetime import datetime
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import batch
+from common.bulkload import bulk_load
+from common.denormalize import attach, materialize
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -17,12 +17,10 @@ def main() -> None:
     parser.add_argument("--denormalized-db", required=True)
     args = parser.parse_args()
     
-    norm_conn = sqlite3.connect(args.normalized_db)
-    norm_conn.row_factory = sqlite3.Row
-    denorm_conn = sqlite3.connect(args.denormalized_db)
+    with bulk_load(args.denormalized_db) as denorm_conn, attach(denorm_conn, args.normalized_db):
     
-    print("Building customer 360 profiles...")
-    profile_query = """
+        print("Building customer 360 profiles...")
+        profile_query = """
     WITH customer_metrics AS (
         SELECT 
             c.id as customer_id,
@@ -112,18 +110,10 @@ def main() -> None:
     LEFT JOIN segment_assignments sa ON cm.customer_id = sa.customer_id
     """
     
-    profile_data = []
-    for row in norm_conn.execute(profile_query):
-        profile_data.append(tuple(row))
+        materialize(denorm_conn, "customer_360_profile", profile_query)
     
-    for chunk in batch(profile_data, 500):
-        denorm_conn.executemany("""
-            INSERT INTO customer_360_profile VALUES 
-            (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-        """, chunk)
-    
-    print("Building segment performance metrics...")
-    segment_query = """
+        print("Building segment performance metrics...")
+        segment_query = """
     SELECT 
         cs.id as segment_id,
         cs.name as segment_name,
@@ -143,17 +133,10 @@ def main() -> None:
     GROUP BY cs.id, strftime('%Y-%m', t.transaction_date)
     """
     
-    segment_data = []
-    for row in norm_conn.execute(segment_query):
-        segment_data.append(tuple(row))
-    
-    denorm_conn.executemany("""
-        INSERT INTO segment_performance VALUES 
-        (?,?,?,?,?,?,?,?,?,?,?)
-    """, segment_data)
+        materialize(denorm_conn, "segment_performance", segment_query)
     
-    print("Building channel attribution...")
-    attribution_query = """
+        print("Building channel attribution...")
+        attribution_query = """
     SELECT 
         t.customer_id,
         t.channel,
@@ -166,17 +149,10 @@ def main() -> None:
     GROUP BY t.customer_id, t.channel
     """
     
-    attribution_data = []
-    for row in norm_conn.execute(attribution_query):
-        attribution_data.append(tuple(row))
+        materialize(denorm_conn, "channel_attribution", attribution_query)
     
-    denorm_conn.executemany("""
-        INSERT INTO channel_attribution VALUES 
-        (?,?,?,?,?,?,?)
-    """, attribution_data)
-    
-    print("Building behavioral cohorts...")
-    cohort_query = """
+        print("Building behavioral cohorts...")
+        cohort_query = """
     SELECT 
         strftime('%Y-%m', c.registration_date) as cohort_month,
         c.acquisition_channel,
@@ -216,27 +192,17 @@ def main() -> None:
     GROUP BY strftime('%Y-%m', c.registration_date), c.acquisition_channel
     """
     
-    cohort_data = []
-    for row in norm_conn.execute(cohort_query):
-        cohort_data.append(tuple(row))
-    
-    denorm_conn.executemany("""
-        INSERT INTO behavioral_cohorts VALUES 
-        (?,?,?,?,?,?,?,?,?)
-    """, cohort_data)
+        materialize(denorm_conn, "behavioral_cohorts", cohort_query)
     
-    # Create indexes
-    print("Creating indexes...")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_customer_profile_clv ON customer_360_profile(customer_lifetime_value DESC)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_customer_profile_churn ON customer_360_profile(churn_risk_score DESC)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_segment_performance_month ON segment_performance(month)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_channel_attribution_revenue ON channel_attribution(attributed_revenue DESC)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_cohorts_month ON behavioral_cohorts(cohort_month)")
+        # Create indexes
+        print("Creating indexes...")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_customer_profile_clv ON customer_360_profile(customer_lifetime_value DESC)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_customer_profile_churn ON customer_360_profile(churn_risk_score DESC)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_segment_performance_month ON segment_performance(month)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_channel_attribution_revenue ON channel_attribution(attributed_revenue DESC)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_cohorts_month ON behavioral_cohorts(cohort_month)")
     
-    denorm_conn.commit()
-    denorm_conn.close()
-    norm_conn.close()
-    print("Done!")
+        print("Done!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -8,7 +8,8 @@ from pathlib import Path
 from datetime import datetime
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
-from common.utils import batch, get_rng
+from common.utils import batch, table_rng
+from common.bulkload import bulk_load
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -16,14 +17,12 @@ def main() -> None:
     parser.add_argument("--denormalized-db", required=True)
     args = parser.parse_args()
     
-    rng = get_rng(42)
-    
     norm_conn = sqlite3.connect(args.normalized_db)
     norm_conn.row_factory = sqlite3.Row
-    denorm_conn = sqlite3.connect(args.denormalized_db)
+    with bulk_load(args.denormalized_db) as denorm_conn:
     
-    print("Building seller compliance summary...")
-    compliance_query = """
+        print("Building seller compliance summary...")
+        compliance_query = """
     SELECT
         s.id as seller_id,
         s.seller_name,
@@ -42,37 +41,37 @@ def main() -> None:
     GROUP BY s.id
     """
     
-    compliance_data = []
-    for row in norm_conn.execute(compliance_query):
-        # Calculate compliance score
-        violations = row['total_violations'] or 0
-        critical_violations = row['critical_violations'] or 0
-        rating = row['performance_rating'] or 3.0
+        compliance_data = []
+        for row in norm_conn.execute(compliance_query):
+            # Calculate compliance score
+            violations = row['total_violations'] or 0
+            critical_violations = row['critical_violations'] or 0
+            rating = row['performance_rating'] or 3.0
         
-        compliance_score = max(0, 100 - (violations * 5) - (critical_violations * 15) + (rating - 3) * 10)
+            compliance_score = max(0, 100 - (violations * 5) - (critical_violations * 15) + (rating - 3) * 10)
         
-        # Determine risk level
-        if compliance_score < 50 or critical_violations > 2:
-            risk_level = 'HIGH'
-        elif compliance_score < 70 or violations > 5:
-            risk_level = 'MEDIUM'
-        else:
-            risk_level = 'LOW'
+            # Determine risk level
+            if compliance_score < 50 or critical_violations > 2:
+                risk_level = 'HIGH'
+            elif compliance_score < 70 or violations > 5:
+                risk_level = 'MEDIUM'
+            else:
+                risk_level = 'LOW'
         
-        compliance_data.append((
-            row['seller_id'], row['seller_name'], row['business_type'],
-            row['verification_status'], rating, violations, critical_violations,
-            row['open_violations'] or 0, row['last_violation_date'],
-            compliance_score, risk_level, row['enforcement_actions'] or 0
-        ))
+            compliance_data.append((
+                row['seller_id'], row['seller_name'], row['business_type'],
+                row['verification_status'], rating, violations, critical_violations,
+                row['open_violations'] or 0, row['last_violation_date'],
+                compliance_score, risk_level, row['enforcement_actions'] or 0
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO seller_compliance_summary VALUES 
         (?,?,?,?,?,?,?,?,?,?,?,?)
     """, compliance_data)
     
-    print("Building daily compliance metrics...")
-    daily_query = """
+        print("Building daily compliance metrics...")
+        daily_query = """
     SELECT
         DATE(pv.violation_date) as date,
         COUNT(pv.id) as new_violations,
@@ -83,32 +82,31 @@ def main() -> None:
     GROUP BY DATE(pv.violation_date)
     """
     
-    daily_data = []
-    for row in norm_conn.execute(daily_query):
-        resolved_violations = rng.randint(0, row['new_violations'])
-        compliance_rate = 1 - (row['new_violations'] / max(100, row['new_violations'] + 100))
-        avg_resolution_time = rng.uniform(5, 30)
+        daily_data = []
+        rng = table_rng(42, "daily_compliance_metrics")
+        for row in norm_conn.execute(daily_query):
+            resolved_violations = rng.randint(0, row['new_violations'])
+            compliance_rate = 1 - (row['new_violations'] / max(100, row['new_violations'] + 100))
+            avg_resolution_time = rng.uniform(5, 30)
         
-        daily_data.append((
-            row['date'], row['new_violations'], resolved_violations,
-            row['auto_detected'] or 0, row['reported'] or 0,
-            avg_resolution_time, compliance_rate
-        ))
+            daily_data.append((
+                row['date'], row['new_violations'], resolved_violations,
+                row['auto_detected'] or 0, row['reported'] or 0,
+                avg_resolution_time, compliance_rate
+            ))
     
-    denorm_conn.executemany("""
+        denorm_conn.executemany("""
         INSERT INTO daily_compliance_metrics VALUES 
         (?,?,?,?,?,?,?)
     """, daily_data)
     
-    # Create indexes
-    print("Creating indexes...")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_seller_compliance_risk ON seller_compliance_summary(risk_level)")
-    denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_compliance_date ON daily_compliance_metrics(date)")
+        # Create indexes
+        print("Creating indexes...")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_seller_compliance_risk ON seller_compliance_summary(risk_level)")
+        denorm_conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_compliance_date ON daily_compliance_metrics(date)")
     
-    denorm_conn.commit()
-    denorm_conn.close()
-    norm_conn.close()
-    print("Done!")
+        norm_conn.close()
+        print("Done!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
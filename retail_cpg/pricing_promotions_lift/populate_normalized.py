@@ -1,24 +1,27 @@
 #!/usr/bin/env python3
 """Populate pricing promotions lift normalized schema."""
 from __future__ import annotations
-import argparse, sqlite3
+import argparse
 from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from common.bulkload import bulk_load
+from common.utils import require_unscaled
 SCALE_PRODUCTS = 1000
 SCALE_RECEIPTS = 50000
 
+def populate(db: str, seed: int = 42, scale: float = 1.0) -> None:
+    require_unscaled(scale, "pricing_promotions_lift")
+    with bulk_load(db, schema=Path('schema_normalized.sql').read_text()):
+        pass  # TODO: populate tables
+
+
 def main() -> None:
     p = argparse.ArgumentParser()
     p.add_argument('--db', required=True)
+    p.add_argument('--scale', type=float, default=1.0)
+    p.add_argument('--seed', type=int, default=42)
     args = p.parse_args()
-    conn = sqlite3.connect(args.db)
-    conn.executescript(Path('schema_normalized.sql').read_text())
-    # TODO: populate tables
-    # create indexes after bulk insert
-    conn.executescript('''
-    CREATE INDEX idx_price_product ON price_books(product_id);
-    CREATE INDEX idx_promo_prod_date ON promos(product_id, start_date);
-    CREATE INDEX idx_receipt_prod_date ON receipts(product_id, sale_date);
-    ''')
-    conn.commit(); conn.close()
+    populate(args.db, args.seed, args.scale)
 if __name__ == '__main__':
     main()
@@ -1,11 +1,12 @@
 #!/usr/bin/env python3
 """Execute data type audit across all schemas."""
 
-import sqlite3
 import os
 import json
 from collections import defaultdict, Counter
 
+from common.schema_catalog import SchemaCatalog
+
 def main():
     print("🔍 DATA TYPE DIVERSITY AUDIT")
     print("=" * 50)
@@ -18,6 +19,7 @@ def main():
     domains = ['customer_service', 'finance', 'retail_cpg', 'healthcare', 'energy_manufacturing']
     total_columns = 0
     total_tables = 0
+    schemas = SchemaCatalog()
     
     for domain in domains:
         if not os.path.exists(domain):
@@ -42,23 +44,18 @@ def main():
             db_path = os.path.join(subdomain_path, db_files[0])
             
             try:
-                conn = sqlite3.connect(db_path)
-                
-                # Get table schemas
-                tables = conn.execute("""
-                    SELECT name FROM sqlite_master 
-                    WHERE type='table' AND name NOT LIKE 'sqlite_%' AND name != 'evidence_kv'
-                """).fetchall()
+                # Table schemas
+                tables = [
+                    t for t in schemas.describe(db_path)['tables']
+                    if t['kind'] == 'table' and t['name'] != 'evidence_kv'
+                ]
                 
                 subdomain_types = set()
                 subdomain_columns = 0
                 
-                for (table_name,) in tables:
-                    # Get column info
-                    columns = conn.execute(f"PRAGMA table_info({table_name})").fetchall()
-                    
-                    for col in columns:
-                        cid, name, data_type, notnull, default_value, pk = col
+                for table in tables:
+                    for col in table['columns']:
+                        data_type, notnull, default_value, pk = col['type'], col['not_null'], col['default'], col['primary_key']
                         
                         # Normalize data type
                         clean_type = data_type.upper().split('(')[0].strip()
@@ -88,8 +85,6 @@ def main():
                 print(f"  📁 {subdomain}: {len(tables)} tables, {subdomain_columns} columns")
                 print(f"     Types: {sorted(subdomain_types)}")
                 
-                conn.close()
-                
             except Exception as e:
                 print(f"  ❌ Error analyzing {subdomain}: {e}")
                 continue
@@ -0,0 +1,104 @@
+"""Measure query throughput of ``common.async_executor`` under many clients.
+
+``--clients`` coroutines (default 256) each issue ``--queries`` small point
+lookups against randomly chosen databases, timed for:
+
+naive  ``asyncio.to_thread`` with a fresh ``sqlite3.connect`` per query, as a
+       rollout harness without an executor would do
+async  ``AsyncExecutor``: pooled per-thread read-only connections with
+       backpressure and round-robin scheduling across databases
+
+Databases default to every built ``*/*/*_normalized.db`` (LFS pointers are
+skipped).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import pathlib
+import random
+import sqlite3
+import time
+
+from common.async_executor import AsyncExecutor
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+def built_databases() -> list[pathlib.Path]:
+    dbs = []
+    for path in sorted(ROOT.glob("*/*/*_normalized.db")):
+        with open(path, "rb") as fh:
+            if fh.read(len(SQLITE_HEADER)) == SQLITE_HEADER:
+                dbs.append(path)
+    return dbs
+
+
+def lookup_targets(dbs: list[pathlib.Path]) -> list[tuple[str, str, int]]:
+    """``(db, table, max rowid)`` for the largest table of each database."""
+    targets = []
+    for db in dbs:
+        conn = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+        try:
+            tables = [t for (t,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+            sizes = {t: conn.execute(f'SELECT MAX(rowid) FROM "{t}"').fetchone()[0] or 0 for t in tables}
+        finally:
+            conn.close()
+        table = max(sizes, key=sizes.get, default=None)
+        if table and sizes[table]:
+            targets.append((str(db), table, sizes[table]))
+    return targets
+
+
+def naive_query(db: str, sql: str, params: tuple) -> list[tuple]:
+    conn = sqlite3.connect(db)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+async def run_clients(targets, clients: int, queries: int, seed: int, query) -> float:
+    async def client(rng: random.Random) -> None:
+        for _ in range(queries):
+            db, table, top = rng.choice(targets)
+            await query(db, f'SELECT * FROM "{table}" WHERE rowid = ?', (rng.randint(1, top),))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(random.Random(seed + i)) for i in range(clients)))
+    return clients * queries / (time.perf_counter() - start)
+
+
+async def bench(targets, args) -> dict[str, float]:
+    async def naive(db, sql, params):
+        return await asyncio.to_thread(naive_query, db, sql, params)
+
+    results = {"naive": await run_clients(targets, args.clients, args.queries, args.seed, naive)}
+    async with AsyncExecutor(workers=args.workers, max_pending=args.clients) as ex:
+        results["async"] = await run_clients(targets, args.clients, args.queries, args.seed, ex.execute)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dbs", nargs="*", type=pathlib.Path, help="Databases to query (default: built normalized dbs)")
+    parser.add_argument("--clients", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=50, help="Queries per client")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    targets = lookup_targets(args.dbs or built_databases())
+    if not targets:
+        print("no built databases found; run `make build` or pass db paths")
+        return
+
+    results = asyncio.run(bench(targets, args))
+    print(f"{len(targets)} databases, {args.clients} clients x {args.queries} queries, {args.workers} workers")
+    for name, qps in results.items():
+        print(f"{name:<6} {qps:10.0f} queries/s")
+    print(f"speedup x{results['async'] / results['naive']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
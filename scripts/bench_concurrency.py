@@ -0,0 +1,246 @@
+"""Read throughput of one database under many concurrent readers.
+
+``performance_benchmark.py`` times one query at a time on one connection; a
+served database sees many readers at once. This runs a mixed workload — the
+gold and fast SQL of the subdomain's task files, as discovered by
+``performance_benchmark.discover_workload`` — from N threads and from N
+processes, each with its own connection, for N = 1, 2, 4, ... 64::
+
+    python3 -m scripts.bench_concurrency finance/payments_acquiring
+    python3 -m scripts.bench_concurrency path/to/db.sqlite --max-clients 16 --json
+
+The database is copied twice into a temporary directory, once in WAL mode and
+once in rollback-journal (``DELETE``) mode, so both see identical pages. For
+every journal mode, client kind and N it reports aggregate queries/sec, p50 and
+p99 latency, and scaling efficiency ``qps(N) / (N * qps(1))``. Queries slower
+than ``--max-query-ms`` on a single connection are left out so one scan cannot
+fill the whole window. Without a scope the largest built database is used.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import pathlib
+import queue
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from common.catalog import TaskCatalog
+from performance_benchmark import ROOT, discover_systems, discover_workload, percentile
+
+JOURNAL_MODES = ("wal", "delete")
+CLASSES = ("gold", "fast")
+STARTUP_TIMEOUT = 60.0  # seconds for every client to connect and reach the barrier
+
+
+def prepare(db: pathlib.Path, directory: str, journal_mode: str) -> str:
+    """Copy ``db`` into ``directory`` with ``journal_mode``; return the copy's path."""
+    path = os.path.join(directory, f"{journal_mode}.db")
+    src = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+    dst = sqlite3.connect(path)
+    try:
+        src.backup(dst)
+        mode = dst.execute(f"PRAGMA journal_mode={journal_mode}").fetchone()[0]
+        if mode != journal_mode:
+            raise RuntimeError(f"could not switch {path} to journal_mode={journal_mode} (got {mode})")
+    finally:
+        src.close()
+        dst.close()
+    return path
+
+
+def probe(path: str, workload: list[str], max_query_ms: float) -> tuple[list[str], int]:
+    """Queries that succeed within ``max_query_ms`` on one connection, and how many were dropped."""
+    conn = sqlite3.connect(path)
+    kept = []
+    try:
+        for sql in workload:
+            start = time.perf_counter()
+            try:
+                conn.execute(sql).fetchall()
+            except sqlite3.Error:
+                continue
+            if (time.perf_counter() - start) * 1000 <= max_query_ms:
+                kept.append(sql)
+    finally:
+        conn.close()
+    return kept, len(workload) - len(kept)
+
+
+def client(path: str, workload: list[str], seed: int, duration: float, barrier) -> tuple[float, float, list[float]]:
+    """Run random workload queries for ``duration`` seconds after ``barrier``.
+
+    Returns ``(start, end, latencies in ms)``; ``start``/``end`` are
+    ``perf_counter`` readings, a system-wide clock shared with other processes.
+    """
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA query_only=ON")
+    rng = random.Random(seed)
+    latencies = []
+    try:
+        barrier.wait()
+        begin = time.perf_counter()
+        deadline = begin + duration
+        while time.perf_counter() < deadline:
+            sql = rng.choice(workload)
+            start = time.perf_counter()
+            conn.execute(sql).fetchall()
+            latencies.append((time.perf_counter() - start) * 1000)
+        end = time.perf_counter()
+    finally:
+        conn.close()
+    return begin, end, latencies
+
+
+def _process_client(path, workload, seed, duration, barrier, results) -> None:
+    results.put(client(path, workload, seed, duration, barrier))
+
+
+def run_threads(path: str, workload: list[str], n: int, duration: float, seed: int) -> list[tuple]:
+    barrier = threading.Barrier(n, timeout=STARTUP_TIMEOUT)
+    results: list = [None] * n
+    errors: list[BaseException] = []
+
+    def target(i: int) -> None:
+        try:
+            results[i] = client(path, workload, seed + i, duration, barrier)
+        except BaseException as e:
+            barrier.abort()  # release the others instead of leaving them at the barrier
+            errors.append(e)
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise RuntimeError(f"{len(errors)} of {n} client threads failed: {errors[0]!r}")
+    return results
+
+
+def run_processes(path: str, workload: list[str], n: int, duration: float, seed: int) -> list[tuple]:
+    ctx = multiprocessing.get_context("spawn")
+    barrier, results = ctx.Barrier(n, timeout=STARTUP_TIMEOUT), ctx.Queue()
+    procs = [
+        ctx.Process(target=_process_client, args=(path, workload, seed + i, duration, barrier, results))
+        for i in range(n)
+    ]
+    for p in procs:
+        p.start()
+    collected = []
+    deadline = time.perf_counter() + STARTUP_TIMEOUT + duration * 2
+    try:
+        # Drain before join, or large results deadlock; a dead client must not hang the run
+        while len(collected) < n:
+            try:
+                collected.append(results.get(timeout=1.0))
+            except queue.Empty:
+                failed = [p.exitcode for p in procs if p.exitcode not in (None, 0)]
+                if failed or time.perf_counter() > deadline:
+                    raise RuntimeError(
+                        f"{n - len(collected)} of {n} client processes did not report"
+                        + (f" (exit codes {failed})" if failed else "")
+                    )
+    finally:
+        for p in procs:
+            if len(collected) < n:
+                p.terminate()
+            p.join()
+    return collected
+
+
+def measure(runs: list[tuple], n: int, base_qps: float | None) -> dict:
+    """Aggregate ``client`` results; qps over the measured window from the first start to the last end."""
+    s = sorted(t for _, _, latencies in runs for t in latencies)
+    elapsed = max(end for _, end, _ in runs) - min(start for start, _, _ in runs)
+    qps = len(s) / elapsed
+    return {
+        "clients": n,
+        "queries": len(s),
+        "elapsed_s": round(elapsed, 3),
+        "qps": round(qps, 1),
+        "p50_ms": round(percentile(s, 0.50), 3) if s else None,
+        "p99_ms": round(percentile(s, 0.99), 3) if s else None,
+        "efficiency": round(qps / (n * base_qps), 3) if base_qps else 1.0,
+    }
+
+
+def pick_database(scope: str | None) -> tuple[pathlib.Path, str] | None:
+    """``(db path, task scope)`` for a scope, a db path, or the largest built db."""
+    if scope and pathlib.Path(scope).is_file():
+        path = pathlib.Path(scope).resolve()
+        return path, path.relative_to(ROOT).parent.as_posix() if path.is_relative_to(ROOT) else ""
+    catalog = TaskCatalog()
+    try:
+        systems = [s for s in discover_systems(catalog) if s["db_path"]]
+    finally:
+        catalog.close()
+    if scope:
+        systems = [s for s in systems if f"{s['domain']}/{s['subdomain']}" == scope]
+    if not systems:
+        return None
+    system = max(systems, key=lambda s: s["db_path"].stat().st_size)
+    return system["db_path"], f"{system['domain']}/{system['subdomain']}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("scope", nargs="?", help="<domain>/<subdomain> or a db path (default: the largest built db)")
+    parser.add_argument("--max-clients", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=2.0, help="Seconds per journal mode, client kind and N")
+    parser.add_argument("--max-query-ms", type=float, default=100.0, help="Drop workload queries slower than this")
+    parser.add_argument("--classes", default=",".join(CLASSES), help="Query classes in the workload")
+    parser.add_argument("--kinds", default="threads,processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+    out = sys.stderr if args.json else sys.stdout
+
+    picked = pick_database(args.scope)
+    if picked is None:
+        print("no built database found; run `make build` or pass a db path")
+        return
+    db, scope = picked
+    classes = args.classes.split(",")
+    catalog = TaskCatalog()
+    try:
+        workload = [q["sql"] for q in discover_workload(scope, catalog) if q["class"] in classes] if scope else []
+    finally:
+        catalog.close()
+    if not workload:
+        print(f"no {'/'.join(classes)} queries for {scope or db}")
+        return
+
+    levels = [1 << i for i in range(args.max_clients.bit_length()) if 1 << i <= args.max_clients]
+    runners = {"threads": run_threads, "processes": run_processes}
+    results = {"db": str(db), "scope": scope, "duration": args.duration, "modes": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for journal_mode in JOURNAL_MODES:
+            path = prepare(db, tmp, journal_mode)
+            queries, dropped = probe(path, workload, args.max_query_ms)
+            if not queries:
+                print(f"every query is slower than {args.max_query_ms}ms; raise --max-query-ms")
+                return
+            print(f"{journal_mode}: {len(queries)} queries ({dropped} dropped) against {db.name}", file=out)
+            for kind in args.kinds.split(","):
+                rows, base = [], None
+                for n in levels:
+                    row = measure(runners[kind](path, queries, n, args.duration, args.seed), n, base)
+                    base = base or row["qps"]
+                    rows.append(row)
+                    print(f"  {kind:<9} N={n:<3} {row['qps']:10.1f} q/s  p50 {row['p50_ms']}ms  "
+                          f"p99 {row['p99_ms']}ms  efficiency {row['efficiency']:.2f}", file=out)
+                results["modes"].setdefault(journal_mode, {})[kind] = rows
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark denormalized builds: in-engine ``INSERT ... SELECT`` vs Python round trips.
+
+Builds the normalized db of a few of the larger subdomains at ``--scale`` in a
+temporary directory, then runs each subdomain's ``populate_denormalized.py``
+twice against a copy of it: once as written (``common.denormalize.materialize``)
+and once with ``materialize`` swapped for ``round_trip``, which fetches every
+row into Python and re-inserts it with ``executemany``. The repo's databases
+are not touched.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import pathlib
+import shutil
+import sqlite3
+import statistics
+import tempfile
+from typing import Iterator
+
+from common import denormalize
+from common.steps import call_entry, run_script
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+DEFAULT_SUBDOMAINS = [
+    "customer_service/returns_rma_support",
+    "customer_service/chatbot_deflection",
+    "retail_cpg/customer_360_segmentation",
+    "retail_cpg/digital_ads_attribution",
+    "healthcare/claims_processing",
+    "energy_manufacturing/scada_telemetry_timeseries",
+]
+
+
+@contextlib.contextmanager
+def round_trips() -> Iterator[None]:
+    saved = denormalize.materialize
+    denormalize.materialize = denormalize.round_trip
+    try:
+        yield
+    finally:
+        denormalize.materialize = saved
+
+
+def denorm_argv(script: pathlib.Path, norm_db: pathlib.Path, denorm_db: pathlib.Path) -> list[str]:
+    """Command line for the script's own flavour of arguments."""
+    source = script.read_text(encoding="utf-8")
+    if "--normalized-db" in source:
+        return ["--normalized-db", str(norm_db), "--denormalized-db", str(denorm_db)]
+    return ["--source", str(norm_db), "--db", str(denorm_db)]
+
+
+def build_normalized(subdir: pathlib.Path, db: pathlib.Path, scale: float) -> None:
+    conn = sqlite3.connect(db)
+    conn.executescript((subdir / "schema_normalized.sql").read_text(encoding="utf-8"))
+    conn.close()
+    code, _, _, tail = call_entry(subdir / "populate_normalized.py", "populate", cwd=subdir, db=str(db), scale=scale)
+    if code:
+        raise RuntimeError(f"{subdir.name}: populate_normalized failed\n{tail}")
+
+
+def time_denormalize(subdir: pathlib.Path, norm_db: pathlib.Path, tmp: pathlib.Path) -> float:
+    denorm_db = tmp / f"{subdir.name}_denormalized.db"
+    denorm_db.unlink(missing_ok=True)
+    schema = subdir / "schema_denormalized.sql"
+    if schema.exists():
+        conn = sqlite3.connect(denorm_db)
+        conn.executescript(schema.read_text(encoding="utf-8"))
+        conn.close()
+    script = subdir / "populate_denormalized.py"
+    code, seconds, _, tail = run_script(script, denorm_argv(script, norm_db, denorm_db), cwd=subdir)
+    if code:
+        raise RuntimeError(f"{subdir.name}: populate_denormalized failed\n{tail}")
+    return seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("subdomains", nargs="*", default=DEFAULT_SUBDOMAINS, help="<domain>/<subdomain> paths")
+    parser.add_argument("--scale", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (median is reported)")
+    args = parser.parse_args()
+
+    total_trip = total_engine = 0.0
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        for name in args.subdomains:
+            subdir = ROOT / name
+            pristine = tmp / f"{subdir.name}_pristine.db"
+            try:
+                build_normalized(subdir, pristine, args.scale)
+            except RuntimeError as exc:
+                print(f"{name:<52} skipped: {exc}".splitlines()[0])
+                continue
+            norm_db = tmp / f"{subdir.name}_normalized.db"
+            trip_times, engine_times = [], []
+            for _ in range(args.repeat):
+                shutil.copyfile(pristine, norm_db)
+                with round_trips():
+                    trip_times.append(time_denormalize(subdir, norm_db, tmp))
+                shutil.copyfile(pristine, norm_db)
+                engine_times.append(time_denormalize(subdir, norm_db, tmp))
+            trip, engine = statistics.median(trip_times), statistics.median(engine_times)
+            total_trip += trip
+            total_engine += engine
+            print(f"{name:<52} round trip {trip * 1000:9.1f} ms  in-engine {engine * 1000:9.1f} ms  x{trip / engine:5.2f}")
+    if total_engine:
+        print(f"{'total':<52} round trip {total_trip * 1000:9.1f} ms  in-engine {total_engine * 1000:9.1f} ms  x{total_trip / total_engine:5.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark episode reset: copying the .db file vs ``common.episodes``.
+
+For each database, every round mutates it the way a workflow episode does (a
+TEMP table, plus deleting ``--write-fraction`` of the largest table's rows) and
+then resets it, timed for:
+
+file       copy the .db to a scratch file and reconnect (the old harness)
+copy       ``EpisodeManager("copy")``: deserialize the in-memory template
+savepoint  ``EpisodeManager("savepoint")``: ``ROLLBACK TO`` the episode start
+
+Databases default to every built ``*/*/*_normalized.db`` (LFS pointers are
+skipped).
+"""
+from __future__ import annotations
+
+import argparse
+import pathlib
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from common.episodes import EpisodeManager
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+def built_databases() -> list[pathlib.Path]:
+    dbs = []
+    for path in sorted(ROOT.glob("*/*/*_normalized.db")):
+        with open(path, "rb") as fh:
+            if fh.read(len(SQLITE_HEADER)) == SQLITE_HEADER:
+                dbs.append(path)
+    return dbs
+
+
+def largest_table(db: pathlib.Path) -> str:
+    conn = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+    try:
+        tables = [t for (t,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+        return max(tables, key=lambda t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0])
+    finally:
+        conn.close()
+
+
+def mutate(conn: sqlite3.Connection, table: str, write_fraction: float) -> None:
+    conn.execute(f'CREATE TEMP TABLE episode_scratch AS SELECT * FROM "{table}" LIMIT 100')
+    if write_fraction > 0:
+        conn.execute(f'DELETE FROM "{table}" WHERE rowid % ? = 0', (max(1, round(1 / write_fraction)),))
+
+
+def bench_file(db: pathlib.Path, table: str, rounds: int, write_fraction: float, tmp: pathlib.Path) -> list[float]:
+    times = []
+    scratch = tmp / db.name
+    for _ in range(rounds):
+        start = time.perf_counter()
+        shutil.copyfile(db, scratch)
+        conn = sqlite3.connect(scratch, isolation_level=None)
+        times.append(time.perf_counter() - start)
+        mutate(conn, table, write_fraction)
+        conn.close()
+    return times
+
+
+def bench_manager(db: pathlib.Path, table: str, rounds: int, write_fraction: float, mode: str) -> list[float]:
+    manager = EpisodeManager(mode)
+    times = []
+    with manager.episode(db) as ep:
+        for _ in range(rounds):
+            mutate(ep.conn, table, write_fraction)
+            start = time.perf_counter()
+            ep.reset()
+            times.append(time.perf_counter() - start)
+    manager.close()
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dbs", nargs="*", type=pathlib.Path, help="Databases to benchmark (default: built normalized dbs)")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument(
+        "--write-fraction",
+        type=float,
+        default=0.1,
+        help="Share of the largest table deleted per episode (0: TEMP tables only)",
+    )
+    args = parser.parse_args()
+    dbs = args.dbs or built_databases()
+    if not dbs:
+        print("no built databases found; run `make build` or pass db paths")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for db in dbs:
+            table = largest_table(db)
+            results = {
+                "file": bench_file(db, table, args.rounds, args.write_fraction, pathlib.Path(tmp)),
+                "copy": bench_manager(db, table, args.rounds, args.write_fraction, "copy"),
+                "savepoint": bench_manager(db, table, args.rounds, args.write_fraction, "savepoint"),
+            }
+            size_mb = db.stat().st_size / 1e6
+            cells = "  ".join(f"{mode} {statistics.median(t) * 1000:8.2f} ms" for mode, t in results.items())
+            print(f"{db.name:<45} {size_mb:7.1f} MB  {cells}")
+
+
+if __name__ == "__main__":
+    main()
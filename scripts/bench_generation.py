@@ -0,0 +1,88 @@
+"""Benchmark per-row ``random.Random`` generation against the columnar helpers.
+
+Both paths produce the same shape of table (id, formatted account number,
+weighted category, bounded int, date, rounded float) and insert it into an
+in-memory SQLite database with ``executemany``.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import sqlite3
+import time
+
+from common.utils import (
+    choice_column,
+    date_column,
+    get_np_rng,
+    get_rng,
+    id_column,
+    int_column,
+    uniform_column,
+)
+
+TYPES = ["CHECKING", "SAVINGS", "BROKERAGE", "LOAN"]
+WEIGHTS = [0.6, 0.3, 0.07, 0.03]
+START = dt.date(2023, 1, 1)
+END = dt.date(2024, 12, 31)
+DDL = "CREATE TABLE t (id INTEGER PRIMARY KEY, acct TEXT, type TEXT, amt INTEGER, day TEXT, rate REAL)"
+
+
+def per_row(n: int, seed: int) -> list[tuple]:
+    rng = get_rng(seed)
+    span = (END - START).days
+    rows = []
+    for i in range(1, n + 1):
+        rows.append((
+            i,
+            f"ACCT{i:06d}",
+            rng.choices(TYPES, weights=WEIGHTS)[0],
+            rng.randint(-50000, 50000),
+            (START + dt.timedelta(days=rng.randint(0, span))).isoformat(),
+            round(rng.uniform(0.0, 5.0), 2),
+        ))
+    return rows
+
+
+def columnar(n: int, seed: int):
+    rng = get_np_rng(seed)
+    return zip(
+        range(1, n + 1),
+        id_column("ACCT{:06d}", 1, n + 1),
+        choice_column(rng, TYPES, n, weights=WEIGHTS),
+        int_column(rng, -50000, 50000, n),
+        date_column(rng, START, END, n),
+        uniform_column(rng, 0.0, 5.0, n, ndigits=2),
+    )
+
+
+def run(label: str, make_rows, n: int, seed: int) -> None:
+    conn = sqlite3.connect(":memory:")
+    conn.execute(DDL)
+    t0 = time.perf_counter()
+    rows = make_rows(n, seed)
+    t1 = time.perf_counter()
+    conn.executemany("INSERT INTO t VALUES (?,?,?,?,?,?)", rows)
+    conn.commit()
+    t2 = time.perf_counter()
+    conn.close()
+    print(
+        f"{label:<10} n={n:>9}  generate {n / (t1 - t0):>12,.0f} rows/s"
+        f"  generate+insert {n / (t2 - t0):>12,.0f} rows/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    assert list(columnar(1000, args.seed)) == list(columnar(1000, args.seed)), "columnar path not deterministic"
+    for n in args.rows:
+        run("per-row", per_row, n, args.seed)
+        run("columnar", columnar, n, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Inspect the benchmark history and check a run for regressions.
+
+``performance_benchmark.py`` records every run (see ``common/bench_history.py``)::
+
+    python3 -m scripts.bench_history list
+    python3 -m scripts.bench_history compare                     # latest vs previous run on this host
+    python3 -m scripts.bench_history compare --baseline 3f2a9c1  # vs the latest run of a commit
+
+``compare`` exits 1 when any query regressed significantly, so ``make check``
+fails on a slowdown; with fewer than two runs there is nothing to compare and
+it exits 0.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import sys
+
+from common.bench_history import ALPHA, DEFAULT_HISTORY, MIN_CHANGE, MIN_MS, BenchHistory
+
+
+def list_runs(history: BenchHistory, limit: int) -> None:
+    for run in history.runs(limit):
+        commit = (run["git_commit"] or "-")[:10] + ("+dirty" if run["git_dirty"] else "")
+        print(f"{run['id']:>5}  {run['created_at']}  {commit:<16} host {run['host_fingerprint'][:8]}  "
+              f"corpus {run['corpus_fingerprint'][:8]}  {run['measurements']} measurements")
+
+
+def compare(history: BenchHistory, args) -> int:
+    candidate = history.resolve(args.candidate)
+    if candidate is None:
+        print("no benchmark runs recorded; run performance_benchmark.py first")
+        return 0
+    host = None if args.any_host else next(r["host_fingerprint"] for r in history.runs() if r["id"] == candidate)
+    baseline = history.resolve(args.baseline, before=None if args.baseline else candidate, host=host)
+    if baseline is None or baseline == candidate:
+        print(f"no baseline run for run {candidate}" + ("" if args.any_host else " on this host (see --any-host)"))
+        return 0
+    report = history.compare(baseline, candidate, alpha=args.alpha, min_change=args.min_change, min_ms=args.min_ms)
+    if args.json:
+        json.dump({"baseline": baseline, "candidate": candidate, **report}, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"run {candidate} vs baseline {baseline}: {report['compared']} queries compared"
+              + ("" if report["same_host"] else " (different hosts!)")
+              + ("" if report["same_corpus"] else " (corpus changed)"))
+        for kind, shown in (("regressions", None), ("improvements", args.show_improvements)):
+            if report[kind]:
+                print(f"{len(report[kind])} {kind}:")
+            for r in report[kind][:shown]:
+                note = " [sql changed]" if r["sql_changed"] else ""
+                print(f"  {r['scope']} {r['query']} ({r['mode']}): {r['baseline_p50_ms']:.3f} -> "
+                      f"{r['candidate_p50_ms']:.3f} ms p50 ({r['change']:+.0%}, p={r['p_value']:.1e}){note}")
+        if report["missing"]:
+            print(f"{len(report['missing'])} queries of the baseline were not measured")
+    return 1 if report["regressions"] else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", type=pathlib.Path, default=DEFAULT_HISTORY)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_list = sub.add_parser("list", help="Recorded runs, newest first")
+    p_list.add_argument("--limit", type=int, default=20)
+    p_cmp = sub.add_parser("compare", help="Flag per-query regressions of a run against a baseline")
+    p_cmp.add_argument("--baseline", help="Run id or git commit (default: the previous run on the same host)")
+    p_cmp.add_argument("--candidate", help="Run id or git commit (default: the latest run)")
+    p_cmp.add_argument("--alpha", type=float, default=ALPHA, help="Family-wise significance level")
+    p_cmp.add_argument("--min-change", type=float, default=MIN_CHANGE, help="Minimum relative p50 increase")
+    p_cmp.add_argument("--min-ms", type=float, default=MIN_MS, help="Minimum absolute p50 increase")
+    p_cmp.add_argument("--any-host", action="store_true", help="Allow a baseline recorded on another host")
+    p_cmp.add_argument("--show-improvements", type=int, default=5, help="Improvements to list")
+    p_cmp.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "compare" and not args.history.exists():
+        print("no benchmark history; run performance_benchmark.py first")
+        return
+    history = BenchHistory(args.history)
+    try:
+        if args.command == "list":
+            list_runs(history, args.limit)
+        else:
+            sys.exit(compare(history, args))
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
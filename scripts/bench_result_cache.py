@@ -0,0 +1,86 @@
+"""Measure ``common.result_cache`` on a rollout-like query stream.
+
+The gold SQL of every built subdomain (from the task catalog) is replayed
+``--queries`` times, picked with a Zipf-like skew so popular tasks repeat as
+they do across rollouts, and each pick is respelled at random (keyword case,
+whitespace, trailing ``;``) the way different rollouts phrase the same query.
+The stream runs once through a bare ``Executor`` and once through a
+``ResultCache`` in front of one.
+"""
+from __future__ import annotations
+
+import argparse
+import pathlib
+import random
+import re
+import time
+
+from common.catalog import TaskCatalog
+from common.executor import Executor
+from common.result_cache import ResultCache
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+def workload(catalog: TaskCatalog) -> list[tuple[str, str]]:
+    """``(db, gold sql)`` for every gold turn whose db is built."""
+    queries = []
+    for scope in catalog.scopes("tasks"):
+        db = ROOT / scope / f"{pathlib.Path(scope).name}_normalized.db"
+        if not db.exists():
+            continue
+        with open(db, "rb") as fh:
+            if fh.read(len(SQLITE_HEADER)) != SQLITE_HEADER:
+                continue
+        queries.extend((str(db), task["sql"]) for task in catalog.gold(scope))
+    return queries
+
+
+def respell(sql: str, rng: random.Random) -> str:
+    # Cheap variants only: string literals may contain anything, so case
+    # changes are limited to SQL outside quotes.
+    parts = re.split(r"('(?:[^']|'')*')", sql)
+    case = rng.choice([str.lower, str.upper, lambda s: s])
+    parts = [p if i % 2 else case(p) for i, p in enumerate(parts)]
+    text = "".join(parts)
+    if rng.random() < 0.5:
+        text = " ".join(text.split())
+    return text + (";" if rng.random() < 0.5 and not text.rstrip().endswith(";") else "")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--max-mb", type=int, default=256, help="Result cache size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    catalog = TaskCatalog()
+    queries = workload(catalog)
+    catalog.close()
+    if not queries:
+        print("no built databases found; run `make build` first")
+        return
+    rng = random.Random(args.seed)
+    weights = [1 / (rank + 1) for rank in range(len(queries))]
+    stream = [(db, respell(sql, rng)) for db, sql in rng.choices(queries, weights, k=args.queries)]
+
+    results = {}
+    for name, runner in (("executor", Executor()), ("cached", ResultCache(Executor(), max_bytes=args.max_mb << 20))):
+        start = time.perf_counter()
+        for db, sql in stream:
+            runner.execute(db, sql)
+        results[name] = len(stream) / (time.perf_counter() - start)
+        if isinstance(runner, ResultCache):
+            stats = dict(runner.stats)
+        runner.close()
+    print(f"{len(queries)} gold queries, {len(stream)} executions")
+    for name, qps in results.items():
+        print(f"{name:<9} {qps:10.0f} queries/s")
+    print(f"hits {stats['hits']}, misses {stats['misses']}, bypassed {stats['bypassed']}, "
+          f"{stats['entries']} entries / {stats['bytes'] / 1e6:.1f} MB")
+    print(f"speedup x{results['cached'] / results['executor']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark per-step start-up: a fresh ``python3`` per step vs in-process calls.
+
+Times a no-op stub step (pure interpreter + import overhead) and the
+``populate`` entry point of a few generators at a small scale, each run both as
+a subprocess and through ``common.steps`` in this interpreter. Databases are
+built in a temporary directory; the repo's databases are not touched.
+"""
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+
+from common.steps import call_entry, run_script
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+STEP_SCRIPTS = ["generate_schema_normalized.py", "populate_normalized.py", "evidence_loader.py", "populate_denormalized.py"]
+
+
+def time_subprocess(script: pathlib.Path, argv: list[str]) -> tuple[int, float]:
+    start = time.perf_counter()
+    proc = subprocess.run(["python3", str(script), *argv], cwd=script.parent, capture_output=True)
+    return proc.returncode, time.perf_counter() - start
+
+
+def fresh_db(tmp: pathlib.Path, subdir: pathlib.Path, tag: str) -> str:
+    db = tmp / f"{subdir.name}_{tag}.db"
+    db.unlink(missing_ok=True)
+    conn = sqlite3.connect(db)
+    conn.executescript((subdir / "schema_normalized.sql").read_text(encoding="utf-8"))
+    conn.close()
+    return str(db)
+
+
+def report(label: str, sub_times: list[float], inproc_times: list[float]) -> float:
+    sub_ms = statistics.median(sub_times) * 1000
+    inproc_ms = statistics.median(inproc_times) * 1000
+    print(f"{label:<48} subprocess {sub_ms:9.1f} ms  in-process {inproc_ms:9.1f} ms  saved {sub_ms - inproc_ms:8.1f} ms")
+    return sub_ms - inproc_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per measurement (median is reported)")
+    parser.add_argument("--generators", type=int, default=5, help="Number of populate_normalized entry points to time")
+    parser.add_argument("--scale", type=float, default=0.05)
+    args = parser.parse_args()
+
+    stub = next(
+        p for p in sorted(ROOT.glob("*/*/generate_schema_normalized.py"))
+        if "def main" not in p.read_text(encoding="utf-8")
+    )
+    sub_times, inproc_times = [], []
+    for _ in range(args.repeat):
+        sub_times.append(time_subprocess(stub, [])[1])
+        inproc_times.append(run_script(stub, [], cwd=stub.parent)[1])
+    overhead_ms = report("no-op step", sub_times, inproc_times)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        savings = []
+        for pop in sorted(ROOT.glob("*/*/populate_normalized.py")):
+            if len(savings) >= args.generators:
+                break
+            if "def populate(" not in pop.read_text(encoding="utf-8"):
+                continue
+            subdir = pop.parent
+            sub_times, inproc_times = [], []
+            for _ in range(args.repeat):
+                code, seconds = time_subprocess(pop, ["--db", fresh_db(tmp, subdir, "sub"), "--scale", str(args.scale)])
+                if code:
+                    break
+                sub_times.append(seconds)
+                code, seconds, _, _ = call_entry(pop, "populate", cwd=subdir, db=fresh_db(tmp, subdir, "inproc"), scale=args.scale)
+                if code:
+                    break
+                inproc_times.append(seconds)
+            if code:
+                continue
+            savings.append(report(f"{subdir.parent.name}/{subdir.name}", sub_times, inproc_times))
+
+    # Real steps also re-import common/ (and NumPy), so their saving is the
+    # better estimate; the no-op stub is the floor.
+    per_step_ms = statistics.median(savings) if savings else overhead_ms
+    steps = sum((d / name).exists() for d in ROOT.glob("*/*") if d.is_dir() for name in STEP_SCRIPTS)
+    print(
+        f"{steps} step scripts per full build: ~{steps * per_step_ms / 1000:.1f} s of start-up avoided "
+        f"(summed over workers; floor {steps * overhead_ms / 1000:.1f} s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
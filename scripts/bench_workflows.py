@@ -0,0 +1,102 @@
+"""Time ``workflow_tasks.md`` workflows run by ``common.workflows``.
+
+Each workflow that runs cleanly on a built database is timed three ways:
+
+serial  every block in file order on one connection to an in-memory copy,
+        with real TEMP tables (what a harness replaying the file would do)
+cold    ``WorkflowExecutor.run`` with an empty cache (the corpus' small DAGs
+        take its one-connection path; larger branching ones run steps
+        concurrently)
+warm    the same run again: step results come from the cache
+
+Domain-level workflows run against the first built subdomain db where they
+succeed; LFS pointers are skipped.
+"""
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sqlite3
+import time
+
+from common.catalog import TaskCatalog
+from common.workflows import WorkflowExecutor
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+def built_databases(scope: str) -> list[pathlib.Path]:
+    pattern = "*_normalized.db" if "/" in scope else "*/*_normalized.db"
+    dbs = []
+    for path in sorted((ROOT / scope).glob(pattern)):
+        with open(path, "rb") as fh:
+            if fh.read(len(SQLITE_HEADER)) == SQLITE_HEADER:
+                dbs.append(path)
+    return dbs
+
+
+def run_serial(db: pathlib.Path, steps: list[dict]) -> float | None:
+    """Seconds to replay ``steps`` on one connection, or None if one fails."""
+    conn = sqlite3.connect(":memory:")
+    try:
+        src = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+        try:
+            src.backup(conn)
+        finally:
+            src.close()
+        start = time.perf_counter()
+        for step in steps:
+            conn.execute(step["sql"]).fetchall()
+        return time.perf_counter() - start
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("scopes", nargs="*", help="Scopes with a workflow_tasks.md (default: all)")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    catalog = TaskCatalog()
+    totals = {"serial": 0.0, "cold": 0.0, "warm": 0.0}
+    count = 0
+    for scope in args.scopes or catalog.scopes("workflow"):
+        steps_all = catalog.workflow_steps(scope)
+        for name in dict.fromkeys(s["workflow"] for s in steps_all):
+            steps = [s for s in steps_all if s["workflow"] == name]
+            for db in built_databases(scope):
+                serial = run_serial(db, steps)
+                if serial is None:
+                    continue
+                wf = WorkflowExecutor(workers=args.workers)
+                try:
+                    wf.load(db)  # a one-off per db; keep it out of the timings
+                    start = time.perf_counter()
+                    cold = wf.run(db, steps)
+                    cold_s = time.perf_counter() - start
+                    start = time.perf_counter()
+                    wf.run(db, steps)
+                    warm_s = time.perf_counter() - start
+                finally:
+                    wf.close()
+                if not cold["ok"]:
+                    print(f"{scope} / {name}: executor failed where serial replay succeeded")
+                    break
+                print(f"{scope} / {name or '-'} ({db.name}): serial {serial * 1000:.1f} ms, "
+                      f"cold {cold_s * 1000:.1f} ms, warm {warm_s * 1000:.1f} ms")
+                for key, value in zip(totals, (serial, cold_s, warm_s)):
+                    totals[key] += value
+                count += 1
+                break
+    catalog.close()
+    if not count:
+        print("no workflow ran; run `make build` first")
+        return
+    print(f"{count} workflows: " + ", ".join(f"{k} {v * 1000:.1f} ms" for k, v in totals.items()))
+
+
+if __name__ == "__main__":
+    main()
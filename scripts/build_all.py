@@ -1,46 +1,311 @@
-"""Build all subdomain datasets by generating schema and populating."""
+"""Build all subdomain datasets by generating schema and populating.
+
+Each subdomain is a small DAG of steps (schema -> normalized -> evidence ->
+denormalized). Subdomains are independent, so ready steps from different
+subdomains run concurrently on a process pool of ``--jobs`` workers. Steps
+execute inside the workers (see ``common/steps.py``) rather than in a fresh
+``python3`` per step; generators are called through their ``populate``
+entry point. Generators with large fact tables can additionally shard them
+across ``--shard-jobs`` worker processes (see ``common/sharding.py``).
+
+Built databases are stored in a content-addressed cache (see
+``scripts/build_cache.py``); a subdomain whose inputs are unchanged is restored
+from the cache instead of being rebuilt.
+
+Task files are compiled into the task catalog (``common/catalog.py``) before
+anything else; once every step of a subdomain succeeded, the gold SQL of its
+tasks is run and cached (see ``common/gold.py``).
+"""
 from __future__ import annotations
 
 import argparse
+import os
 import pathlib
 import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
+from common.catalog import TaskCatalog, compile_catalog
+from common.denormalize import forget_marks
+from common.gold import DEFAULT_CACHE as GOLD_CACHE, GoldCache
+from common.steps import call_entry, run_script
+from common.utils import DEFAULT_SCALE
+from scripts import build_cache
 from scripts.scaffold import parse_domains
 
 ROOT = pathlib.Path(__file__).resolve().parent.parent
 
+# (step name, script, steps it depends on). The evidence loader writes into the
+# normalized db that populate_denormalized reads, so the two are not concurrent.
+STEPS = [
+    ("schema", "generate_schema_normalized.py", ()),
+    ("normalized", "populate_normalized.py", ("schema",)),
+    ("evidence", "evidence_loader.py", ("normalized",)),
+    ("denormalized", "populate_denormalized.py", ("evidence",)),
+]
+# Steps whose script can be called as a function instead of through argv.
+ENTRY_POINTS = {"normalized": "populate"}
+# Which database each step contributes to.
+ARTIFACTS = {"schema": "normalized", "normalized": "normalized", "evidence": "normalized", "denormalized": "denormalized"}
+
+
+def run_step(step: dict, in_process: bool = True) -> tuple[int, float, str]:
+    """Run one step; return (returncode, wall seconds, stderr tail)."""
+    if in_process:
+        if step["entry"]:
+            code, seconds, _, tail = call_entry(step["script"], step["entry"], cwd=step["cwd"], optional=step["optional"], **step["kwargs"])
+        else:
+            code, seconds, _, tail = run_script(step["script"], step["argv"], cwd=step["cwd"])
+        return code, seconds, tail
+    start = time.perf_counter()
+    cmd = ["python3", step["script"], *step["argv"]]
+    proc = subprocess.run(cmd, cwd=step["cwd"], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+    return proc.returncode, time.perf_counter() - start, tail
+
+
+def artifact_paths(subdir: pathlib.Path, sub: str) -> dict[str, pathlib.Path]:
+    return {"normalized": subdir / f"{sub}_normalized.db", "denormalized": subdir / f"{sub}_denormalized.db"}
+
+
+def step_kwargs(subdir: pathlib.Path, sub: str, scale: float, seed: int | None) -> dict[str, dict]:
+    """Keyword arguments for steps whose script exposes an entry point."""
+    norm_db = str(artifact_paths(subdir, sub)["normalized"])
+    seed_kwargs = {} if seed is None else {"seed": seed}
+    return {"normalized": {"db": norm_db, "scale": scale, **seed_kwargs}}
+
+
+def step_args(subdir: pathlib.Path, sub: str, scale: float, seed: int | None) -> dict[str, list[str]]:
+    dbs = artifact_paths(subdir, sub)
+    norm_db = str(dbs["normalized"])
+    seed_args = [] if seed is None else ["--seed", str(seed)]
+    return {
+        "schema": ["--db", norm_db, "--out", str(subdir / "schema_normalized.sql")],
+        "normalized": ["--db", norm_db, "--scale", str(scale), *seed_args],
+        "evidence": ["--db", norm_db],
+        "denormalized": ["--db", str(dbs["denormalized"])],
+    }
+
 
-def run(cmd: list[str]) -> None:
-    subprocess.run(cmd, check=True)
+def plan_sub(
+    top: str,
+    sub: str,
+    scale: float = DEFAULT_SCALE,
+    seed: int | None = None,
+    cache_dir: pathlib.Path | None = None,
+    cache_mode: str = "copy",
+    shard_jobs: int = 1,
+) -> tuple[list[dict], list[str]]:
+    """Return ``(steps, restored)`` for one subdomain.
 
+    With a ``cache_dir``, artifacts whose fingerprint is cached are restored
+    in place and their steps are left out; ``restored`` names them. Databases
+    that will be rebuilt are deleted first so steps never append to stale
+    data. The last step of each rebuilt artifact carries a ``store`` entry so
+    the scheduler caches the db once it succeeds. That fingerprint is taken
+after the build because the schema step may rewrite schema_normalized.sql.
 
-def build_sub(top: str, sub: str) -> None:
+    Dependencies on steps without a script are dropped, so a subdomain with no
+    evidence loader goes straight from normalized to denormalized.
+    """
     subdir = ROOT / top / sub
-    gen = subdir / "generate_schema_normalized.py"
-    pop = subdir / "populate_normalized.py"
-    if gen.exists():
-        run(["python3", str(gen), "--db", f"{subdir}/{sub}_normalized.db", "--out", str(subdir / "schema_normalized.sql")])
-    if pop.exists():
-        run(["python3", str(pop), "--db", f"{subdir}/{sub}_normalized.db"])
-    evidence_loader = subdir / "evidence_loader.py"
-    if evidence_loader.exists():
-        run(["python3", str(evidence_loader), "--db", f"{subdir}/{sub}_normalized.db"])
-    denorm_pop = subdir / "populate_denormalized.py"
-    if denorm_pop.exists():
-        run(["python3", str(denorm_pop), "--db", f"{subdir}/{sub}_denormalized.db"])
+    args = step_args(subdir, sub, scale, seed)
+    kwargs = step_kwargs(subdir, sub, scale, seed)
+    dbs = artifact_paths(subdir, sub)
+    fps = build_cache.fingerprints(subdir, scale, seed) if cache_dir is not None else {}
+    restored: list[str] = []
+    for kind in ("normalized", "denormalized"):
+        if fps and build_cache.restore(fps[kind], dbs[kind], cache_mode, cache_dir):
+            restored.append(kind)
+        else:
+            break
+    for kind, db in dbs.items():
+        if kind not in restored:
+            db.unlink(missing_ok=True)
+    # Restored or rebuilt, the denormalized db no longer matches recorded
+    # refresh watermarks; a rebuild records fresh ones.
+    forget_marks(dbs["denormalized"])
+
+    present: set[str] = set()
+    resolved: dict[str, tuple[str, ...]] = {}
+    steps = []
+    for name, script, deps in STEPS:
+        path = subdir / script
+        real_deps: tuple[str, ...] = ()
+        for dep in deps:
+            real_deps += (dep,) if dep in present else resolved.get(dep, ())
+        resolved[name] = real_deps
+        if not path.exists() or ARTIFACTS[name] in restored:
+            continue
+        present.add(name)
+        entry = ENTRY_POINTS.get(name)
+        if entry and f"def {entry}(" not in path.read_text(encoding="utf-8"):
+            entry = None
+        steps.append({
+            "id": f"{top}/{sub}:{name}",
+            "label": f"{top}/{sub} {name}",
+            "script": str(path),
+            "argv": args[name],
+            "entry": entry,
+            "kwargs": kwargs.get(name, {}),
+            "optional": {"jobs": shard_jobs} if shard_jobs > 1 else {},
+            "cwd": str(subdir),
+            "deps": tuple(f"{top}/{sub}:{dep}" for dep in real_deps),
+            "store": [],
+        })
+    if cache_dir is not None:
+        last = {ARTIFACTS[step["id"].rsplit(":", 1)[1]]: step for step in steps}
+        for kind, step in last.items():
+            step["store"].append({"db": str(dbs[kind]), "kind": kind, "subdir": str(subdir),
+                                  "scale": scale, "seed": seed, "cache_dir": str(cache_dir)})
+    return steps, restored
+
+
+def store_artifact(entry: dict) -> None:
+    db = pathlib.Path(entry["db"])
+    if db.exists():
+        fp = build_cache.fingerprints(pathlib.Path(entry["subdir"]), entry["scale"], entry["seed"])[entry["kind"]]
+        build_cache.store(db, fp, pathlib.Path(entry["cache_dir"]))
+
+
+def schedule(steps: list[dict], jobs: int, keep_going: bool, in_process: bool = True) -> dict[str, dict]:
+    """Run ``steps`` respecting their deps with at most ``jobs`` in flight.
+
+    Returns ``{step id: {"status", "seconds", "error"}}`` where status is one
+    of ``ok``, ``fail`` or ``skip`` (a dependency failed, or fail-fast stopped
+    the build before the step started).
+    """
+    results: dict[str, dict] = {}
+    pending = list(steps)
+    running = {}
+    stop = False
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            if not stop:
+                for step in list(pending):
+                    if len(running) >= jobs:
+                        break
+                    states = [results.get(dep, {}).get("status") for dep in step["deps"]]
+                    if any(s in ("fail", "skip") for s in states):
+                        results[step["id"]] = {"status": "skip", "seconds": 0.0, "error": ""}
+                        pending.remove(step)
+                    elif all(s == "ok" for s in states):
+                        running[pool.submit(run_step, step, in_process)] = step
+                        pending.remove(step)
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                step = running.pop(fut)
+                code, seconds, error = fut.result()
+                status = "ok" if code == 0 else "fail"
+                results[step["id"]] = {"status": status, "seconds": seconds, "error": error}
+                print(f"{seconds:8.2f}s  {status:<4}  {step['label']}", flush=True)
+                if status == "ok":
+                    for entry in step.get("store", ()):
+                        store_artifact(entry)
+                if status == "fail":
+                    print("    " + error.replace("\n", "\n    "), flush=True)
+                    stop = stop or not keep_going
+    for step in pending:
+        results.setdefault(step["id"], {"status": "skip", "seconds": 0.0, "error": ""})
+    return results
+
+
+def precompute_gold(subdirs: list[pathlib.Path], cache_path: pathlib.Path) -> None:
+    """Cache gold task answers for freshly built (or restored) subdomains."""
+    start = time.perf_counter()
+    cache = GoldCache(cache_path)
+    catalog = TaskCatalog(refresh=False)
+    totals = {"computed": 0, "cached": 0, "errors": 0, "volatile": 0}
+    try:
+        for subdir in subdirs:
+            stats = cache.precompute(subdir, catalog=catalog)
+            for key in totals:
+                totals[key] += stats[key]
+    finally:
+        cache.close()
+        catalog.close()
+    print(
+        f"{time.perf_counter() - start:8.2f}s  gold  {totals['computed']} answers computed, "
+        f"{totals['cached']} cached, {totals['errors']} failing gold queries, {totals['volatile']} time-dependent",
+        flush=True,
+    )
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--domain", help="Top-level domain filter", default=None)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=DEFAULT_SCALE,
+        help="Scale factor applied to every generator's entity counts (e.g. 1, 10, 100)",
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Concurrent steps (default: CPU count)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--fail-fast", dest="keep_going", action="store_false", help="Stop scheduling after the first failure (default)")
+    mode.add_argument("--keep-going", dest="keep_going", action="store_true", help="Build every subdomain not blocked by a failure")
+    parser.set_defaults(keep_going=False)
+    parser.add_argument("--subprocess", action="store_true", help="Run every step in a fresh python3 process")
+    parser.add_argument(
+        "--shard-jobs",
+        type=int,
+        default=1,
+        help="Worker processes per generator for sharded fact tables (in-process steps only)",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seed passed to every generator (default: each generator's own)")
+    parser.add_argument("--cache-dir", type=pathlib.Path, default=build_cache.CACHE_DIR, help="Build cache location")
+    parser.add_argument("--no-cache", action="store_true", help="Rebuild everything and leave the cache untouched")
+    parser.add_argument(
+        "--cache-mode",
+        choices=("copy", "hardlink"),
+        default="copy",
+        help="How cached dbs are restored; hardlinked dbs are read-only (make refresh copies them first)",
+    )
+    parser.add_argument("--gold-cache", type=pathlib.Path, default=GOLD_CACHE, help="Where gold task answers are cached")
+    parser.add_argument("--no-gold", action="store_true", help="Skip precomputing gold task answers")
     args = parser.parse_args()
+    cache_dir = None if args.no_cache else args.cache_dir
 
     domains = parse_domains(ROOT / "domains.yaml")
+    start = time.perf_counter()
+    compiled = compile_catalog()
+    print(f"{time.perf_counter() - start:8.2f}s  ok    task catalog ({compiled['compiled']} files compiled)", flush=True)
+    steps = []
+    planned: dict[pathlib.Path, list[dict]] = {}
+    cached = 0
     for top, subs in domains.items():
         if args.domain and args.domain != top:
             continue
         for sub in subs:
-            build_sub(top.lower(), sub)
+            sub_steps, restored = plan_sub(
+                top.lower(), sub, args.scale, args.seed, cache_dir, args.cache_mode, args.shard_jobs
+            )
+            steps.extend(sub_steps)
+            planned[ROOT / top.lower() / sub] = sub_steps
+            for kind in restored:
+                print(f"{0:8.2f}s  hit   {top.lower()}/{sub} {kind}", flush=True)
+            cached += len(restored)
+
+    results = schedule(steps, max(1, args.jobs), args.keep_going, not args.subprocess)
+    if not args.no_gold:
+        built = [subdir for subdir, sub_steps in planned.items() if all(results[s["id"]]["status"] == "ok" for s in sub_steps)]
+        precompute_gold(built, args.gold_cache)
+    wall = time.perf_counter() - start
+
+    counts = {s: sum(r["status"] == s for r in results.values()) for s in ("ok", "fail", "skip")}
+    busy = sum(r["seconds"] for r in results.values())
+    print(
+        f"{len(results)} steps: {counts['ok']} ok, {counts['fail']} failed, {counts['skip']} skipped, "
+        f"{cached} dbs restored from cache; "
+        f"wall {wall:.1f}s, step time {busy:.1f}s, {args.jobs} jobs"
+    )
+    failed = [step["label"] for step in steps if results[step["id"]]["status"] == "fail"]
+    if failed:
+        for label in failed:
+            print(f"FAILED {label}")
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+"""Content-addressed cache of built subdomain databases.
+
+A subdomain's normalized db is fingerprinted from everything that can change
+its contents: the schema SQL, the schema/populate/evidence scripts, the
+evidence files, every ``common/*.py`` module, the seed, the scale and the
+SQLite version. The denormalized db's fingerprint extends the normalized one
+with its own schema and populate script. Cached databases live at
+``<cache dir>/<fingerprint>.db`` and are read-only.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import sqlite3
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+CACHE_DIR = ROOT / ".build_cache"
+# Bump to invalidate every cached artifact, e.g. when build_all changes the
+# arguments it passes to steps.
+CACHE_VERSION = 1
+
+NORMALIZED_INPUTS = [
+    "schema_normalized.sql",
+    "generate_schema_normalized.py",
+    "populate_normalized.py",
+    "evidence_loader.py",
+]
+DENORMALIZED_INPUTS = ["schema_denormalized.sql", "populate_denormalized.py"]
+
+
+def _digest_files(h, paths: list[pathlib.Path]) -> None:
+    for path in paths:
+        h.update(str(path.relative_to(ROOT)).encode())
+        h.update(b"\0")
+        h.update(path.read_bytes() if path.exists() else b"<missing>")
+        h.update(b"\0")
+
+
+def fingerprints(subdir: pathlib.Path, scale: float, seed: int | None) -> dict[str, str]:
+    """Return ``{"normalized": fp, "denormalized": fp}`` for ``subdir``."""
+    h = hashlib.sha256()
+    params = {"version": CACHE_VERSION, "scale": scale, "seed": seed, "sqlite": sqlite3.sqlite_version}
+    h.update(json.dumps(params, sort_keys=True).encode())
+    _digest_files(h, sorted((ROOT / "common").glob("*.py")))
+    evidence = sorted(p for p in (subdir / "evidence").rglob("*") if p.is_file())
+    _digest_files(h, [subdir / name for name in NORMALIZED_INPUTS] + evidence)
+    normalized = h.hexdigest()
+    _digest_files(h, [subdir / name for name in DENORMALIZED_INPUTS])
+    return {"normalized": normalized, "denormalized": h.hexdigest()}
+
+
+def cache_path(fp: str, cache_dir: pathlib.Path = CACHE_DIR) -> pathlib.Path:
+    return cache_dir / f"{fp}.db"
+
+
+def restore(fp: str, dest: pathlib.Path, mode: str = "copy", cache_dir: pathlib.Path = CACHE_DIR) -> bool:
+    """Place the cached db for ``fp`` at ``dest``; return False on a miss.
+
+    ``mode="hardlink"`` shares the cache file's inode, so the restored db is
+    read-only like the cache entry; it falls back to a copy across devices.
+    Anything that later writes to a restored db must call ``unshare`` first.
+    """
+    src = cache_path(fp, cache_dir)
+    if not src.exists():
+        return False
+    dest.unlink(missing_ok=True)
+    if mode == "hardlink":
+        try:
+            os.link(src, dest)
+            return True
+        except OSError:
+            pass
+    shutil.copyfile(src, dest)
+    return True
+
+
+def unshare(path: pathlib.Path) -> bool:
+    """Give ``path`` its own writable inode if it is hardlinked; return True if it was.
+
+    Writing through a hardlinked restore would modify the cache entry in place
+    (permissions do not stop root), so the file is copied and swapped in.
+    """
+    path = pathlib.Path(path)
+    if os.stat(path).st_nlink < 2:
+        return False
+    tmp = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    shutil.copyfile(path, tmp)
+    os.replace(tmp, path)
+    return True
+
+
+def store(src: pathlib.Path, fp: str, cache_dir: pathlib.Path = CACHE_DIR) -> None:
+    """Copy a freshly built db into the cache under ``fp``."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    dest = cache_path(fp, cache_dir)
+    tmp = dest.with_suffix(f".tmp{os.getpid()}")
+    shutil.copyfile(src, tmp)
+    tmp.chmod(0o444)
+    os.replace(tmp, dest)
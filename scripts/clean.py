@@ -1,14 +1,29 @@
-"""Remove generated SQLite database files."""
+"""Remove generated SQLite database files.
+
+The build cache is kept so the next build can restore unchanged subdomains;
+pass ``--cache`` to delete it as well.
+"""
 from __future__ import annotations
 
+import argparse
 import pathlib
+import shutil
+
+from scripts.build_cache import CACHE_DIR
 
 ROOT = pathlib.Path(__file__).resolve().parent.parent
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cache", action="store_true", help="Also delete the build cache")
+    args = parser.parse_args()
+
     for db in ROOT.glob("**/*.db"):
-        db.unlink()
+        if CACHE_DIR not in db.parents:
+            db.unlink()
+    if args.cache:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
 
 
 if __name__ == "__main__":
@@ -2,31 +2,15 @@
 from __future__ import annotations
 
 import pathlib
-import re
-import sqlite3
 import sys
 
-ROOT = pathlib.Path(__file__).resolve().parent.parent
-
-SQL_BLOCK_RE = re.compile(r"```sql (fast|slow)\n(.*?)```", re.DOTALL)
-
+from common.catalog import TaskCatalog
+from common.executor import Executor
 
-def extract_pairs(tasks: str) -> list[tuple[str, str]]:
-    blocks = SQL_BLOCK_RE.findall(tasks)
-    pairs = []
-    fast = slow = None
-    for tag, sql in blocks:
-        if tag == "fast":
-            fast = sql.strip()
-        elif tag == "slow":
-            slow = sql.strip()
-        if fast and slow:
-            pairs.append((fast, slow))
-            fast = slow = None
-    return pairs
+ROOT = pathlib.Path(__file__).resolve().parent.parent
 
 
-def check_file(subdir: pathlib.Path) -> list[str]:
+def check_file(subdir: pathlib.Path, catalog: TaskCatalog, executor: Executor) -> list[str]:
     errors = []
     db = subdir / f"{subdir.name}_normalized.db"
     tasks_file = subdir / "sample_text_to_sql_tasks.md"
@@ -36,33 +20,35 @@ def check_file(subdir: pathlib.Path) -> list[str]:
     if not tasks_file.exists():
         errors.append(f"Missing tasks file {tasks_file}")
         return errors
-    pairs = extract_pairs(tasks_file.read_text(encoding="utf-8"))
+    pairs = catalog.pairs(subdir.relative_to(ROOT).as_posix())
     if not pairs:
         errors.append(f"No fast/slow pairs in {tasks_file}")
         return errors
-    conn = sqlite3.connect(db)
-    try:
-        try:
-            conn.execute("SELECT json_extract('{\"a\":1}', '$.a')")
-        except sqlite3.OperationalError:
-            errors.append("SQLite JSON1 not available; install a build with JSON1")
-            return errors
-        for fast, slow in pairs:
-            fast_plan = conn.execute(f"EXPLAIN QUERY PLAN {fast}").fetchall()
-            slow_plan = conn.execute(f"EXPLAIN QUERY PLAN {slow}").fetchall()
-            fast_ok = any("USING INDEX" in str(r) for r in fast_plan)
-            slow_bad = any("SCAN" in str(r) for r in slow_plan)
-            if not (fast_ok and slow_bad):
-                errors.append(f"Inefficient pair in {tasks_file}")
-    finally:
-        conn.close()
+    if not executor.execute(db, "SELECT json_extract('{\"a\":1}', '$.a')")["ok"]:
+        errors.append("SQLite JSON1 not available; install a build with JSON1")
+        return errors
+    for fast, slow in pairs:
+        fast_plan = executor.execute(db, f"EXPLAIN QUERY PLAN {fast}")
+        slow_plan = executor.execute(db, f"EXPLAIN QUERY PLAN {slow}")
+        failed = [plan["error"]["message"] for plan in (fast_plan, slow_plan) if not plan["ok"]]
+        if failed:
+            errors.extend(f"Cannot plan a query in {tasks_file}: {message}" for message in failed)
+            continue
+        fast_ok = any("USING INDEX" in str(r) for r in fast_plan["rows"])
+        slow_bad = any("SCAN" in str(r) for r in slow_plan["rows"])
+        if not (fast_ok and slow_bad):
+            errors.append(f"Inefficient pair in {tasks_file}")
     return errors
 
 
 def main() -> None:
     errors = []
-    for tasks in ROOT.glob("**/sample_text_to_sql_tasks.md"):
-        errors.extend(check_file(tasks.parent))
+    catalog = TaskCatalog()
+    executor = Executor(max_rows=None)
+    for scope in catalog.scopes("tasks"):
+        errors.extend(check_file(ROOT / scope, catalog, executor))
+    executor.close()
+    catalog.close()
     if errors:
         for e in errors:
             print(e)
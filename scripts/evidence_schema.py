@@ -3,20 +3,19 @@ from __future__ import annotations
 
 import json
 import pathlib
-import re
 import sys
 
+from common.catalog import TaskCatalog
+
 ROOT = pathlib.Path(__file__).resolve().parent.parent
-EVIDENCE_RE = re.compile(r"evidence/([\w_.-]+)")
 
 
-def check_sub(subdir: pathlib.Path) -> list[str]:
+def check_sub(subdir: pathlib.Path, catalog: TaskCatalog) -> list[str]:
     errors = []
     tasks = subdir / "sample_text_to_sql_tasks.md"
     if not tasks.exists():
         return errors
-    text = tasks.read_text(encoding="utf-8")
-    matches = EVIDENCE_RE.findall(text)
+    matches = catalog.evidence(subdir.relative_to(ROOT).as_posix())
     evidence_dir = subdir / "evidence"
     if matches and (not evidence_dir.exists() or not any(evidence_dir.iterdir())):
         errors.append(f"{subdir} references evidence but evidence/ missing or empty")
@@ -38,8 +37,10 @@ def check_sub(subdir: pathlib.Path) -> list[str]:
 
 def main() -> None:
     errors = []
-    for tasks in ROOT.glob("**/sample_text_to_sql_tasks.md"):
-        errors.extend(check_sub(tasks.parent))
+    catalog = TaskCatalog()
+    for scope in catalog.scopes("tasks"):
+        errors.extend(check_sub(ROOT / scope, catalog))
+    catalog.close()
     if errors:
         for e in errors:
             print(e)
@@ -0,0 +1,47 @@
+"""Execute the gold SQL of every task once and cache the answers.
+
+``make build`` already does this for the subdomains it builds; run it directly
+after editing ``sample_text_to_sql_tasks.md`` or to inspect which gold queries
+fail. Answers are keyed by the db's content fingerprint (see ``common/gold.py``),
+so only tasks whose SQL or database changed are executed again.
+"""
+from __future__ import annotations
+
+import argparse
+import pathlib
+
+from common.catalog import TaskCatalog
+from common.gold import DEFAULT_CACHE, GoldCache
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("subdomains", nargs="*", help="<domain>/<subdomain> paths (default: every subdomain with tasks)")
+    parser.add_argument("--cache", type=pathlib.Path, default=DEFAULT_CACHE, help="Gold answer cache")
+    args = parser.parse_args()
+    catalog = TaskCatalog()
+    scopes = args.subdomains or [s for s in catalog.scopes("tasks") if s.count("/") == 1]
+
+    cache = GoldCache(args.cache)
+    totals: dict[str, int] = {}
+    try:
+        for scope in scopes:
+            subdir = ROOT / scope
+            if not (subdir / f"{subdir.name}_normalized.db").exists():
+                print(f"{scope}: missing db; build first")
+                continue
+            stats = cache.precompute(subdir, catalog=catalog)
+            for key, n in stats.items():
+                totals[key] = totals.get(key, 0) + n
+            if stats["tasks"]:
+                print(f"{scope}: " + ", ".join(f"{n} {key}" for key, n in stats.items()))
+    finally:
+        cache.close()
+        catalog.close()
+    print("total: " + ", ".join(f"{n} {key}" for key, n in totals.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Incrementally refresh denormalized tables after rows are appended upstream.
+
+Runs ``common.denormalize.refresh`` for every subdomain whose
+``populate_denormalized.py`` declares ``VIEWS``. Only partitions touched by
+normalized rows above each view's stored high-water marks are recomputed; a
+view without stored marks (e.g. a db restored from the build cache) is rebuilt
+once in full. The marks live in ``.build_cache/refresh_watermarks.db``, not in
+the denormalized db. A db restored with ``--cache-mode hardlink`` is copied off
+its cache entry before it is written.
+"""
+from __future__ import annotations
+
+import argparse
+import pathlib
+import runpy
+import sqlite3
+import time
+
+from common.denormalize import attach, refresh
+from scripts.build_cache import unshare
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+def load_views(subdir: pathlib.Path) -> list[dict]:
+    script = subdir / "populate_denormalized.py"
+    if not script.exists() or "VIEWS" not in script.read_text(encoding="utf-8"):
+        return []
+    return runpy.run_path(str(script), run_name=f"_views_{subdir.name}").get("VIEWS", [])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("subdomains", nargs="*", help="<domain>/<subdomain> paths (default: every subdomain with VIEWS)")
+    parser.add_argument("--normalized-db", help="Override the normalized db (single subdomain only)")
+    parser.add_argument("--denormalized-db", help="Override the denormalized db (single subdomain only)")
+    parser.add_argument("--full", action="store_true", help="Rebuild the views from scratch")
+    args = parser.parse_args()
+    subdirs = [ROOT / name for name in args.subdomains] or sorted(p.parent for p in ROOT.glob("*/*/populate_denormalized.py"))
+    if (args.normalized_db or args.denormalized_db) and len(subdirs) != 1:
+        parser.error("--normalized-db/--denormalized-db need exactly one subdomain")
+
+    for subdir in subdirs:
+        views = load_views(subdir)
+        if not views:
+            continue
+        norm_db = args.normalized_db or subdir / f"{subdir.name}_normalized.db"
+        denorm_db = args.denormalized_db or subdir / f"{subdir.name}_denormalized.db"
+        label = f"{subdir.parent.name}/{subdir.name}"
+        if not pathlib.Path(denorm_db).exists():
+            print(f"{label}: missing {denorm_db}; build first")
+            continue
+        start = time.perf_counter()
+        if unshare(pathlib.Path(denorm_db)):
+            print(f"{label}: copied {denorm_db} off its hardlinked cache entry")
+        conn = sqlite3.connect(denorm_db)
+        try:
+            with attach(conn, norm_db):
+                stats = refresh(conn, views, full=args.full)
+        finally:
+            conn.close()
+        seconds = time.perf_counter() - start
+        for table, s in stats.items():
+            scope = "all partitions" if s["partitions"] is None else f"{s['partitions']} partitions"
+            print(f"{label} {table}: {s['mode']}, {scope}, {s['rows']} rows")
+        print(f"{label}: {seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Regression tests for ``common.async_executor``."""
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from common.async_executor import AsyncExecutor
+
+SLOW_SQL = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 2000000) SELECT COUNT(*) FROM c"
+
+
+class CancelQueuedTest(unittest.TestCase):
+    def setUp(self) -> None:
+        fd, self.db = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        conn = sqlite3.connect(self.db)
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.close()
+
+    def tearDown(self) -> None:
+        os.unlink(self.db)
+
+    def test_cancelled_queued_query_does_not_strand_the_next(self) -> None:
+        async def scenario() -> tuple[dict, dict, dict]:
+            async with AsyncExecutor(workers=1, per_db=1, timeout=None) as ex:
+                slow = asyncio.create_task(ex.execute(self.db, SLOW_SQL))
+                while not ex._running[os.path.abspath(self.db)]:
+                    await asyncio.sleep(0.001)
+                cancelled = asyncio.create_task(ex.execute(self.db, "SELECT 1"))
+                queued = asyncio.create_task(ex.execute(self.db, "SELECT 2"))
+                await asyncio.sleep(0.01)  # both are queued behind the slow query
+                cancelled.cancel()
+                slow_result = await slow
+                queued_result = await asyncio.wait_for(queued, timeout=10)
+                return slow_result, queued_result, dict(ex.stats)
+
+        slow, queued, stats = asyncio.run(scenario())
+        self.assertTrue(slow["ok"])
+        self.assertEqual(queued["rows"], [(2,)])
+        self.assertEqual(stats["completed"], 2)
+        self.assertEqual(stats["cancelled"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()